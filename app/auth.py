@@ -3,7 +3,6 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,6 +12,8 @@ from dotenv import load_dotenv
 
 from .database import get_session
 from .models import User
+from .utils.hashing import pwd_context, password_hasher, PasswordHasherBusy
+from .utils.user_cache import UserPrincipal, user_cache
 
 load_dotenv()
 
@@ -21,9 +22,6 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # Security scheme
 security = HTTPBearer()
 
@@ -35,6 +33,27 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+def _hasher_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop"""
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy_exception()
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise _hasher_busy_exception()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -55,10 +74,22 @@ def verify_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
+async def get_principal(session: AsyncSession, user_id: str) -> Optional[UserPrincipal]:
+    """The principal for a token's ``sub``, or ``None`` if the user no longer exists"""
+    # Serve repeat lookups from the principal cache
+    principal = user_cache.get(user_id)
+    if principal is None:
+        user = await session.get(User, user_id)
+        if user is None:
+            return None
+        principal = UserPrincipal.from_user(user)
+        user_cache.set(user_id, principal)
+    return principal
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: AsyncSession = Depends(get_session)
-) -> User:
+) -> UserPrincipal:
     """Get the current authenticated user from token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -79,20 +110,19 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    # Get user from database
-    user = await session.get(User, user_id)
-    if user is None:
+    principal = await get_principal(session, user_id)
+    if principal is None:
         raise credentials_exception
     
-    if not user.is_active:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
     
-    return user
+    return principal
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(
@@ -103,7 +133,7 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
 
 def require_role(required_role: str):
     """Decorator to require specific role"""
-    def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
+    def role_checker(current_user: UserPrincipal = Depends(get_current_active_user)) -> UserPrincipal:
         if current_user.role.value != required_role and current_user.role.value != "super_admin":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -114,7 +144,7 @@ def require_role(required_role: str):
 
 def require_roles(required_roles: list[str]):
     """Decorator to require one of specific roles"""
-    def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
+    def role_checker(current_user: UserPrincipal = Depends(get_current_active_user)) -> UserPrincipal:
         if current_user.role.value not in required_roles and current_user.role.value != "super_admin":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -1,18 +1,226 @@
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import exc, event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Optional
+import logging
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+# Reads from a user who just wrote go to the primary for this many seconds
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+# How long to stop trying an unreachable replica
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", 30))
+
+# Engine / pool tuning (sized per Uvicorn worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+DB_ECHO = os.getenv("DB_ECHO", "false").lower()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to check out a connection"""
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "timeout": self.timeout(),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "average_wait_seconds": self.wait_seconds / self.checkouts if self.checkouts else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+
+def _echo_setting(value: str):
+    if value == "debug":
+        return "debug"
+    return value == "true"
+
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+def create_engine_from_settings(url: str, **overrides):
+    """Build an async engine from the DB_* settings; keyword arguments win"""
+    connect_args = {
+        # SQLAlchemy keeps its own prepared statement LRU on top of asyncpg's;
+        # both must be 0 behind a transaction-mode pgbouncer
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+    if DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+    options = {
+        "echo": _echo_setting(DB_ECHO),
+        "poolclass": InstrumentedPool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+    options.update(overrides)
+    return create_async_engine(url, **options)
+
+
+engine = create_engine_from_settings(DATABASE_URL)
 
 AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
-async def get_session():
+
+read_engine = create_engine_from_settings(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+
+ReadSessionLocal = (
+    sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+    if read_engine is not None else AsyncSessionLocal
+)
+
+
+def pool_stats(bind=None) -> dict:
+    pool = (bind or engine).pool
+    return pool.stats() if isinstance(pool, InstrumentedPool) else {"status": pool.status()}
+
+
+class ReadRouting:
+    """Tracks which callers wrote recently and whether the replica is reachable.
+
+    State is per process: with several Uvicorn workers a caller's next read may
+    land on a worker that did not see the write, so keep the window a little
+    longer than typical replica lag rather than relying on it as a guarantee.
+    """
+
+    def __init__(self, window_seconds: float = 5, retry_seconds: float = 30):
+        self.window_seconds = window_seconds
+        self.retry_seconds = retry_seconds
+        self._recent_writers: dict = {}
+        self._replica_down_until = 0.0
+
+    def record_write(self, key: Optional[str]):
+        if not key or self.window_seconds <= 0:
+            return
+        now = time.monotonic()
+        if len(self._recent_writers) > 10000:
+            self._recent_writers = {k: until for k, until in self._recent_writers.items() if until > now}
+        self._recent_writers[key] = now + self.window_seconds
+
+    def wrote_recently(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        until = self._recent_writers.get(key)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._recent_writers.pop(key, None)
+            return False
+        return True
+
+    def replica_available(self) -> bool:
+        return read_engine is not None and time.monotonic() >= self._replica_down_until
+
+    def mark_replica_down(self):
+        self._replica_down_until = time.monotonic() + self.retry_seconds
+
+
+read_routing = ReadRouting(window_seconds=READ_YOUR_WRITES_SECONDS, retry_seconds=REPLICA_RETRY_SECONDS)
+
+
+def _writer_key(request: Request) -> Optional[str]:
+    # Only used to pick a database, never to authorize, so the token's
+    # signature is checked later by get_current_user as usual
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject = jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+    return str(subject) if subject else None
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session):
+    read_routing.record_write(session.info.get("writer_key"))
+
+
+async def get_session(request: Request):
     async with AsyncSessionLocal() as session:
+        session.info["writer_key"] = _writer_key(request)
         yield session
+
+
+async def _open_read_session(request: Request) -> AsyncSession:
+    if not read_routing.replica_available() or read_routing.wrote_recently(_writer_key(request)):
+        return AsyncSessionLocal()
+
+    session = ReadSessionLocal()
+    try:
+        await session.connection()
+        return session
+    except exc.TimeoutError:
+        logger.warning("Replica pool exhausted, reading from primary")
+    except (exc.DBAPIError, OSError) as e:
+        logger.warning("Replica unavailable, reading from primary for %ss: %s", read_routing.retry_seconds, e)
+        read_routing.mark_replica_down()
+    await session.close()
+    return AsyncSessionLocal()
+
+
+async def get_read_session(request: Request):
+    """Session for read-only handlers: the replica when configured and healthy,
+    otherwise (or right after the caller's own writes) the primary"""
+    session = await _open_read_session(request)
+    async with session:
+        yield session
+
+
+async def open_read_session(request: Request) -> AsyncSession:
+    """Like ``get_read_session`` but for handlers that need several sessions
+    to run queries concurrently; the caller closes it"""
+    return await _open_read_session(request)
+
+
+def read_session_factory():
+    """Session factory for background readers that have no request"""
+    return ReadSessionLocal if read_routing.replica_available() else AsyncSessionLocal
@@ -1,7 +1,17 @@
 from fastapi import FastAPI, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select 
-from .database import get_session, engine, Base
+from .database import get_session, engine, read_engine
+from .migrate import ensure_schema
+from .utils.hashing import password_hasher
+from .utils.email import email_dispatcher
+from .utils.late_fees import late_fee_job, LATE_FEE_JOB_ENABLED
+from .utils.ledger import snapshot_job, LEDGER_SNAPSHOT_JOB_ENABLED
+from .utils.outbox import outbox_worker, OUTBOX_WORKER_ENABLED
+from .utils.user_cache import InvalidationListener, USER_CACHE_NOTIFY_CHANNEL
+from .utils.query_stats import QueryStatsMiddleware, instrument_engine, QUERY_STATS_ENABLED
+from .utils.metrics import MetricsMiddleware
+from .utils.idempotency import IdempotencyMiddleware, IDEMPOTENCY_ENABLED
 from typing import List
 
 # Import all route modules
@@ -16,6 +26,10 @@ from .routes import maintenance_enhanced
 from .routes import users
 from .routes import residents_enhanced
 from .routes import auth
+from .routes import accounts
+from .routes import billing
+from .routes import internal
+from .routes import metrics
 
 app = FastAPI(
     title="HOA Management System API",
@@ -23,10 +37,44 @@ app = FastAPI(
     version="1.0.0"
 )
 
+if IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware)
+if QUERY_STATS_ENABLED:
+    instrument_engine(engine)
+    if read_engine is not None:
+        instrument_engine(read_engine)
+    app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+user_cache_listener = None
+
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await ensure_schema(engine)
+
+    email_dispatcher.start()
+    if OUTBOX_WORKER_ENABLED:
+        outbox_worker.start()
+    if LATE_FEE_JOB_ENABLED:
+        late_fee_job.start()
+    if LEDGER_SNAPSHOT_JOB_ENABLED:
+        snapshot_job.start()
+
+    global user_cache_listener
+    if USER_CACHE_NOTIFY_CHANNEL:
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        user_cache_listener = InvalidationListener(dsn, USER_CACHE_NOTIFY_CHANNEL)
+        user_cache_listener.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    if user_cache_listener is not None:
+        await user_cache_listener.stop()
+    await snapshot_job.stop()
+    await late_fee_job.stop()
+    await outbox_worker.stop()
+    await email_dispatcher.stop()
+    password_hasher.shutdown()
 
 @app.get("/")
 def read_root():
@@ -49,3 +97,7 @@ app.include_router(contractors.router)
 app.include_router(maintenance_enhanced.router)
 app.include_router(users.router)
 app.include_router(residents_enhanced.router)
+app.include_router(accounts.router)
+app.include_router(billing.router)
+app.include_router(internal.router)
+app.include_router(metrics.router)
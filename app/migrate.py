@@ -0,0 +1,196 @@
+"""Versioned schema migrations.
+
+Scripts live in ``app/migrations`` as ``NNNN_description.py`` and define
+``async def upgrade(conn)`` taking an ``AsyncConnection``; each runs in its own
+transaction and records its version in ``schema_version``. Scripts must be
+idempotent (``checkfirst`` / ``IF NOT EXISTS``) so databases created by the old
+``create_all`` startup can be brought under version control, and must carry
+their own DDL rather than import ``app.models``, which only describes the
+latest schema.
+
+A script that sets ``TRANSACTIONAL = False`` gets an autocommit connection
+instead, for ``CREATE INDEX CONCURRENTLY`` and other statements Postgres
+refuses inside a transaction block; each of its statements must be safe to
+re-run on its own, since a failure leaves the earlier ones applied.
+
+    python -m app.migrate status
+    python -m app.migrate upgrade
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+import re
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import text, exc
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "false").lower() == "true"
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+SCRIPT_PATTERN = re.compile(r"^(\d+)_(\w+)\.py$")
+
+# Arbitrary constant shared by every process running migrations
+ADVISORY_LOCK_KEY = 72_406_101
+
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised at startup when the database is behind the code"""
+
+
+def discover() -> list:
+    """Return ``[(version, name, path), ...]`` sorted by version"""
+    scripts = []
+    for path in MIGRATIONS_DIR.glob("*.py"):
+        match = SCRIPT_PATTERN.match(path.name)
+        if match:
+            scripts.append((int(match.group(1)), match.group(2), path))
+    scripts.sort()
+    versions = [version for version, _, _ in scripts]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError("Duplicate migration version in app/migrations")
+    return scripts
+
+
+def latest_version() -> int:
+    scripts = discover()
+    return scripts[-1][0] if scripts else 0
+
+
+def _load(version: int, name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(f"app_migration_{version:04d}_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def current_version(conn) -> int:
+    """The applied schema version; 0 for a database that predates migrations"""
+    try:
+        result = await conn.execute(text("SELECT max(version) FROM schema_version"))
+        return result.scalar() or 0
+    except exc.ProgrammingError:
+        await conn.rollback()
+        return 0
+
+
+async def create_index_concurrently(conn, name: str, definition: str):
+    """``CREATE INDEX CONCURRENTLY IF NOT EXISTS name definition`` without blocking writes.
+
+    ``definition`` is the rest of the statement (``ON table (columns)``). An
+    interrupted concurrent build leaves an invalid index behind that
+    ``IF NOT EXISTS`` would keep, so that one is dropped and built again.
+    Needs the autocommit connection of a ``TRANSACTIONAL = False`` script.
+    """
+    result = await conn.execute(
+        text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+        ),
+        {"name": name},
+    )
+    if result.scalar() is False:
+        logger.warning("Rebuilding invalid index %s", name)
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    await conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"))
+
+
+async def _record(conn, version: int, name: str):
+    await conn.execute(
+        text("INSERT INTO schema_version (version, name) VALUES (:version, :name)"),
+        {"version": version, "name": name},
+    )
+
+
+async def upgrade(engine) -> list:
+    """Apply pending migrations; safe to run from several processes at once"""
+    applied = []
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        await conn.commit()
+        try:
+            await conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_version ("
+                "version INTEGER PRIMARY KEY, "
+                "name VARCHAR(200) NOT NULL, "
+                "applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now())"
+            ))
+            await conn.commit()
+
+            current = await current_version(conn)
+            await conn.commit()
+            for version, name, path in discover():
+                if version <= current:
+                    continue
+                logger.info("Applying migration %04d_%s", version, name)
+                module = _load(version, name, path)
+                if getattr(module, "TRANSACTIONAL", True):
+                    async with conn.begin():
+                        await module.upgrade(conn)
+                        await _record(conn, version, name)
+                else:
+                    # A second connection, so this one keeps the advisory lock
+                    # and its own isolation level
+                    async with engine.connect() as ddl_conn:
+                        ddl_conn = await ddl_conn.execution_options(isolation_level="AUTOCOMMIT")
+                        await module.upgrade(ddl_conn)
+                    async with conn.begin():
+                        await _record(conn, version, name)
+                applied.append(version)
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            await conn.commit()
+    return applied
+
+
+async def ensure_schema(engine, auto_migrate: bool = DB_AUTO_MIGRATE):
+    """Startup check: one query when the schema is current"""
+    async with engine.connect() as conn:
+        current = await current_version(conn)
+    latest = latest_version()
+    if current >= latest:
+        return
+    if auto_migrate:
+        await upgrade(engine)
+        return
+    raise SchemaOutOfDate(
+        f"Database schema is at version {current}, code expects {latest}; "
+        "run `python -m app.migrate upgrade` or set DB_AUTO_MIGRATE=true"
+    )
+
+
+async def _status(engine):
+    async with engine.connect() as conn:
+        current = await current_version(conn)
+    print(f"Current version: {current}")
+    for version, name, _ in discover():
+        print(f"  {version:04d}_{name}: {'applied' if version <= current else 'pending'}")
+
+
+async def _main(command: str):
+    from .database import engine
+
+    try:
+        if command == "upgrade":
+            applied = await upgrade(engine)
+            print(f"Applied {len(applied)} migration(s)" + (f": {applied}" if applied else ""))
+        else:
+            await _status(engine)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command not in ("upgrade", "status"):
+        print("Usage: python -m app.migrate [upgrade|status]")
+        sys.exit(2)
+    asyncio.run(_main(command))
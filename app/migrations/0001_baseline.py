@@ -0,0 +1,324 @@
+"""Baseline schema: the tables the app had when versioned migrations were introduced.
+
+Defined here rather than taken from ``app.models``, so replaying the history
+on an empty database always builds the same starting point and every later
+script really adds what it says it adds. Tables are created with
+``checkfirst``, which also adopts databases built by the old ``create_all``
+startup hook. Enum types hold member names, as ``Enum(SomeEnum)`` columns do.
+"""
+
+from sqlalchemy import (
+    Boolean, Column, Date, DateTime, Enum, ForeignKey, Index, Integer, MetaData, Numeric, String, Table, Text,
+    Time, func, text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+metadata = MetaData()
+
+resident_type = Enum("owner", "tenant", "board_member", name="residenttype")
+account_type = Enum("operating", "reserve", "special_assessment", name="accounttype")
+payment_type = Enum("monthly_fee", "special_assessment", "late_fee", "other", name="paymenttype")
+payment_status = Enum("paid", "pending", "overdue", "partial", name="paymentstatus")
+priority = Enum("low", "medium", "high", "emergency", name="priority")
+maintenance_status = Enum("pending", "in_progress", "scheduled", "completed", "cancelled", name="maintenancestatus")
+violation_severity = Enum("minor", "major", "severe", name="violationseverity")
+violation_status = Enum("open", "warning_sent", "fine_issued", "resolved", "escalated", name="violationstatus")
+meeting_type = Enum("board_meeting", "annual_meeting", "special_meeting", "committee_meeting", name="meetingtype")
+meeting_status = Enum("scheduled", "in_progress", "completed", "cancelled", name="meetingstatus")
+access_level = Enum("public", "residents_only", "board_only", "admin_only", name="accesslevel")
+billing_frequency = Enum("monthly", "quarterly", "annually", "one_time", name="billingfrequency")
+maintenance_category = Enum(
+    "plumbing", "electrical", "hvac", "appliance", "structural", "landscaping", "pest_control", "security",
+    "cleaning", "painting", "flooring", "roofing", "windows", "doors", "other",
+    name="maintenancecategory",
+)
+maintenance_status_enhanced = Enum(
+    "pending", "approved", "scheduled", "in_progress", "completed", "cancelled", "on_hold", "requires_approval",
+    name="maintenancestatusenhanced",
+)
+preferred_time_slot = Enum("morning", "afternoon", "evening", "anytime", name="preferredtimeslot")
+user_role = Enum(
+    "super_admin", "property_manager", "board_member", "community_admin", "resident", "tenant", name="userrole"
+)
+resident_type_enhanced = Enum("owner", "tenant", "authorized_user", name="residenttypeenhanced")
+outbox_status = Enum("pending", "sent", "failed", name="outboxstatus")
+
+
+def _timestamps():
+    return (
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+        Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+    )
+
+
+Table(
+    "properties", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(255), nullable=False),
+    Column("address", Text, nullable=False),
+    Column("total_units", Integer, nullable=False),
+    Column("property_type", String(100)),
+    Column("year_built", Integer),
+    *_timestamps(),
+)
+
+Table(
+    "units", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("property_id", Integer, ForeignKey("properties.id"), nullable=False),
+    Column("unit_number", String(50), nullable=False),
+    Column("unit_type", String(100)),
+    Column("square_feet", Integer),
+    Column("bedrooms", Integer),
+    Column("bathrooms", Numeric(2, 1)),
+    Column("monthly_fee", Numeric(10, 2), nullable=False),
+    *_timestamps(),
+)
+
+Table(
+    "residents", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("unit_id", Integer, ForeignKey("units.id"), nullable=False),
+    Column("first_name", String(100), nullable=False),
+    Column("last_name", String(100), nullable=False),
+    Column("email", String(255), unique=True, nullable=False, index=True),
+    Column("phone", String(20)),
+    Column("resident_type", resident_type, nullable=False),
+    Column("move_in_date", Date),
+    Column("emergency_contact_name", String(200)),
+    Column("emergency_contact_phone", String(20)),
+    *_timestamps(),
+)
+
+Table(
+    "financial_accounts", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("account_name", String(255), nullable=False),
+    Column("account_type", account_type, nullable=False),
+    Column("balance", Numeric(12, 2)),
+    *_timestamps(),
+)
+
+Table(
+    "payments", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("resident_id", Integer, ForeignKey("residents.id"), nullable=False),
+    Column("unit_id", Integer, ForeignKey("units.id"), nullable=False),
+    Column("amount", Numeric(10, 2), nullable=False),
+    Column("payment_type", payment_type, nullable=False),
+    Column("payment_method", String(50)),
+    Column("payment_date", Date, nullable=False),
+    Column("due_date", Date),
+    Column("status", payment_status, nullable=False),
+    Column("notes", Text),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "maintenance_requests", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("unit_id", Integer, ForeignKey("units.id"), nullable=False),
+    Column("resident_id", Integer, ForeignKey("residents.id"), nullable=False),
+    Column("title", String(255), nullable=False),
+    Column("description", Text),
+    Column("priority", priority, nullable=False),
+    Column("status", maintenance_status, nullable=False),
+    Column("category", String(100)),
+    Column("estimated_cost", Numeric(10, 2)),
+    Column("actual_cost", Numeric(10, 2)),
+    Column("assigned_to", String(255)),
+    Column("scheduled_date", Date),
+    Column("completed_date", Date),
+    *_timestamps(),
+)
+
+Table(
+    "violations", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("unit_id", Integer, ForeignKey("units.id"), nullable=False),
+    Column("resident_id", Integer, ForeignKey("residents.id"), nullable=False),
+    Column("violation_type", String(255), nullable=False),
+    Column("description", Text, nullable=False),
+    Column("severity", violation_severity, nullable=False),
+    Column("status", violation_status, nullable=False),
+    Column("fine_amount", Numeric(10, 2)),
+    Column("inspection_date", Date),
+    Column("resolution_date", Date),
+    Column("notes", Text),
+    *_timestamps(),
+)
+
+Table(
+    "meetings", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String(255), nullable=False),
+    Column("meeting_type", meeting_type, nullable=False),
+    Column("meeting_date", Date, nullable=False),
+    Column("meeting_time", Time, nullable=False),
+    Column("location", String(255)),
+    Column("agenda", Text),
+    Column("minutes", Text),
+    Column("attendee_count", Integer),
+    Column("status", meeting_status, nullable=False),
+    *_timestamps(),
+)
+
+Table(
+    "documents", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String(255), nullable=False),
+    Column("document_type", String(100)),
+    Column("file_path", String(500)),
+    Column("file_size", Integer),
+    Column("uploaded_by", String(255)),
+    Column("access_level", access_level, nullable=False),
+    *_timestamps(),
+)
+
+Table(
+    "service_providers", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("company_name", String(255), nullable=False),
+    Column("contact_person", String(255)),
+    Column("email", String(255)),
+    Column("phone", String(20)),
+    Column("service_type", String(100)),
+    Column("hourly_rate", Numeric(8, 2)),
+    Column("is_preferred", Boolean),
+    Column("insurance_expiry", Date),
+    *_timestamps(),
+)
+
+Table(
+    "management_fees", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("fee_type", String(100), nullable=False),
+    Column("amount", Numeric(10, 2)),
+    Column("rate_per_unit", Numeric(8, 2)),
+    Column("billing_frequency", billing_frequency, nullable=False),
+    Column("description", Text),
+    Column("is_active", Boolean),
+    *_timestamps(),
+)
+
+Table(
+    "contractors", metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("company", String(100)),
+    Column("email", String(255), unique=True, nullable=False, index=True),
+    Column("phone", String(20), nullable=False),
+    Column("specialties", JSONB),
+    Column("rating", Numeric(3, 2)),
+    Column("is_active", Boolean),
+    Column("license_number", String(50)),
+    Column("insurance_expiry", Date),
+    *_timestamps(),
+)
+
+Table(
+    "maintenance_requests_enhanced", metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("title", String(200), nullable=False),
+    Column("description", Text, nullable=False),
+    Column("category", maintenance_category, nullable=False),
+    Column("priority", priority, nullable=False),
+    Column("status", maintenance_status_enhanced, nullable=False),
+    Column("unit_id", UUID(as_uuid=True), nullable=False),
+    Column("property_id", UUID(as_uuid=True), nullable=False),
+    Column("resident_id", UUID(as_uuid=True), nullable=False),
+    Column("assigned_to", String(100)),
+    Column("assigned_to_name", String(100)),
+    Column("contractor_id", UUID(as_uuid=True), ForeignKey("contractors.id")),
+    Column("estimated_cost", Numeric(10, 2)),
+    Column("actual_cost", Numeric(10, 2)),
+    Column("scheduled_date", DateTime(timezone=True)),
+    Column("completed_date", DateTime(timezone=True)),
+    Column("images", JSONB),
+    Column("notes", Text),
+    Column("work_order_number", String(50), unique=True),
+    Column("is_emergency", Boolean),
+    Column("access_instructions", Text),
+    Column("preferred_time_slot", preferred_time_slot),
+    Column("resident_available", Boolean),
+    Column("created_by", UUID(as_uuid=True), nullable=False),
+    Column("updated_by", UUID(as_uuid=True)),
+    *_timestamps(),
+)
+
+Table(
+    "maintenance_work_logs", metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("maintenance_request_id", UUID(as_uuid=True), ForeignKey("maintenance_requests_enhanced.id"), nullable=False),
+    Column("worker_id", UUID(as_uuid=True)),
+    Column("worker_name", String(100), nullable=False),
+    Column("work_date", Date, nullable=False),
+    Column("hours_worked", Numeric(4, 2), nullable=False),
+    Column("work_description", Text, nullable=False),
+    Column("materials_used", JSONB),
+    Column("cost", Numeric(10, 2)),
+    Column("images", JSONB),
+    Column("created_by", UUID(as_uuid=True), nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+Table(
+    "users", metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("email", String(255), unique=True, nullable=False, index=True),
+    Column("password_hash", String(255), nullable=False),
+    Column("first_name", String(50), nullable=False),
+    Column("last_name", String(50), nullable=False),
+    Column("phone", String(20)),
+    Column("role", user_role, nullable=False),
+    Column("is_active", Boolean),
+    Column("email_verified", Boolean),
+    Column("last_login_at", DateTime(timezone=True)),
+    Column("password_reset_token", String(255)),
+    Column("password_reset_expires", DateTime(timezone=True)),
+    *_timestamps(),
+)
+
+Table(
+    "residents_enhanced", metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL")),
+    Column("first_name", String(50), nullable=False),
+    Column("last_name", String(50), nullable=False),
+    Column("email", String(255), nullable=False),
+    Column("phone", String(20), nullable=False),
+    Column("unit_id", UUID(as_uuid=True), nullable=False),
+    Column("property_id", UUID(as_uuid=True), nullable=False),
+    Column("resident_type", resident_type_enhanced, nullable=False),
+    Column("role", user_role, nullable=False),
+    Column("move_in_date", Date, nullable=False),
+    Column("move_out_date", Date),
+    Column("lease_end_date", Date),
+    Column("emergency_contact", JSONB, nullable=False),
+    Column("vehicle_info", JSONB),
+    Column("pet_info", JSONB),
+    Column("is_active", Boolean),
+    Column("is_primary", Boolean),
+    Column("notes", Text),
+    Column("created_by", UUID(as_uuid=True), nullable=False),
+    Column("updated_by", UUID(as_uuid=True)),
+    *_timestamps(),
+)
+
+Table(
+    "outbox", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("kind", String(50), nullable=False),
+    Column("payload", JSONB, nullable=False),
+    Column("status", outbox_status, nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("last_error", Text),
+    Column("available_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("sent_at", DateTime(timezone=True)),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Index("ix_outbox_pending", "available_at", "id", postgresql_where=text("status = 'pending'")),
+)
+
+
+async def upgrade(conn):
+    await conn.run_sync(metadata.create_all, checkfirst=True)
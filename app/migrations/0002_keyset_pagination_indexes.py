@@ -0,0 +1,15 @@
+"""(created_at, id) indexes backing keyset pagination on the list endpoints"""
+
+from app.migrate import create_index_concurrently
+
+TRANSACTIONAL = False
+
+TABLES = [
+    "properties", "units", "residents", "payments", "maintenance_requests", "violations", "contractors",
+    "maintenance_requests_enhanced", "maintenance_work_logs", "users", "residents_enhanced",
+]
+
+
+async def upgrade(conn):
+    for table in TABLES:
+        await create_index_concurrently(conn, f"ix_{table}_created_at_id", f"ON {table} (created_at, id)")
@@ -0,0 +1,47 @@
+"""Indexes for the foreign keys and filter columns used by the list routes.
+
+Composite indexes end in ``(created_at, id)`` where the route also pages by
+that ordering, so a filtered page is a single index range scan.
+"""
+
+from app.migrate import create_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = [
+    ("ix_units_property_id", "ON units (property_id)"),
+    ("ix_residents_unit_id", "ON residents (unit_id)"),
+    ("ix_payments_payment_date", "ON payments (payment_date)"),
+    ("ix_payments_resident_id_created_at", "ON payments (resident_id, created_at, id)"),
+    ("ix_payments_unit_id_payment_date", "ON payments (unit_id, payment_date)"),
+    ("ix_maintenance_requests_unit_id_created_at", "ON maintenance_requests (unit_id, created_at, id)"),
+    ("ix_maintenance_requests_resident_id_created_at", "ON maintenance_requests (resident_id, created_at, id)"),
+    ("ix_violations_unit_id_created_at", "ON violations (unit_id, created_at, id)"),
+    ("ix_violations_resident_id_created_at", "ON violations (resident_id, created_at, id)"),
+    (
+        "ix_maintenance_requests_enhanced_property_status_created_at",
+        "ON maintenance_requests_enhanced (property_id, status, created_at, id)",
+    ),
+    (
+        "ix_maintenance_requests_enhanced_status_created_at",
+        "ON maintenance_requests_enhanced (status, created_at, id)",
+    ),
+    (
+        "ix_maintenance_requests_enhanced_unit_id_created_at",
+        "ON maintenance_requests_enhanced (unit_id, created_at, id)",
+    ),
+    (
+        "ix_maintenance_requests_enhanced_resident_id_created_at",
+        "ON maintenance_requests_enhanced (resident_id, created_at, id)",
+    ),
+    ("ix_maintenance_requests_enhanced_contractor_status", "ON maintenance_requests_enhanced (contractor_id, status)"),
+    ("ix_maintenance_work_logs_request_work_date", "ON maintenance_work_logs (maintenance_request_id, work_date)"),
+    ("ix_residents_enhanced_unit_id", "ON residents_enhanced (unit_id)"),
+    ("ix_residents_enhanced_property_active", "ON residents_enhanced (property_id, is_active)"),
+    ("ix_residents_enhanced_user_id", "ON residents_enhanced (user_id)"),
+]
+
+
+async def upgrade(conn):
+    for name, definition in INDEXES:
+        await create_index_concurrently(conn, name, definition)
@@ -0,0 +1,24 @@
+"""pg_trgm GIN indexes behind the ``search=`` parameter on contractors and enhanced maintenance requests"""
+
+from sqlalchemy import text
+
+from app.migrate import create_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = [
+    ("ix_contractors_name_trgm", "ON contractors USING gin (name gin_trgm_ops)"),
+    ("ix_contractors_company_trgm", "ON contractors USING gin (company gin_trgm_ops)"),
+    ("ix_contractors_email_trgm", "ON contractors USING gin (email gin_trgm_ops)"),
+    ("ix_maintenance_requests_enhanced_title_trgm", "ON maintenance_requests_enhanced USING gin (title gin_trgm_ops)"),
+    (
+        "ix_maintenance_requests_enhanced_description_trgm",
+        "ON maintenance_requests_enhanced USING gin (description gin_trgm_ops)",
+    ),
+]
+
+
+async def upgrade(conn):
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for name, definition in INDEXES:
+        await create_index_concurrently(conn, name, definition)
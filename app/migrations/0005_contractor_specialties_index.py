@@ -0,0 +1,11 @@
+"""GIN jsonb_path_ops index for specialty containment queries on contractors"""
+
+from app.migrate import create_index_concurrently
+
+TRANSACTIONAL = False
+
+
+async def upgrade(conn):
+    await create_index_concurrently(
+        conn, "ix_contractors_specialties", "ON contractors USING gin (specialties jsonb_path_ops)"
+    )
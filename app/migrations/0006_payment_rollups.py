@@ -0,0 +1,36 @@
+"""Daily and monthly payment rollup tables, backfilled from existing payments"""
+
+from sqlalchemy import text
+
+ROLLUPS = [
+    # (table, bucket column, bucket expression over payments p)
+    ("payment_rollups_daily", "day", "p.payment_date"),
+    ("payment_rollups_monthly", "month", "CAST(date_trunc('month', p.payment_date) AS DATE)"),
+]
+
+
+async def upgrade(conn):
+    for table, bucket, expression in ROLLUPS:
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            f"{bucket} DATE NOT NULL, "
+            "unit_id INTEGER NOT NULL REFERENCES units (id) ON DELETE CASCADE, "
+            "payment_type paymenttype NOT NULL, "
+            "status paymentstatus NOT NULL, "
+            "property_id INTEGER NOT NULL REFERENCES properties (id) ON DELETE CASCADE, "
+            "total_amount NUMERIC(14, 2) NOT NULL, "
+            "payment_count INTEGER NOT NULL, "
+            f"PRIMARY KEY ({bucket}, unit_id, payment_type, status))"
+        ))
+        await conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_property_{bucket} ON {table} (property_id, {bucket})"
+        ))
+        # Backfill
+        await conn.execute(text(f"DELETE FROM {table}"))
+        await conn.execute(text(
+            f"INSERT INTO {table} "
+            f"({bucket}, unit_id, payment_type, status, property_id, total_amount, payment_count) "
+            f"SELECT {expression}, p.unit_id, p.payment_type, p.status, u.property_id, sum(p.amount), count(*) "
+            "FROM payments p JOIN units u ON u.id = p.unit_id "
+            "GROUP BY 1, 2, 3, 4, 5"
+        ))
@@ -0,0 +1,31 @@
+"""Billing runs, and the link from the charges they create back to the run"""
+
+from sqlalchemy import text
+
+from app.migrate import create_index_concurrently
+
+TRANSACTIONAL = False
+
+
+async def upgrade(conn):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS billing_runs ("
+        "id SERIAL PRIMARY KEY, "
+        "property_id INTEGER NOT NULL REFERENCES properties (id), "
+        "period DATE NOT NULL, "
+        "units_billed INTEGER NOT NULL, "
+        "charges_created INTEGER NOT NULL, "
+        "total_amount NUMERIC(14, 2) NOT NULL, "
+        "created_by UUID REFERENCES users (id) ON DELETE SET NULL, "
+        "created_at TIMESTAMP WITH TIME ZONE DEFAULT now(), "
+        "CONSTRAINT uq_billing_runs_property_period UNIQUE (property_id, period))"
+    ))
+    # billing_runs is new, so these can build in the ordinary way
+    await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_billing_runs_created_at_id ON billing_runs (created_at, id)"))
+    await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_billing_runs_id ON billing_runs (id)"))
+    await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_billing_runs_period ON billing_runs (period)"))
+    await conn.execute(text(
+        "ALTER TABLE payments ADD COLUMN IF NOT EXISTS billing_run_id INTEGER "
+        "REFERENCES billing_runs (id) ON DELETE SET NULL"
+    ))
+    await create_index_concurrently(conn, "ix_payments_billing_run_id", "ON payments (billing_run_id)")
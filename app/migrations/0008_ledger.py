@@ -0,0 +1,48 @@
+"""Double-entry ledger: journal entries and lines, balance snapshots, and the income account type"""
+
+from sqlalchemy import text
+
+from app.migrate import create_index_concurrently
+
+# ALTER TYPE ... ADD VALUE cannot be used in the transaction that adds it, and
+# the financial_accounts index builds concurrently
+TRANSACTIONAL = False
+
+STATEMENTS = [
+    # Enum columns store member names
+    "ALTER TYPE accounttype ADD VALUE IF NOT EXISTS 'income'",
+    "CREATE TABLE IF NOT EXISTS journal_entries ("
+    "id SERIAL PRIMARY KEY, "
+    "entry_date DATE NOT NULL, "
+    "description TEXT, "
+    "source VARCHAR(50) NOT NULL, "
+    "source_id INTEGER, "
+    "created_by UUID REFERENCES users (id) ON DELETE SET NULL, "
+    "created_at TIMESTAMP WITH TIME ZONE DEFAULT now())",
+    "CREATE INDEX IF NOT EXISTS ix_journal_entries_created_at_id ON journal_entries (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_journal_entries_id ON journal_entries (id)",
+    "CREATE INDEX IF NOT EXISTS ix_journal_entries_source ON journal_entries (source, source_id)",
+    "CREATE TABLE IF NOT EXISTS journal_lines ("
+    "id SERIAL PRIMARY KEY, "
+    "entry_id INTEGER NOT NULL REFERENCES journal_entries (id) ON DELETE CASCADE, "
+    "account_id INTEGER NOT NULL REFERENCES financial_accounts (id), "
+    "entry_date DATE NOT NULL, "
+    "amount NUMERIC(12, 2) NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_journal_lines_account_date ON journal_lines (account_id, entry_date, id)",
+    "CREATE INDEX IF NOT EXISTS ix_journal_lines_entry_id ON journal_lines (entry_id)",
+    "CREATE INDEX IF NOT EXISTS ix_journal_lines_id ON journal_lines (id)",
+    "CREATE TABLE IF NOT EXISTS account_balance_snapshots ("
+    "account_id INTEGER NOT NULL REFERENCES financial_accounts (id) ON DELETE CASCADE, "
+    "as_of DATE NOT NULL, "
+    "balance NUMERIC(12, 2) NOT NULL, "
+    "created_at TIMESTAMP WITH TIME ZONE DEFAULT now(), "
+    "PRIMARY KEY (account_id, as_of))",
+]
+
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
+    await create_index_concurrently(
+        conn, "ix_financial_accounts_created_at_id", "ON financial_accounts (created_at, id)"
+    )
@@ -0,0 +1,19 @@
+"""Stored responses for requests sent with an Idempotency-Key header"""
+
+from sqlalchemy import text
+
+
+async def upgrade(conn):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+        "scope_id VARCHAR(64) PRIMARY KEY, "
+        "request_hash VARCHAR(64) NOT NULL, "
+        "status_code INTEGER, "
+        "content_type VARCHAR(255), "
+        "response_body BYTEA, "
+        "created_at TIMESTAMP WITH TIME ZONE DEFAULT now(), "
+        "expires_at TIMESTAMP WITH TIME ZONE NOT NULL)"
+    ))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at)"
+    ))
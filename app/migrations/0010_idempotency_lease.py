@@ -0,0 +1,7 @@
+"""Lease on in-flight idempotency claims, so a retry can take over from a worker that died"""
+
+from sqlalchemy import text
+
+
+async def upgrade(conn):
+    await conn.execute(text("ALTER TABLE idempotency_keys ADD COLUMN IF NOT EXISTS locked_until TIMESTAMP WITH TIME ZONE"))
@@ -0,0 +1,14 @@
+"""One-time management fees already billed, per property, so each is charged exactly once"""
+
+from sqlalchemy import text
+
+
+async def upgrade(conn):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS management_fee_billings ("
+        "fee_id INTEGER NOT NULL REFERENCES management_fees (id) ON DELETE CASCADE, "
+        "property_id INTEGER NOT NULL REFERENCES properties (id) ON DELETE CASCADE, "
+        "billing_run_id INTEGER NOT NULL REFERENCES billing_runs (id) ON DELETE CASCADE, "
+        "created_at TIMESTAMP WITH TIME ZONE DEFAULT now(), "
+        "PRIMARY KEY (fee_id, property_id))"
+    ))
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Enum, Integer, Float, Date, Time, Text, Numeric, ForeignKey, CheckConstraint, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, Integer, Float, Date, Time, Text, Numeric, LargeBinary, ForeignKey, CheckConstraint, JSON, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 import uuid
 from .database import Base
@@ -16,6 +16,7 @@ class AccountType(enum.Enum):
     operating = "Operating"
     reserve = "Reserve"
     special_assessment = "Special Assessment"
+    income = "Income"
 
 class PaymentType(enum.Enum):
     monthly_fee = "Monthly Fee"
@@ -124,9 +125,17 @@ class ResidentTypeEnhanced(enum.Enum):
     tenant = "tenant"
     authorized_user = "authorized_user"
 
+class OutboxStatus(enum.Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
+
 # Models
 class Property(Base):
     __tablename__ = "properties"
+    __table_args__ = (
+        Index("ix_properties_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -143,9 +152,12 @@ class Property(Base):
 
 class Unit(Base):
     __tablename__ = "units"
+    __table_args__ = (
+        Index("ix_units_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
+    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False, index=True)
     unit_number = Column(String(50), nullable=False)
     unit_type = Column(String(100), nullable=True)
     square_feet = Column(Integer, nullable=True)
@@ -165,9 +177,12 @@ class Unit(Base):
 
 class Resident(Base):
     __tablename__ = "residents"
+    __table_args__ = (
+        Index("ix_residents_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    unit_id = Column(Integer, ForeignKey("units.id"), nullable=False)
+    unit_id = Column(Integer, ForeignKey("units.id"), nullable=False, index=True)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -188,6 +203,9 @@ class Resident(Base):
 
 class FinancialAccount(Base):
     __tablename__ = "financial_accounts"
+    __table_args__ = (
+        Index("ix_financial_accounts_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     account_name = Column(String(255), nullable=False)
@@ -199,6 +217,11 @@ class FinancialAccount(Base):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_created_at_id", "created_at", "id"),
+        Index("ix_payments_resident_id_created_at", "resident_id", "created_at", "id"),
+        Index("ix_payments_unit_id_payment_date", "unit_id", "payment_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     resident_id = Column(Integer, ForeignKey("residents.id"), nullable=False)
@@ -206,10 +229,11 @@ class Payment(Base):
     amount = Column(Numeric(10, 2), nullable=False)
     payment_type = Column(Enum(PaymentType), nullable=False)
     payment_method = Column(String(50), nullable=True)
-    payment_date = Column(Date, nullable=False)
+    payment_date = Column(Date, nullable=False, index=True)
     due_date = Column(Date, nullable=True)
     status = Column(Enum(PaymentStatus), nullable=False)
     notes = Column(Text, nullable=True)
+    billing_run_id = Column(Integer, ForeignKey("billing_runs.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -219,6 +243,11 @@ class Payment(Base):
 
 class MaintenanceRequest(Base):
     __tablename__ = "maintenance_requests"
+    __table_args__ = (
+        Index("ix_maintenance_requests_created_at_id", "created_at", "id"),
+        Index("ix_maintenance_requests_unit_id_created_at", "unit_id", "created_at", "id"),
+        Index("ix_maintenance_requests_resident_id_created_at", "resident_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     unit_id = Column(Integer, ForeignKey("units.id"), nullable=False)
@@ -243,6 +272,11 @@ class MaintenanceRequest(Base):
 
 class Violation(Base):
     __tablename__ = "violations"
+    __table_args__ = (
+        Index("ix_violations_created_at_id", "created_at", "id"),
+        Index("ix_violations_unit_id_created_at", "unit_id", "created_at", "id"),
+        Index("ix_violations_resident_id_created_at", "resident_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     unit_id = Column(Integer, ForeignKey("units.id"), nullable=False)
@@ -326,6 +360,13 @@ class ManagementFee(Base):
 
 class Contractor(Base):
     __tablename__ = "contractors"
+    __table_args__ = (
+        Index("ix_contractors_created_at_id", "created_at", "id"),
+        Index("ix_contractors_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_contractors_company_trgm", "company", postgresql_using="gin", postgresql_ops={"company": "gin_trgm_ops"}),
+        Index("ix_contractors_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_contractors_specialties", "specialties", postgresql_using="gin", postgresql_ops={"specialties": "jsonb_path_ops"}),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False)
@@ -346,6 +387,16 @@ class Contractor(Base):
 
 class MaintenanceRequestEnhanced(Base):
     __tablename__ = "maintenance_requests_enhanced"
+    __table_args__ = (
+        Index("ix_maintenance_requests_enhanced_created_at_id", "created_at", "id"),
+        Index("ix_maintenance_requests_enhanced_property_status_created_at", "property_id", "status", "created_at", "id"),
+        Index("ix_maintenance_requests_enhanced_status_created_at", "status", "created_at", "id"),
+        Index("ix_maintenance_requests_enhanced_unit_id_created_at", "unit_id", "created_at", "id"),
+        Index("ix_maintenance_requests_enhanced_resident_id_created_at", "resident_id", "created_at", "id"),
+        Index("ix_maintenance_requests_enhanced_contractor_status", "contractor_id", "status"),
+        Index("ix_maintenance_requests_enhanced_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_maintenance_requests_enhanced_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(200), nullable=False)
@@ -382,6 +433,10 @@ class MaintenanceRequestEnhanced(Base):
 
 class MaintenanceWorkLog(Base):
     __tablename__ = "maintenance_work_logs"
+    __table_args__ = (
+        Index("ix_maintenance_work_logs_created_at_id", "created_at", "id"),
+        Index("ix_maintenance_work_logs_request_work_date", "maintenance_request_id", "work_date"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     maintenance_request_id = Column(UUID(as_uuid=True), ForeignKey("maintenance_requests_enhanced.id"), nullable=False)
@@ -402,6 +457,9 @@ class MaintenanceWorkLog(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -424,14 +482,18 @@ class User(Base):
 
 class ResidentEnhanced(Base):
     __tablename__ = "residents_enhanced"
+    __table_args__ = (
+        Index("ix_residents_enhanced_created_at_id", "created_at", "id"),
+        Index("ix_residents_enhanced_property_active", "property_id", "is_active"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     first_name = Column(String(50), nullable=False)
     last_name = Column(String(50), nullable=False)
     email = Column(String(255), nullable=False)
     phone = Column(String(20), nullable=False)
-    unit_id = Column(UUID(as_uuid=True), nullable=False)
+    unit_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     property_id = Column(UUID(as_uuid=True), nullable=False)
     resident_type = Column(Enum(ResidentTypeEnhanced), nullable=False)
     role = Column(Enum(UserRole), nullable=False, default=UserRole.resident)
@@ -452,3 +514,146 @@ class ResidentEnhanced(Base):
     # Relationships
     user = relationship("User", back_populates="residents")
 
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+    __table_args__ = (
+        Index("ix_outbox_pending", "available_at", "id", postgresql_where=text("status = 'pending'")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class PaymentDailyRollup(Base):
+    """Payment totals per day, unit, type and status; kept in step by ``utils.rollups``"""
+    __tablename__ = "payment_rollups_daily"
+    __table_args__ = (
+        Index("ix_payment_rollups_daily_property_day", "property_id", "day"),
+    )
+
+    day = Column(Date, primary_key=True)
+    unit_id = Column(Integer, ForeignKey("units.id", ondelete="CASCADE"), primary_key=True)
+    payment_type = Column(Enum(PaymentType), primary_key=True)
+    status = Column(Enum(PaymentStatus), primary_key=True)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
+    total_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    payment_count = Column(Integer, nullable=False, default=0)
+
+
+class PaymentMonthlyRollup(Base):
+    """Same as ``PaymentDailyRollup`` with ``month`` holding the first day of the month"""
+    __tablename__ = "payment_rollups_monthly"
+    __table_args__ = (
+        Index("ix_payment_rollups_monthly_property_month", "property_id", "month"),
+    )
+
+    month = Column(Date, primary_key=True)
+    unit_id = Column(Integer, ForeignKey("units.id", ondelete="CASCADE"), primary_key=True)
+    payment_type = Column(Enum(PaymentType), primary_key=True)
+    status = Column(Enum(PaymentStatus), primary_key=True)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
+    total_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    payment_count = Column(Integer, nullable=False, default=0)
+
+
+class BillingRun(Base):
+    """One billing period charged to one property; the unique key makes re-runs no-ops"""
+    __tablename__ = "billing_runs"
+    __table_args__ = (
+        UniqueConstraint("property_id", "period", name="uq_billing_runs_property_period"),
+        Index("ix_billing_runs_created_at_id", "created_at", "id"),
+        Index("ix_billing_runs_period", "period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
+    period = Column(Date, nullable=False)  # first day of the billed month
+    units_billed = Column(Integer, nullable=False, default=0)
+    charges_created = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ManagementFeeBilling(Base):
+    """A one-time management fee already charged to a property; the primary key makes it once only"""
+    __tablename__ = "management_fee_billings"
+
+    fee_id = Column(Integer, ForeignKey("management_fees.id", ondelete="CASCADE"), primary_key=True)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+    billing_run_id = Column(Integer, ForeignKey("billing_runs.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class JournalEntry(Base):
+    """A balanced set of journal lines; ``source``/``source_id`` link postings made for other records"""
+    __tablename__ = "journal_entries"
+    __table_args__ = (
+        Index("ix_journal_entries_created_at_id", "created_at", "id"),
+        Index("ix_journal_entries_source", "source", "source_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    entry_date = Column(Date, nullable=False)
+    description = Column(Text, nullable=True)
+    source = Column(String(50), nullable=False, default="manual")
+    source_id = Column(Integer, nullable=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    lines = relationship("JournalLine", back_populates="entry", cascade="all, delete-orphan")
+
+
+class JournalLine(Base):
+    """Signed amount posted to one account: debits positive, credits negative"""
+    __tablename__ = "journal_lines"
+    __table_args__ = (
+        Index("ix_journal_lines_account_date", "account_id", "entry_date", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    entry_id = Column(Integer, ForeignKey("journal_entries.id", ondelete="CASCADE"), nullable=False, index=True)
+    account_id = Column(Integer, ForeignKey("financial_accounts.id"), nullable=False)
+    entry_date = Column(Date, nullable=False)  # copied from the entry for as-of scans
+    amount = Column(Numeric(12, 2), nullable=False)
+
+    # Relationships
+    entry = relationship("JournalEntry", back_populates="lines")
+
+
+class AccountBalanceSnapshot(Base):
+    """Balance of an account at the end of ``as_of``; postings dated on or before it keep it current"""
+    __tablename__ = "account_balance_snapshots"
+
+    account_id = Column(Integer, ForeignKey("financial_accounts.id", ondelete="CASCADE"), primary_key=True)
+    as_of = Column(Date, primary_key=True)
+    balance = Column(Numeric(12, 2), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class IdempotencyKey(Base):
+    """Stored outcome of a POST sent with an ``Idempotency-Key`` header; ``status_code`` is NULL while it runs
+
+    ``locked_until`` is the running request's lease: a retry takes over a
+    claim whose lease ran out (its worker died) instead of waiting for ``expires_at``.
+    """
+    __tablename__ = "idempotency_keys"
+
+    # sha256 of the key together with the caller's credentials, method and path
+    scope_id = Column(String(64), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String(255), nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,208 @@
+# routes/accounts.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from typing import List, Optional, Union
+from datetime import date, timedelta
+
+from ..database import get_session, get_read_session
+from ..models import FinancialAccount, JournalEntry, JournalLine
+from ..schemas import (
+    FinancialAccountCreate, FinancialAccountUpdate, FinancialAccountOut, JournalEntryCreate, JournalEntryOut,
+    JournalLineOut, AccountBalanceOut, Page,
+)
+from ..auth import require_roles, UserPrincipal
+from ..utils.pagination import paginate
+from ..utils.ledger import LedgerError, balance_as_of, checkpoint_balances, post_entry, post_opening_balance
+
+router = APIRouter(prefix="/accounts", tags=["Accounts"])
+
+@router.post("/", response_model=FinancialAccountOut, status_code=201)
+async def create_account(
+    data: FinancialAccountCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
+):
+    """Create a new financial account; a non-zero balance is posted as its opening balance"""
+    try:
+        opening_balance = data.balance or 0
+        new_account = FinancialAccount(**data.dict(exclude={"balance"}), balance=0)
+        session.add(new_account)
+        await session.flush()
+
+        # A journal entry rather than a bare balance, so the ledger stays balanced
+        if opening_balance:
+            await post_opening_balance(session, new_account, opening_balance, created_by=current_user.id)
+
+        await session.commit()
+        await session.refresh(new_account)
+        return new_account
+    except LedgerError as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to create account: {str(e)}")
+
+@router.get("/", response_model=Union[List[FinancialAccountOut], Page[FinancialAccountOut]])
+async def list_accounts(
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
+    account_type: Optional[str] = Query(None, description="Filter by account type"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Get all financial accounts with optional filtering and pagination"""
+    try:
+        query = select(FinancialAccount)
+
+        if account_type:
+            query = query.where(FinancialAccount.account_type == account_type)
+
+        return await paginate(session, query, FinancialAccount, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch accounts: {str(e)}")
+
+@router.post("/journal", response_model=JournalEntryOut, status_code=201)
+async def create_journal_entry(
+    data: JournalEntryCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
+):
+    """Post a balanced journal entry (lines must sum to zero)"""
+    try:
+        entry = await post_entry(
+            session, data.entry_date, [(line.account_id, line.amount) for line in data.lines],
+            description=data.description, created_by=current_user.id,
+        )
+        await session.commit()
+
+        result = await session.execute(
+            select(JournalEntry).options(selectinload(JournalEntry.lines)).where(JournalEntry.id == entry.id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one()
+    except LedgerError as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to post journal entry: {str(e)}")
+
+@router.post("/snapshots")
+async def create_balance_snapshots(
+    as_of: Optional[date] = Query(None, description="Day to checkpoint (defaults to yesterday)"),
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin"]))
+):
+    """Checkpoint every account's balance at the end of a day"""
+    try:
+        as_of = as_of or date.today() - timedelta(days=1)
+        written = await checkpoint_balances(session, as_of)
+        return {"as_of": as_of, "snapshots_written": written}
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to snapshot balances: {str(e)}")
+
+@router.get("/{account_id}", response_model=FinancialAccountOut)
+async def get_account(
+    account_id: int,
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Get a specific financial account by ID"""
+    try:
+        account = await session.get(FinancialAccount, account_id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+        return account
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch account: {str(e)}")
+
+@router.put("/{account_id}", response_model=FinancialAccountOut)
+async def update_account(
+    account_id: int,
+    updates: FinancialAccountUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
+):
+    """Update an account's name or type; balances only change through journal entries"""
+    try:
+        account = await session.get(FinancialAccount, account_id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+
+        update_data = updates.dict(exclude_unset=True)
+        if "balance" in update_data:
+            raise HTTPException(status_code=400, detail="Balances can only be changed by posting journal entries")
+        for key, value in update_data.items():
+            setattr(account, key, value)
+
+        await session.commit()
+        await session.refresh(account)
+        return account
+    except HTTPException:
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to update account: {str(e)}")
+
+@router.get("/{account_id}/balance", response_model=AccountBalanceOut)
+async def get_account_balance(
+    account_id: int,
+    as_of: Optional[date] = Query(None, description="Balance at the end of this day (defaults to the current balance)"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Get an account's balance, optionally as of a past date (nearest snapshot plus later lines)"""
+    try:
+        account = await session.get(FinancialAccount, account_id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+
+        if as_of is None:
+            return {"account_id": account.id, "as_of": date.today(), "balance": account.balance or 0, "snapshot_as_of": None}
+        return await balance_as_of(session, account_id, as_of)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch balance: {str(e)}")
+
+@router.get("/{account_id}/lines", response_model=List[JournalLineOut])
+async def get_account_lines(
+    account_id: int,
+    start_date: Optional[date] = Query(None, description="Filter by start date"),
+    end_date: Optional[date] = Query(None, description="Filter by end date"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Get the journal lines posted to an account, oldest first"""
+    try:
+        account = await session.get(FinancialAccount, account_id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+
+        query = select(JournalLine).where(JournalLine.account_id == account_id)
+
+        if start_date:
+            query = query.where(JournalLine.entry_date >= start_date)
+
+        if end_date:
+            query = query.where(JournalLine.entry_date <= end_date)
+
+        query = query.order_by(JournalLine.entry_date, JournalLine.id).offset(skip).limit(limit)
+        result = await session.execute(query)
+        return result.scalars().all()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch journal lines: {str(e)}")
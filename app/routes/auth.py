@@ -7,11 +7,11 @@ from sqlalchemy import select
 from datetime import datetime
 from uuid import UUID
 
-from ..database import get_session
+from ..database import get_session, get_read_session
 from ..models import User
 from ..schemas import UserLogin, UserRegister, Token, UserOut
-from ..auth import verify_password, get_password_hash, create_access_token, get_current_active_user
-from ..utils.email import send_email_async
+from ..auth import verify_password_async, get_password_hash_async, create_access_token, get_current_active_user, UserPrincipal
+from ..utils.outbox import email_outbox_message, outbox_worker
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -30,7 +30,7 @@ async def register_user(
             raise HTTPException(status_code=400, detail="Email already registered")
 
         # Hash the password
-        hashed_password = get_password_hash(data.password)
+        hashed_password = await get_password_hash_async(data.password)
 
         # Create user data without password
         user_data = data.dict()
@@ -39,14 +39,11 @@ async def register_user(
 
         new_user = User(**user_data)
         session.add(new_user)
-        await session.commit()
-        await session.refresh(new_user)
 
-        # Send welcome email (do not block registration if email fails)
-        try:
-            subject = "Welcome to CommunityPro Portal!"
-            body = f"""
-Hi {new_user.first_name},
+        # Welcome email goes through the outbox so it commits with the user
+        subject = "Welcome to CommunityPro Portal!"
+        body = f"""
+Hi {data.first_name},
 
 Welcome to the CommunityPro Portal! Your account has been created successfully.
 
@@ -55,9 +52,11 @@ We will be in touch soon.
 Best regards,
 CommunityPro Team
 """
-            await send_email_async(new_user.email, subject, body)
-        except Exception as e:
-            print(f"[WARN] Failed to send welcome email: {e}")
+        session.add(email_outbox_message(data.email, subject, body))
+
+        await session.commit()
+        await session.refresh(new_user)
+        outbox_worker.wake()
 
         return new_user
     except HTTPException:
@@ -86,7 +85,7 @@ async def login(
             )
         
         # Verify password
-        if not verify_password(user_credentials.password, user.password_hash):
+        if not await verify_password_async(user_credentials.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
@@ -139,7 +138,7 @@ async def login_form(
             )
         
         # Verify password
-        if not verify_password(form_data.password, user.password_hash):
+        if not await verify_password_async(form_data.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
@@ -174,33 +173,41 @@ async def login_form(
 
 @router.get("/me", response_model=UserOut)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get current user information"""
-    return current_user
+    user = await session.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 @router.post("/change-password")
 async def change_password(
     current_password: str,
     new_password: str,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_session)
 ):
     """Change user password"""
     try:
+        user = await session.get(User, current_user.id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
         # Verify current password
-        if not verify_password(current_password, current_user.password_hash):
+        if not await verify_password_async(current_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect current password"
             )
         
         # Hash new password
-        new_password_hash = get_password_hash(new_password)
+        new_password_hash = await get_password_hash_async(new_password)
         
         # Update password
-        current_user.password_hash = new_password_hash
-        current_user.updated_at = datetime.utcnow()
+        user.password_hash = new_password_hash
+        user.updated_at = datetime.utcnow()
         
         await session.commit()
         
@@ -0,0 +1,115 @@
+# routes/billing.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional, Union
+from datetime import date
+
+from ..database import get_session, get_read_session
+from ..models import BillingRun, Property
+from ..schemas import BillingRunCreate, BillingRunOut, BillingRunResult, Page
+from ..auth import require_roles, UserPrincipal
+from ..utils.pagination import paginate
+from ..utils.billing import bill_property, billing_period, units_without_resident
+from ..utils.late_fees import late_fee_job
+
+router = APIRouter(prefix="/billing", tags=["Billing"])
+
+@router.post("/runs", response_model=BillingRunResult, status_code=201)
+async def create_billing_run(
+    data: BillingRunCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
+):
+    """Charge every unit of the given properties (default: all) for a period.
+
+    Each property is billed and committed on its own, and a property already
+    billed for the period is skipped, so a failed run can simply be repeated.
+    Units left uncharged because they have no resident are listed in
+    ``unbilled_units`` so they can be charged by hand.
+    """
+    period = billing_period(data.period)
+    try:
+        query = select(Property.id).order_by(Property.id)
+        if data.property_ids is not None:
+            query = query.where(Property.id.in_(data.property_ids))
+        property_ids = (await session.execute(query)).scalars().all()
+        
+        missing = set(data.property_ids or []) - set(property_ids)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Properties not found: {sorted(missing)}")
+        
+        runs, already_billed, unbilled_units = [], [], []
+        for property_id in property_ids:
+            run = await bill_property(session, property_id, period, created_by=current_user.id)
+            if run is None:
+                already_billed.append(property_id)
+            else:
+                runs.append(run)
+                unbilled_units.extend(await units_without_resident(session, property_id))
+            await session.commit()
+        
+        return {"period": period, "runs": runs, "already_billed": already_billed, "unbilled_units": unbilled_units}
+    except HTTPException:
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to run billing: {str(e)}")
+
+@router.post("/late-fees/run")
+async def run_late_fees(
+    as_of: Optional[date] = Query(None, description="Treat this as today (defaults to today)"),
+    property_id: Optional[int] = Query(None, description="Only process this property"),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
+):
+    """Mark pending payments past due as overdue and charge their late fees now"""
+    try:
+        return await late_fee_job.run_once(
+            today=as_of, property_ids=[property_id] if property_id is not None else None
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to run late fees: {str(e)}")
+
+@router.get("/runs", response_model=Union[List[BillingRunOut], Page[BillingRunOut]])
+async def list_billing_runs(
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
+    property_id: Optional[int] = Query(None, description="Filter by property ID"),
+    period: Optional[date] = Query(None, description="Filter by billing period (any day of the month)"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Get billing runs with optional filtering and pagination"""
+    try:
+        query = select(BillingRun)
+        
+        if property_id:
+            query = query.where(BillingRun.property_id == property_id)
+        
+        if period:
+            query = query.where(BillingRun.period == billing_period(period))
+        
+        return await paginate(session, query, BillingRun, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch billing runs: {str(e)}")
+
+@router.get("/runs/{run_id}", response_model=BillingRunOut)
+async def get_billing_run(
+    run_id: int,
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Get a specific billing run by ID"""
+    try:
+        run = await session.get(BillingRun, run_id)
+        if not run:
+            raise HTTPException(status_code=404, detail="Billing run not found")
+        return run
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch billing run: {str(e)}")
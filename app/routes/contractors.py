@@ -2,59 +2,86 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Optional
+from sqlalchemy import select, func, or_
+from typing import List, Optional, Union
 from datetime import datetime, date
 from uuid import UUID
 
-from ..database import get_session
-from ..models import Contractor, User
-from ..schemas import ContractorCreate, ContractorUpdate, ContractorOut
-from ..auth import get_current_active_user, require_roles
+from ..database import get_session, get_read_session
+from ..models import Contractor, MaintenanceRequestEnhanced
+from ..schemas import ContractorCreate, ContractorUpdate, ContractorOut, ContractorDetail, Page
+from ..auth import get_current_active_user, require_roles, UserPrincipal
+from ..utils.pagination import paginate
+from ..utils.aggregation import Summary
+from ..utils.search import search_filter, order_by_relevance
+from ..utils.matching import contractor_index
+from ..utils.loading import parse_include, include_options, with_includes
+from ..utils.query_stats import query_budget
 
 router = APIRouter(prefix="/contractors", tags=["Contractors"])
 
+SEARCH_COLUMNS = (Contractor.name, Contractor.company, Contractor.email)
+
+CONTRACTOR_INCLUDES = ("maintenance_requests",)
+
+def _specialty_filter(specialty: str, match: str):
+    """Containment filter for a comma-separated specialty list.
+
+    Only ``@>`` is used (``jsonb_path_ops`` doesn't index ``?|``/``?&``):
+    "all" is one containment of the whole list, "any" ORs one per specialty.
+    """
+    specialties = [item.strip() for item in specialty.split(",") if item.strip()]
+    if not specialties:
+        return None
+    if match == "all":
+        return Contractor.specialties.contains(specialties)
+    return or_(*(Contractor.specialties.contains([item]) for item in specialties))
+
 @router.post("/", response_model=ContractorOut, status_code=201)
 async def create_contractor(
     data: ContractorCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Create a new contractor"""
     try:
         new_contractor = Contractor(**data.dict())
         session.add(new_contractor)
         await session.commit()
+        contractor_index.invalidate()
         await session.refresh(new_contractor)
         return new_contractor
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create contractor: {str(e)}")
 
-@router.get("/", response_model=List[ContractorOut])
+@router.get("/", response_model=Union[List[ContractorOut], Page[ContractorOut]])
 async def list_contractors(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     search: Optional[str] = Query(None, description="Search by name, company, or email"),
-    specialty: Optional[str] = Query(None, description="Filter by specialty"),
+    specialty: Optional[str] = Query(None, description="Filter by specialty; comma-separate several"),
+    match: str = Query("any", pattern="^(any|all)$", description="With several specialties: match any or all of them"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum rating filter"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    sort: str = Query("created", pattern="^(created|relevance)$", description="Order by creation time, or by search relevance (offset pagination only)"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all contractors with optional filtering and pagination"""
     try:
         query = select(Contractor)
         
         if search:
-            query = query.where(
-                (Contractor.name.ilike(f"%{search}%")) | 
-                (Contractor.company.ilike(f"%{search}%")) |
-                (Contractor.email.ilike(f"%{search}%"))
-            )
+            query = query.where(search_filter(SEARCH_COLUMNS, search))
+            if sort == "relevance":
+                query = order_by_relevance(query, SEARCH_COLUMNS, search, cursor)
         
         if specialty:
-            query = query.where(Contractor.specialties.contains([specialty]))
+            specialty_filter = _specialty_filter(specialty, match)
+            if specialty_filter is not None:
+                query = query.where(specialty_filter)
         
         if is_active is not None:
             query = query.where(Contractor.is_active == is_active)
@@ -62,24 +89,27 @@ async def list_contractors(
         if min_rating is not None:
             query = query.where(Contractor.rating >= min_rating)
         
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+        return await paginate(session, query, Contractor, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch contractors: {str(e)}")
 
-@router.get("/{contractor_id}", response_model=ContractorOut)
+@router.get("/{contractor_id}", response_model=ContractorDetail, response_model_exclude_unset=True)
+@query_budget(3)
 async def get_contractor(
     contractor_id: UUID, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: maintenance_requests"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get a specific contractor by ID"""
     try:
-        contractor = await session.get(Contractor, contractor_id)
+        includes = parse_include(include, CONTRACTOR_INCLUDES)
+        contractor = await session.get(Contractor, contractor_id, options=include_options(Contractor, includes))
         if not contractor:
             raise HTTPException(status_code=404, detail="Contractor not found")
-        return contractor
+        return with_includes(ContractorDetail, ContractorOut, contractor, includes)
     except HTTPException:
         raise
     except Exception as e:
@@ -90,7 +120,7 @@ async def update_contractor(
     contractor_id: UUID, 
     updates: ContractorUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Update a contractor"""
     try:
@@ -104,6 +134,7 @@ async def update_contractor(
         
         contractor.updated_at = datetime.utcnow()
         await session.commit()
+        contractor_index.invalidate()
         await session.refresh(contractor)
         return contractor
     except HTTPException:
@@ -116,7 +147,7 @@ async def update_contractor(
 async def delete_contractor(
     contractor_id: UUID, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Delete a contractor"""
     try:
@@ -126,6 +157,7 @@ async def delete_contractor(
 
         await session.delete(contractor)
         await session.commit()
+        contractor_index.invalidate()
     except HTTPException:
         raise
     except Exception as e:
@@ -137,8 +169,8 @@ async def get_contractors_by_specialty(
     specialty: str,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all contractors with a specific specialty"""
     try:
@@ -149,25 +181,25 @@ async def get_contractors_by_specialty(
         raise HTTPException(status_code=500, detail=f"Failed to fetch contractors: {str(e)}")
 
 @router.get("/stats/summary", response_model=dict)
+@query_budget(2)
 async def get_contractor_summary(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get contractor summary statistics"""
     try:
-        # Get total count
-        total_count = await session.scalar(select(func.count(Contractor.id)))
-        
-        # Get active count
-        active_count = await session.scalar(select(func.count(Contractor.id)).where(Contractor.is_active == True))
-        
-        # Get average rating
-        avg_rating = await session.scalar(select(func.avg(Contractor.rating)))
-        
-        # Get count by rating range
-        high_rated = await session.scalar(
-            select(func.count(Contractor.id)).where(Contractor.rating >= 4.0)
+        stats = await (
+            Summary(Contractor)
+            .count("total_count")
+            .count("active_count", Contractor.is_active == True)
+            .avg("avg_rating", Contractor.rating)
+            .count("high_rated", Contractor.rating >= 4.0)
+            .fetch(session)
         )
+        total_count = stats["total_count"]
+        active_count = stats["active_count"]
+        avg_rating = stats["avg_rating"]
+        high_rated = stats["high_rated"]
         
         return {
             "total_contractors": total_count or 0,
@@ -180,23 +212,31 @@ async def get_contractor_summary(
         raise HTTPException(status_code=500, detail=f"Failed to fetch contractor summary: {str(e)}")
 
 @router.get("/{contractor_id}/maintenance-requests", response_model=dict)
+@query_budget(2)
 async def get_contractor_maintenance_requests(
     contractor_id: UUID,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get maintenance requests assigned to a specific contractor"""
     try:
-        contractor = await session.get(Contractor, contractor_id)
-        if not contractor:
+        # Name and request count in one query; the collection itself is never loaded
+        request_count = (
+            select(func.count())
+            .select_from(MaintenanceRequestEnhanced)
+            .where(MaintenanceRequestEnhanced.contractor_id == Contractor.id)
+            .scalar_subquery()
+        )
+        row = (await session.execute(
+            select(Contractor.name, request_count.label("request_count")).where(Contractor.id == contractor_id)
+        )).first()
+        if not row:
             raise HTTPException(status_code=404, detail="Contractor not found")
         
-        # This would need to be implemented when we have the maintenance requests relationship
-        # For now, return basic contractor info
         return {
             "contractor_id": contractor_id,
-            "contractor_name": contractor.name,
-            "maintenance_requests_count": len(contractor.maintenance_requests) if contractor.maintenance_requests else 0
+            "contractor_name": row.name,
+            "maintenance_requests_count": row.request_count
         }
     except HTTPException:
         raise
@@ -0,0 +1,37 @@
+# routes/internal.py
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_session, pool_stats, read_engine
+from ..utils.rollups import rebuild_payment_rollups
+from ..auth import require_role, UserPrincipal
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+@router.get("/pool")
+async def get_pool_stats(
+    current_user: UserPrincipal = Depends(require_role("super_admin"))
+):
+    """Connection pool usage for this worker process"""
+    try:
+        stats = pool_stats()
+        if read_engine is not None:
+            stats["replica"] = pool_stats(read_engine)
+        return stats
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch pool stats: {str(e)}")
+
+@router.post("/rollups/payments/rebuild")
+async def rebuild_payment_rollup_tables(
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(require_role("super_admin"))
+):
+    """Recompute the payment rollups from the payments table"""
+    try:
+        await rebuild_payment_rollups(session)
+        await session.commit()
+        return {"message": "Payment rollups rebuilt"}
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild payment rollups: {str(e)}")
@@ -3,13 +3,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime, date
 
-from ..database import get_session
-from ..models import MaintenanceRequest, Resident, Unit, User
-from ..schemas import MaintenanceRequestCreate, MaintenanceRequestUpdate, MaintenanceRequestOut
-from ..auth import get_current_active_user, require_roles
+from ..database import get_session, get_read_session
+from ..models import MaintenanceRequest, Resident, Unit, MaintenanceStatus, Priority
+from ..schemas import MaintenanceRequestCreate, MaintenanceRequestUpdate, MaintenanceRequestOut, Page
+from ..auth import get_current_active_user, require_roles, UserPrincipal
+from ..utils.pagination import paginate
+from ..utils.aggregation import Summary
+from ..utils.query_stats import query_budget
 
 router = APIRouter(prefix="/maintenance", tags=["Maintenance Requests"])
 
@@ -17,7 +20,7 @@ router = APIRouter(prefix="/maintenance", tags=["Maintenance Requests"])
 async def create_maintenance_request(
     data: MaintenanceRequestCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Create a new maintenance request"""
     try:
@@ -42,18 +45,19 @@ async def create_maintenance_request(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create maintenance request: {str(e)}")
 
-@router.get("/", response_model=List[MaintenanceRequestOut])
+@router.get("/", response_model=Union[List[MaintenanceRequestOut], Page[MaintenanceRequestOut]])
 async def list_maintenance_requests(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     unit_id: Optional[int] = Query(None, description="Filter by unit ID"),
     resident_id: Optional[int] = Query(None, description="Filter by resident ID"),
     priority: Optional[str] = Query(None, description="Filter by priority"),
     status: Optional[str] = Query(None, description="Filter by status"),
     category: Optional[str] = Query(None, description="Filter by category"),
     assigned_to: Optional[str] = Query(None, description="Filter by assigned person"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all maintenance requests with optional filtering and pagination"""
     try:
@@ -77,17 +81,17 @@ async def list_maintenance_requests(
         if assigned_to:
             query = query.where(MaintenanceRequest.assigned_to.ilike(f"%{assigned_to}%"))
         
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+        return await paginate(session, query, MaintenanceRequest, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch maintenance requests: {str(e)}")
 
 @router.get("/{request_id}", response_model=MaintenanceRequestOut)
 async def get_maintenance_request(
     request_id: int, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get a specific maintenance request by ID"""
     try:
@@ -105,7 +109,7 @@ async def update_maintenance_request(
     request_id: int, 
     updates: MaintenanceRequestUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Update a maintenance request"""
     try:
@@ -131,7 +135,7 @@ async def update_maintenance_request(
 async def delete_maintenance_request(
     request_id: int, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Delete a maintenance request"""
     try:
@@ -152,8 +156,8 @@ async def get_maintenance_requests_by_unit(
     unit_id: int,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all maintenance requests for a specific unit"""
     try:
@@ -175,8 +179,8 @@ async def get_maintenance_requests_by_resident(
     resident_id: int,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all maintenance requests for a specific resident"""
     try:
@@ -194,38 +198,27 @@ async def get_maintenance_requests_by_resident(
         raise HTTPException(status_code=500, detail=f"Failed to fetch maintenance requests: {str(e)}")
 
 @router.get("/stats/summary", response_model=dict)
+@query_budget(2)
 async def get_maintenance_summary(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get maintenance request summary statistics"""
     try:
-        # Get counts by status
-        status_counts = await session.execute(
-            select(
-                MaintenanceRequest.status,
-                func.count(MaintenanceRequest.id).label("count")
-            ).group_by(MaintenanceRequest.status)
-        )
-        
-        # Get counts by priority
-        priority_counts = await session.execute(
-            select(
-                MaintenanceRequest.priority,
-                func.count(MaintenanceRequest.id).label("count")
-            ).group_by(MaintenanceRequest.priority)
-        )
-        
-        # Get total cost
-        total_cost = await session.execute(
-            select(func.sum(MaintenanceRequest.actual_cost))
+        stats = await (
+            Summary(MaintenanceRequest)
+            .count("total_requests")
+            .count_by("status_counts", MaintenanceRequest.status, [(status.value, status) for status in MaintenanceStatus])
+            .count_by("priority_counts", MaintenanceRequest.priority, [(priority.value, priority) for priority in Priority])
+            .sum("total_cost", MaintenanceRequest.actual_cost)
+            .fetch(session)
         )
         
         return {
-            "status_counts": {row.status.value: row.count for row in status_counts},
-            "priority_counts": {row.priority.value: row.count for row in priority_counts},
-            "total_cost": float(total_cost.scalar() or 0),
-            "total_requests": sum(row.count for row in status_counts)
+            "status_counts": stats["status_counts"],
+            "priority_counts": stats["priority_counts"],
+            "total_cost": float(stats["total_cost"] or 0),
+            "total_requests": stats["total_requests"] or 0
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch maintenance summary: {str(e)}") 
\ No newline at end of file
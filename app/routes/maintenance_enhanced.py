@@ -1,32 +1,87 @@
 # routes/maintenance_enhanced.py
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from typing import List, Optional
+from sqlalchemy import select, func, and_, update, case, bindparam, any_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import selectinload
+from typing import List, Optional, Union
 from datetime import datetime, date
-from uuid import UUID
+from uuid import UUID, uuid4
+import json
+import os
 
-from ..database import get_session
-from ..models import MaintenanceRequestEnhanced, MaintenanceWorkLog, Contractor, User
+from ..database import get_session, get_read_session
+from ..models import MaintenanceRequestEnhanced, MaintenanceWorkLog, Contractor, MaintenanceStatusEnhanced, Priority
 from ..schemas import (
     MaintenanceRequestEnhancedCreate, 
     MaintenanceRequestEnhancedUpdate, 
     MaintenanceRequestEnhancedOut,
+    MaintenanceRequestEnhancedDetail,
     MaintenanceWorkLogCreate,
     MaintenanceWorkLogUpdate,
-    MaintenanceWorkLogOut
+    MaintenanceWorkLogOut,
+    MaintenanceRequestMatchOut,
+    ContractorMatch,
+    DispatchResult,
+    DispatchAssignment,
+    BulkItemError,
+    BulkWorkLogResult,
+    Page
 )
-from ..auth import get_current_active_user, require_roles
+from ..auth import get_current_active_user, require_roles, UserPrincipal
+from ..utils.pagination import paginate
+from ..utils.export import export_response
+from ..utils.aggregation import Summary
+from ..utils.search import search_filter, order_by_relevance
+from ..utils.matching import contractor_index, open_workloads, rank, dispatcher_for
+from ..utils.bulk import copy_rows_reporting
+from ..utils.loading import parse_include, include_options, with_includes
+from ..utils.query_stats import query_budget
 
 router = APIRouter(prefix="/maintenance-enhanced", tags=["Enhanced Maintenance"])
 
+SEARCH_COLUMNS = (MaintenanceRequestEnhanced.title, MaintenanceRequestEnhanced.description)
+
+REQUEST_INCLUDES = ("work_logs", "contractor")
+
+WORK_LOG_BULK_MAX_ITEMS = int(os.getenv("WORK_LOG_BULK_MAX_ITEMS", 50000))
+
+WORK_LOG_COPY_COLUMNS = (
+    "id", "maintenance_request_id", "worker_id", "worker_name", "work_date", "hours_worked",
+    "work_description", "materials_used", "cost", "images", "created_by",
+)
+
+def _filter_maintenance_requests(query, status, priority, category, unit_id, property_id,
+                                 resident_id, contractor_id, is_emergency, search):
+    """Apply the list/export filters shared by the enhanced request listing routes"""
+    if status:
+        query = query.where(MaintenanceRequestEnhanced.status == status)
+    if priority:
+        query = query.where(MaintenanceRequestEnhanced.priority == priority)
+    if category:
+        query = query.where(MaintenanceRequestEnhanced.category == category)
+    if unit_id:
+        query = query.where(MaintenanceRequestEnhanced.unit_id == unit_id)
+    if property_id:
+        query = query.where(MaintenanceRequestEnhanced.property_id == property_id)
+    if resident_id:
+        query = query.where(MaintenanceRequestEnhanced.resident_id == resident_id)
+    if contractor_id:
+        query = query.where(MaintenanceRequestEnhanced.contractor_id == contractor_id)
+    if is_emergency is not None:
+        query = query.where(MaintenanceRequestEnhanced.is_emergency == is_emergency)
+    if search:
+        query = query.where(search_filter(SEARCH_COLUMNS, search))
+    return query
+
 # Enhanced Maintenance Request Routes
 @router.post("/requests/", response_model=MaintenanceRequestEnhancedOut, status_code=201)
 async def create_maintenance_request(
     data: MaintenanceRequestEnhancedCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Create a new enhanced maintenance request"""
     try:
@@ -39,10 +94,11 @@ async def create_maintenance_request(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create maintenance request: {str(e)}")
 
-@router.get("/requests/", response_model=List[MaintenanceRequestEnhancedOut])
+@router.get("/requests/", response_model=Union[List[MaintenanceRequestEnhancedOut], Page[MaintenanceRequestEnhancedOut]])
 async def list_maintenance_requests(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     status: Optional[str] = Query(None, description="Filter by status"),
     priority: Optional[str] = Query(None, description="Filter by priority"),
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -52,53 +108,136 @@ async def list_maintenance_requests(
     contractor_id: Optional[UUID] = Query(None, description="Filter by contractor ID"),
     is_emergency: Optional[bool] = Query(None, description="Filter by emergency status"),
     search: Optional[str] = Query(None, description="Search in title and description"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    sort: str = Query("created", pattern="^(created|relevance)$", description="Order by creation time, or by search relevance (offset pagination only)"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all enhanced maintenance requests with filtering and pagination"""
     try:
-        query = select(MaintenanceRequestEnhanced)
-        
-        if status:
-            query = query.where(MaintenanceRequestEnhanced.status == status)
-        if priority:
-            query = query.where(MaintenanceRequestEnhanced.priority == priority)
-        if category:
-            query = query.where(MaintenanceRequestEnhanced.category == category)
-        if unit_id:
-            query = query.where(MaintenanceRequestEnhanced.unit_id == unit_id)
+        query = _filter_maintenance_requests(
+            select(MaintenanceRequestEnhanced), status, priority, category, unit_id,
+            property_id, resident_id, contractor_id, is_emergency, search
+        )
+        if search and sort == "relevance":
+            query = order_by_relevance(query, SEARCH_COLUMNS, search, cursor)
+        return await paginate(session, query, MaintenanceRequestEnhanced, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch maintenance requests: {str(e)}")
+
+@router.get("/requests/export")
+async def export_maintenance_requests(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    priority: Optional[str] = Query(None, description="Filter by priority"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    unit_id: Optional[UUID] = Query(None, description="Filter by unit ID"),
+    property_id: Optional[UUID] = Query(None, description="Filter by property ID"),
+    resident_id: Optional[UUID] = Query(None, description="Filter by resident ID"),
+    contractor_id: Optional[UUID] = Query(None, description="Filter by contractor ID"),
+    is_emergency: Optional[bool] = Query(None, description="Filter by emergency status"),
+    search: Optional[str] = Query(None, description="Search in title and description"),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Stream every matching enhanced maintenance request as NDJSON or CSV"""
+    query = _filter_maintenance_requests(
+        select(*MaintenanceRequestEnhanced.__table__.c), status, priority, category, unit_id,
+        property_id, resident_id, contractor_id, is_emergency, search
+    ).order_by(MaintenanceRequestEnhanced.created_at, MaintenanceRequestEnhanced.id)
+    return export_response(query, format, "maintenance_requests")
+
+@router.post("/requests/match", response_model=DispatchResult)
+async def dispatch_pending_requests(
+    property_id: Optional[UUID] = Query(None, description="Only dispatch requests for this property"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum number of requests to dispatch"),
+    dry_run: bool = Query(False, description="Compute assignments without saving them"),
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
+):
+    """Assign the best available contractor to every unassigned pending request, most urgent first"""
+    try:
+        urgency = case(
+            {Priority.emergency: 0, Priority.high: 1, Priority.medium: 2, Priority.low: 3},
+            value=MaintenanceRequestEnhanced.priority,
+        )
+        query = (
+            select(MaintenanceRequestEnhanced.id, MaintenanceRequestEnhanced.category)
+            .where(
+                MaintenanceRequestEnhanced.status == MaintenanceStatusEnhanced.pending,
+                MaintenanceRequestEnhanced.contractor_id.is_(None),
+            )
+            .order_by(
+                MaintenanceRequestEnhanced.is_emergency.desc(), urgency,
+                MaintenanceRequestEnhanced.created_at, MaintenanceRequestEnhanced.id,
+            )
+            .limit(limit)
+        )
         if property_id:
             query = query.where(MaintenanceRequestEnhanced.property_id == property_id)
-        if resident_id:
-            query = query.where(MaintenanceRequestEnhanced.resident_id == resident_id)
-        if contractor_id:
-            query = query.where(MaintenanceRequestEnhanced.contractor_id == contractor_id)
-        if is_emergency is not None:
-            query = query.where(MaintenanceRequestEnhanced.is_emergency == is_emergency)
-        if search:
-            query = query.where(
-                (MaintenanceRequestEnhanced.title.ilike(f"%{search}%")) |
-                (MaintenanceRequestEnhanced.description.ilike(f"%{search}%"))
+        if not dry_run:
+            # Concurrent dispatch runs skip each other's rows instead of double-assigning
+            query = query.with_for_update(skip_locked=True, of=MaintenanceRequestEnhanced)
+
+        pending = (await session.execute(query)).all()
+        dispatcher = await dispatcher_for(session, [row.category.value for row in pending], date.today())
+
+        assignments = []
+        unmatched = []
+        for row in pending:
+            match = dispatcher.assign(row.category.value)
+            if match is None:
+                unmatched.append(row.id)
+                continue
+            match_score, candidate = match
+            assignments.append(DispatchAssignment(
+                request_id=row.id,
+                contractor_id=candidate.id,
+                contractor_name=candidate.name,
+                score=match_score,
+            ))
+
+        if dry_run or not assignments:
+            await session.rollback()
+        else:
+            table = MaintenanceRequestEnhanced.__table__
+            await session.execute(
+                update(table)
+                .where(table.c.id == bindparam("request_id"))
+                .values(
+                    contractor_id=bindparam("contractor_id"),
+                    assigned_to_name=bindparam("contractor_name"),
+                    updated_by=current_user.id,
+                ),
+                [assignment.dict(include={"request_id", "contractor_id", "contractor_name"}) for assignment in assignments],
             )
-        
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+            await session.commit()
+
+        return DispatchResult(dry_run=dry_run, considered=len(pending), assignments=assignments, unmatched=unmatched)
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch maintenance requests: {str(e)}")
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to dispatch maintenance requests: {str(e)}")
 
-@router.get("/requests/{request_id}", response_model=MaintenanceRequestEnhancedOut)
+@router.get("/requests/{request_id}", response_model=MaintenanceRequestEnhancedDetail, response_model_exclude_unset=True)
+@query_budget(4)
 async def get_maintenance_request(
     request_id: UUID, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: work_logs, contractor"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get a specific enhanced maintenance request by ID"""
     try:
-        request = await session.get(MaintenanceRequestEnhanced, request_id)
+        includes = parse_include(include, REQUEST_INCLUDES)
+        request = await session.get(
+            MaintenanceRequestEnhanced, request_id,
+            options=include_options(MaintenanceRequestEnhanced, includes)
+        )
         if not request:
             raise HTTPException(status_code=404, detail="Maintenance request not found")
-        return request
+        return with_includes(MaintenanceRequestEnhancedDetail, MaintenanceRequestEnhancedOut, request, includes)
     except HTTPException:
         raise
     except Exception as e:
@@ -109,7 +248,7 @@ async def update_maintenance_request(
     request_id: UUID, 
     updates: MaintenanceRequestEnhancedUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Update an enhanced maintenance request"""
     try:
@@ -135,7 +274,7 @@ async def update_maintenance_request(
 async def delete_maintenance_request(
     request_id: UUID, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Delete an enhanced maintenance request"""
     try:
@@ -151,15 +290,73 @@ async def delete_maintenance_request(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to delete maintenance request: {str(e)}")
 
+@router.post("/requests/{request_id}/match", response_model=MaintenanceRequestMatchOut)
+async def match_maintenance_request(
+    request_id: UUID,
+    limit: int = Query(5, ge=1, le=50, description="Number of ranked contractors to return"),
+    assign: bool = Query(False, description="Assign the best match to the request"),
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
+):
+    """Rank active, insured contractors for a request by specialty, rating and open workload"""
+    try:
+        request = await session.get(MaintenanceRequestEnhanced, request_id)
+        if not request:
+            raise HTTPException(status_code=404, detail="Maintenance request not found")
+
+        await contractor_index.ensure_loaded(session)
+        candidates = contractor_index.candidates(request.category.value, date.today())
+        workloads = await open_workloads(session, [candidate.id for candidate in candidates])
+        ranked = rank(candidates, workloads, limit)
+
+        assigned_contractor_id = None
+        if assign:
+            if not ranked:
+                raise HTTPException(status_code=409, detail="No eligible contractor for this request")
+            best = ranked[0][1]
+            request.contractor_id = best.id
+            request.assigned_to_name = best.name
+            request.updated_by = current_user.id
+            request.updated_at = datetime.utcnow()
+            await session.commit()
+            assigned_contractor_id = best.id
+
+        return MaintenanceRequestMatchOut(
+            request_id=request_id,
+            category=request.category,
+            candidates=[
+                ContractorMatch(
+                    contractor_id=candidate.id,
+                    name=candidate.name,
+                    company=candidate.company,
+                    rating=candidate.rating,
+                    insurance_expiry=candidate.insurance_expiry,
+                    open_requests=workload,
+                    score=match_score,
+                )
+                for match_score, candidate, workload in ranked
+            ],
+            assigned_contractor_id=assigned_contractor_id,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to match maintenance request: {str(e)}")
+
 @router.get("/requests/{request_id}/work-logs", response_model=List[MaintenanceWorkLogOut])
+@query_budget(3)
 async def get_maintenance_work_logs(
     request_id: UUID,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all work logs for a specific maintenance request"""
     try:
-        request = await session.get(MaintenanceRequestEnhanced, request_id)
+        request = await session.get(
+            MaintenanceRequestEnhanced, request_id,
+            options=[selectinload(MaintenanceRequestEnhanced.work_logs)]
+        )
         if not request:
             raise HTTPException(status_code=404, detail="Maintenance request not found")
         
@@ -170,41 +367,29 @@ async def get_maintenance_work_logs(
         raise HTTPException(status_code=500, detail=f"Failed to fetch work logs: {str(e)}")
 
 @router.get("/stats/summary", response_model=dict)
+@query_budget(2)
 async def get_maintenance_summary(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get maintenance request summary statistics"""
     try:
-        # Get total count
-        total_count = await session.scalar(select(func.count(MaintenanceRequestEnhanced.id)))
-        
-        # Get counts by status
-        pending_count = await session.scalar(
-            select(func.count(MaintenanceRequestEnhanced.id))
-            .where(MaintenanceRequestEnhanced.status == "pending")
-        )
-        
-        in_progress_count = await session.scalar(
-            select(func.count(MaintenanceRequestEnhanced.id))
-            .where(MaintenanceRequestEnhanced.status == "in_progress")
-        )
-        
-        completed_count = await session.scalar(
-            select(func.count(MaintenanceRequestEnhanced.id))
-            .where(MaintenanceRequestEnhanced.status == "completed")
-        )
-        
-        emergency_count = await session.scalar(
-            select(func.count(MaintenanceRequestEnhanced.id))
-            .where(MaintenanceRequestEnhanced.is_emergency == True)
-        )
-        
-        # Get average estimated cost
-        avg_estimated_cost = await session.scalar(
-            select(func.avg(MaintenanceRequestEnhanced.estimated_cost))
-            .where(MaintenanceRequestEnhanced.estimated_cost.isnot(None))
+        stats = await (
+            Summary(MaintenanceRequestEnhanced)
+            .count("total_count")
+            .count("pending_count", MaintenanceRequestEnhanced.status == MaintenanceStatusEnhanced.pending)
+            .count("in_progress_count", MaintenanceRequestEnhanced.status == MaintenanceStatusEnhanced.in_progress)
+            .count("completed_count", MaintenanceRequestEnhanced.status == MaintenanceStatusEnhanced.completed)
+            .count("emergency_count", MaintenanceRequestEnhanced.is_emergency == True)
+            .avg("avg_estimated_cost", MaintenanceRequestEnhanced.estimated_cost)
+            .fetch(session)
         )
+        total_count = stats["total_count"]
+        pending_count = stats["pending_count"]
+        in_progress_count = stats["in_progress_count"]
+        completed_count = stats["completed_count"]
+        emergency_count = stats["emergency_count"]
+        avg_estimated_cost = stats["avg_estimated_cost"]
         
         return {
             "total_requests": total_count or 0,
@@ -222,7 +407,7 @@ async def get_maintenance_summary(
 async def create_work_log(
     data: MaintenanceWorkLogCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Create a new maintenance work log"""
     try:
@@ -242,15 +427,120 @@ async def create_work_log(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create work log: {str(e)}")
 
-@router.get("/work-logs/", response_model=List[MaintenanceWorkLogOut])
+async def _lines(stream):
+    """Split a byte stream into lines without holding more than one partial line"""
+    pending = b""
+    async for chunk in stream:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+async def _parse_bulk_body(request: Request):
+    """Yield ``(index, item_or_error)`` from a JSON array or an NDJSON body;
+    NDJSON is parsed as it arrives instead of being read into memory first"""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        index = 0
+        async for line in _lines(request.stream()):
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line)
+            except ValueError as e:
+                yield index, BulkItemError(index=index, error=f"Invalid JSON: {e}")
+            index += 1
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of work logs")
+    for index, item in enumerate(items):
+        yield index, item
+
+@router.post("/work-logs/bulk", response_model=BulkWorkLogResult)
+async def bulk_create_work_logs(
+    http_request: Request,
+    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Create many work logs at once from a JSON array or an NDJSON body
+    (``Content-Type: application/x-ndjson``). Valid items are inserted in one
+    COPY; invalid ones, those whose maintenance request does not exist, and
+    any the database rejects are reported by position in ``errors``."""
+    try:
+        errors = []
+        valid = []
+        received = 0
+        async for index, item in _parse_bulk_body(http_request):
+            received += 1
+            if received > WORK_LOG_BULK_MAX_ITEMS:
+                raise HTTPException(status_code=413, detail=f"At most {WORK_LOG_BULK_MAX_ITEMS} work logs per request")
+            if isinstance(item, BulkItemError):
+                errors.append(item)
+                continue
+            if not isinstance(item, dict):
+                errors.append(BulkItemError(index=index, error="Expected a JSON object"))
+                continue
+            try:
+                valid.append((index, MaintenanceWorkLogCreate(**item)))
+            except ValidationError as e:
+                errors.append(BulkItemError(index=index, error=str(e)))
+
+        # One round trip to check every referenced request
+        parent_ids = list({log.maintenance_request_id for _, log in valid})
+        existing = set()
+        if parent_ids:
+            result = await session.execute(
+                select(MaintenanceRequestEnhanced.id).where(
+                    MaintenanceRequestEnhanced.id == any_(bindparam("ids", parent_ids, type_=ARRAY(PG_UUID(as_uuid=True))))
+                )
+            )
+            existing = set(result.scalars().all())
+
+        records = []
+        indexes = []
+        for index, log in valid:
+            if log.maintenance_request_id not in existing:
+                errors.append(BulkItemError(index=index, error="Maintenance request not found"))
+                continue
+            indexes.append(index)
+            records.append((
+                uuid4(), log.maintenance_request_id, log.worker_id, log.worker_name, log.work_date,
+                log.hours_worked, log.work_description, log.materials_used or [],
+                log.cost if log.cost is not None else 0, log.images or [], log.created_by,
+            ))
+
+        inserted, failures = await copy_rows_reporting(
+            session, MaintenanceWorkLog.__table__, WORK_LOG_COPY_COLUMNS, records, indexes
+        )
+        errors.extend(BulkItemError(index=index, error=error) for index, error in failures)
+        await session.commit()
+
+        errors.sort(key=lambda error: error.index)
+        return BulkWorkLogResult(received=received, inserted=inserted, errors=errors)
+    except HTTPException:
+        await session.rollback()
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to create work logs: {str(e)}")
+
+@router.get("/work-logs/", response_model=Union[List[MaintenanceWorkLogOut], Page[MaintenanceWorkLogOut]])
 async def list_work_logs(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     maintenance_request_id: Optional[UUID] = Query(None, description="Filter by maintenance request ID"),
     worker_name: Optional[str] = Query(None, description="Filter by worker name"),
     work_date: Optional[date] = Query(None, description="Filter by work date"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get all maintenance work logs with filtering and pagination"""
     try:
@@ -263,17 +553,17 @@ async def list_work_logs(
         if work_date:
             query = query.where(MaintenanceWorkLog.work_date == work_date)
         
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+        return await paginate(session, query, MaintenanceWorkLog, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch work logs: {str(e)}")
 
 @router.get("/work-logs/{work_log_id}", response_model=MaintenanceWorkLogOut)
 async def get_work_log(
     work_log_id: UUID, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get a specific maintenance work log by ID"""
     try:
@@ -291,7 +581,7 @@ async def update_work_log(
     work_log_id: UUID, 
     updates: MaintenanceWorkLogUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Update a maintenance work log"""
     try:
@@ -316,7 +606,7 @@ async def update_work_log(
 async def delete_work_log(
     work_log_id: UUID, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Delete a maintenance work log"""
     try:
@@ -333,23 +623,25 @@ async def delete_work_log(
         raise HTTPException(status_code=400, detail=f"Failed to delete work log: {str(e)}")
 
 @router.get("/work-logs/stats/summary", response_model=dict)
+@query_budget(2)
 async def get_work_log_summary(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get work log summary statistics"""
     try:
-        # Get total count
-        total_count = await session.scalar(select(func.count(MaintenanceWorkLog.id)))
-        
-        # Get total hours worked
-        total_hours = await session.scalar(select(func.sum(MaintenanceWorkLog.hours_worked)))
-        
-        # Get total cost
-        total_cost = await session.scalar(select(func.sum(MaintenanceWorkLog.cost)))
-        
-        # Get average hours per work log
-        avg_hours = await session.scalar(select(func.avg(MaintenanceWorkLog.hours_worked)))
+        stats = await (
+            Summary(MaintenanceWorkLog)
+            .count("total_count")
+            .sum("total_hours", MaintenanceWorkLog.hours_worked)
+            .sum("total_cost", MaintenanceWorkLog.cost)
+            .avg("avg_hours", MaintenanceWorkLog.hours_worked)
+            .fetch(session)
+        )
+        total_count = stats["total_count"]
+        total_hours = stats["total_hours"]
+        total_cost = stats["total_cost"]
+        avg_hours = stats["avg_hours"]
         
         return {
             "total_work_logs": total_count or 0,
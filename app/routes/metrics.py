@@ -0,0 +1,96 @@
+# routes/metrics.py
+
+import hmac
+import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from dotenv import load_dotenv
+
+from ..database import pool_stats, read_engine
+from ..utils.email import email_dispatcher
+from ..utils.hashing import password_hasher
+from ..utils.idempotency import response_cache
+from ..utils.late_fees import late_fee_job
+from ..utils.outbox import outbox_worker
+from ..utils.user_cache import user_cache
+from ..utils.metrics import registry, stats_metrics
+
+load_dotenv()
+
+# Optional bearer token the scraper must present
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+router = APIRouter(tags=["Metrics"])
+
+pools = {"primary": pool_stats}
+if read_engine is not None:
+    pools["replica"] = lambda: pool_stats(read_engine)
+
+stats_metrics("hoa_db_pool", {
+    "size": "Configured pool size",
+    "checked_out": "Connections currently checked out",
+    "overflow": "Connections opened beyond the pool size (negative while the pool is filling)",
+    "average_wait_seconds": "Average time spent waiting to check out a connection",
+    "max_wait_seconds": "Longest checkout wait",
+}, pools, label="pool")
+stats_metrics("hoa_db_pool", {
+    "timeouts": "Checkouts that timed out waiting for a connection",
+}, pools, label="pool", kind="counter")
+
+stats_metrics("hoa_email", {
+    "queue_depth": "Messages waiting for an SMTP worker",
+    "retry_pending": "Messages waiting out a retry backoff",
+}, {None: email_dispatcher.stats})
+stats_metrics("hoa_email", {
+    "sent": "Messages delivered",
+    "failed": "Messages given up on",
+}, {None: email_dispatcher.stats}, kind="counter")
+
+stats_metrics("hoa_password_hasher", {
+    "in_flight": "Hash/verify jobs running or queued",
+    "queued": "Jobs waiting for a free worker",
+    "saturation": "In-flight jobs as a share of capacity (workers + queue)",
+}, {None: password_hasher.stats})
+stats_metrics("hoa_password_hasher", {
+    "rejected": "Jobs rejected with 429 because the pool was full",
+}, {None: password_hasher.stats}, kind="counter")
+
+stats_metrics("hoa_outbox", {
+    "delivered": "Outbox messages delivered by this process",
+    "retried": "Outbox delivery attempts scheduled for retry",
+    "failed": "Outbox messages that exhausted their attempts",
+}, {None: outbox_worker.stats}, kind="counter")
+
+stats_metrics("hoa_late_fees", {
+    "runs": "Late fee runs completed by this process",
+    "marked_overdue": "Payments marked overdue",
+    "fees_created": "Late fee charges created",
+}, {None: late_fee_job.stats}, kind="counter")
+
+stats_metrics("hoa_idempotency_cache", {
+    "size": "Stored idempotent responses cached in this process",
+}, {None: response_cache.stats})
+stats_metrics("hoa_idempotency_cache", {
+    "hits": "Idempotent replays answered from the process cache",
+    "misses": "Idempotency-Key lookups that went to the database",
+}, {None: response_cache.stats}, kind="counter")
+
+stats_metrics("hoa_user_cache", {
+    "size": "Cached user principals",
+}, {None: user_cache.stats})
+stats_metrics("hoa_user_cache", {
+    "hits": "Principal cache hits",
+    "misses": "Principal cache misses",
+}, {None: user_cache.stats}, kind="counter")
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus scrape endpoint"""
+    if METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, METRICS_TOKEN):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    try:
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to render metrics: {str(e)}")
@@ -3,21 +3,52 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime, date
 
-from ..database import get_session
-from ..models import Payment, Resident, Unit, User
-from ..schemas import PaymentCreate, PaymentUpdate, PaymentOut
-from ..auth import get_current_active_user, require_roles
+from ..database import get_session, get_read_session
+from ..models import Payment, Resident, Unit
+from ..schemas import PaymentCreate, PaymentUpdate, PaymentOut, Page, AgingReport
+from ..auth import get_current_active_user, require_roles, UserPrincipal
+from ..utils.pagination import paginate
+from ..utils.export import export_response
+from ..utils.rollups import adjust_payment_rollups, payment_totals
+from ..utils.aging import aging_report
+from ..utils.ledger import post_payment, reverse_payment
+from ..utils.query_stats import query_budget
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
+# Payment fields that determine its journal entry
+LEDGER_FIELDS = {"amount", "status", "payment_type", "payment_date"}
+
+def _filter_payments(query, resident_id, unit_id, payment_type, status, start_date, end_date):
+    """Apply the list/export filters shared by the payment listing routes"""
+    if resident_id:
+        query = query.where(Payment.resident_id == resident_id)
+    
+    if unit_id:
+        query = query.where(Payment.unit_id == unit_id)
+    
+    if payment_type:
+        query = query.where(Payment.payment_type == payment_type)
+    
+    if status:
+        query = query.where(Payment.status == status)
+    
+    if start_date:
+        query = query.where(Payment.payment_date >= start_date)
+    
+    if end_date:
+        query = query.where(Payment.payment_date <= end_date)
+    
+    return query
+
 @router.post("/", response_model=PaymentOut, status_code=201)
 async def create_payment(
     data: PaymentCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Create a new payment"""
     try:
@@ -33,6 +64,9 @@ async def create_payment(
         
         new_payment = Payment(**data.dict())
         session.add(new_payment)
+        await session.flush()
+        await adjust_payment_rollups(session, [new_payment.id])
+        await post_payment(session, new_payment, created_by=current_user.id)
         await session.commit()
         await session.refresh(new_payment)
         return new_payment
@@ -42,52 +76,76 @@ async def create_payment(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create payment: {str(e)}")
 
-@router.get("/", response_model=List[PaymentOut])
+@router.get("/", response_model=Union[List[PaymentOut], Page[PaymentOut]])
 async def list_payments(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     resident_id: Optional[int] = Query(None, description="Filter by resident ID"),
     unit_id: Optional[int] = Query(None, description="Filter by unit ID"),
     payment_type: Optional[str] = Query(None, description="Filter by payment type"),
     status: Optional[str] = Query(None, description="Filter by payment status"),
     start_date: Optional[date] = Query(None, description="Filter by start date"),
     end_date: Optional[date] = Query(None, description="Filter by end date"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get all payments with optional filtering and pagination"""
     try:
-        query = select(Payment)
-        
-        if resident_id:
-            query = query.where(Payment.resident_id == resident_id)
-        
-        if unit_id:
-            query = query.where(Payment.unit_id == unit_id)
-        
-        if payment_type:
-            query = query.where(Payment.payment_type == payment_type)
-        
-        if status:
-            query = query.where(Payment.status == status)
-        
-        if start_date:
-            query = query.where(Payment.payment_date >= start_date)
-        
-        if end_date:
-            query = query.where(Payment.payment_date <= end_date)
-        
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+        query = _filter_payments(
+            select(Payment), resident_id, unit_id, payment_type, status, start_date, end_date
+        )
+        return await paginate(session, query, Payment, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch payments: {str(e)}")
 
+@router.get("/export")
+async def export_payments(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    resident_id: Optional[int] = Query(None, description="Filter by resident ID"),
+    unit_id: Optional[int] = Query(None, description="Filter by unit ID"),
+    payment_type: Optional[str] = Query(None, description="Filter by payment type"),
+    status: Optional[str] = Query(None, description="Filter by payment status"),
+    start_date: Optional[date] = Query(None, description="Filter by start date"),
+    end_date: Optional[date] = Query(None, description="Filter by end date"),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Stream every matching payment as NDJSON or CSV"""
+    query = _filter_payments(
+        select(*Payment.__table__.c), resident_id, unit_id, payment_type, status, start_date, end_date
+    ).order_by(Payment.created_at, Payment.id)
+    return export_response(query, format, "payments")
+
+@router.get("/aging", response_model=AgingReport)
+@query_budget(2)
+async def get_aging_report(
+    as_of: Optional[date] = Query(None, description="Report date (defaults to today)"),
+    since: Optional[date] = Query(None, description="First month to charge dues for (defaults to each unit's creation month)"),
+    property_id: Optional[int] = Query(None, description="Filter by property ID"),
+    delinquent_only: bool = Query(True, description="Only return units with an outstanding balance"),
+    skip: int = Query(0, ge=0, description="Number of units to skip"),
+    limit: int = Query(100, ge=1, le=10000, description="Number of units to return"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Dues charged vs received per unit, with the outstanding balance aged into 0-30/31-60/61-90/90+ day buckets"""
+    try:
+        return await aging_report(
+            session, as_of or date.today(), since=since, property_id=property_id,
+            delinquent_only=delinquent_only, skip=skip, limit=limit,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to build aging report: {str(e)}")
+
 @router.get("/{payment_id}", response_model=PaymentOut)
 async def get_payment(
     payment_id: int, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get a specific payment by ID"""
     try:
@@ -105,17 +163,26 @@ async def update_payment(
     payment_id: int, 
     updates: PaymentUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Update a payment"""
     try:
-        payment = await session.get(Payment, payment_id)
+        payment = await session.get(Payment, payment_id, with_for_update=True)
         if not payment:
             raise HTTPException(status_code=404, detail="Payment not found")
         
+        # Move the payment's contribution from its old rollup bucket to the new one
+        await adjust_payment_rollups(session, [payment_id], sign=-1)
         update_data = updates.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(payment, key, value)
+        await session.flush()
+        await adjust_payment_rollups(session, [payment_id])
+        
+        # Re-post to the ledger only when something it records has changed
+        if LEDGER_FIELDS & update_data.keys():
+            await reverse_payment(session, payment_id, created_by=current_user.id)
+            await post_payment(session, payment, created_by=current_user.id)
         
         await session.commit()
         await session.refresh(payment)
@@ -130,14 +197,16 @@ async def update_payment(
 async def delete_payment(
     payment_id: int, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Delete a payment"""
     try:
-        payment = await session.get(Payment, payment_id)
+        payment = await session.get(Payment, payment_id, with_for_update=True)
         if not payment:
             raise HTTPException(status_code=404, detail="Payment not found")
 
+        await adjust_payment_rollups(session, [payment_id], sign=-1)
+        await reverse_payment(session, payment_id, created_by=current_user.id)
         await session.delete(payment)
         await session.commit()
     except HTTPException:
@@ -151,8 +220,8 @@ async def get_payments_by_resident(
     resident_id: int,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get all payments for a specific resident"""
     try:
@@ -174,8 +243,8 @@ async def get_payments_by_unit(
     unit_id: int,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get all payments for a specific unit"""
     try:
@@ -193,37 +262,39 @@ async def get_payments_by_unit(
         raise HTTPException(status_code=500, detail=f"Failed to fetch payments: {str(e)}")
 
 @router.get("/stats/summary", response_model=dict)
+@query_budget(2)
 async def get_payment_summary(
     start_date: Optional[date] = Query(None, description="Start date for summary"),
     end_date: Optional[date] = Query(None, description="End date for summary"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    unit_id: Optional[int] = Query(None, description="Filter by unit ID"),
+    property_id: Optional[int] = Query(None, description="Filter by property ID"),
+    payment_type: Optional[str] = Query(None, description="Filter by payment type"),
+    status: Optional[str] = Query(None, description="Filter by payment status"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
-    """Get payment summary statistics"""
+    """Get payment summary statistics (served from the daily/monthly rollups)"""
     try:
-        query = select(
-            func.sum(Payment.amount).label("total_amount"),
-            func.count(Payment.id).label("total_payments"),
-            func.avg(Payment.amount).label("average_payment")
-        )
-        
-        if start_date:
-            query = query.where(Payment.payment_date >= start_date)
+        if start_date and end_date and start_date > end_date:
+            raise HTTPException(status_code=400, detail="start_date must not be after end_date")
         
-        if end_date:
-            query = query.where(Payment.payment_date <= end_date)
-        
-        result = await session.execute(query)
-        summary = result.first()
+        stats = await payment_totals(
+            session, start_date, end_date,
+            unit_id=unit_id, property_id=property_id, payment_type=payment_type, status=status,
+        )
+        total_amount = float(stats["total_amount"] or 0)
+        total_payments = stats["total_payments"]
         
         return {
-            "total_amount": float(summary.total_amount or 0),
-            "total_payments": summary.total_payments or 0,
-            "average_payment": float(summary.average_payment or 0),
+            "total_amount": total_amount,
+            "total_payments": total_payments,
+            "average_payment": round(total_amount / total_payments, 2) if total_payments else 0.0,
             "date_range": {
                 "start_date": start_date.isoformat() if start_date else None,
                 "end_date": end_date.isoformat() if end_date else None
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch payment summary: {str(e)}") 
\ No newline at end of file
@@ -3,13 +3,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
-from ..database import get_session
-from ..models import Property, User
-from ..schemas import PropertyCreate, PropertyUpdate, PropertyOut
-from ..auth import get_current_active_user, require_roles
+from ..database import get_session, get_read_session
+from ..models import Property
+from ..schemas import PropertyCreate, PropertyUpdate, PropertyOut, Page
+from ..auth import get_current_active_user, require_roles, UserPrincipal
+from ..utils.pagination import paginate
 
 router = APIRouter(prefix="/properties", tags=["Properties"])
 
@@ -17,7 +18,7 @@ router = APIRouter(prefix="/properties", tags=["Properties"])
 async def create_property(
     data: PropertyCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Create a new property"""
     try:
@@ -30,14 +31,15 @@ async def create_property(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create property: {str(e)}")
 
-@router.get("/", response_model=List[PropertyOut])
+@router.get("/", response_model=Union[List[PropertyOut], Page[PropertyOut]])
 async def list_properties(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     search: Optional[str] = Query(None, description="Search by property name or address"),
     property_type: Optional[str] = Query(None, description="Filter by property type"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all properties with optional filtering and pagination"""
     try:
@@ -52,17 +54,17 @@ async def list_properties(
         if property_type:
             query = query.where(Property.property_type == property_type)
         
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+        return await paginate(session, query, Property, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch properties: {str(e)}")
 
 @router.get("/{property_id}", response_model=PropertyOut)
 async def get_property(
     property_id: int, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get a specific property by ID"""
     try:
@@ -80,7 +82,7 @@ async def update_property(
     property_id: int, 
     updates: PropertyUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Update a property"""
     try:
@@ -106,7 +108,7 @@ async def update_property(
 async def delete_property(
     property_id: int, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin"]))
 ):
     """Delete a property"""
     try:
@@ -125,8 +127,8 @@ async def delete_property(
 @router.get("/{property_id}/stats", response_model=dict)
 async def get_property_stats(
     property_id: int, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get property statistics"""
     try:
@@ -3,13 +3,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
-from ..database import get_session
-from ..models import Resident, Unit, User
-from ..schemas import ResidentCreate, ResidentUpdate, ResidentOut
-from ..auth import get_current_active_user, require_roles
+from ..database import get_session, get_read_session
+from ..models import Resident, Unit
+from ..schemas import ResidentCreate, ResidentUpdate, ResidentOut, Page
+from ..auth import get_current_active_user, require_roles, UserPrincipal
+from ..utils.pagination import paginate
 
 router = APIRouter(prefix="/residents", tags=["Residents"])
 
@@ -17,7 +18,7 @@ router = APIRouter(prefix="/residents", tags=["Residents"])
 async def create_resident(
     data: ResidentCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Create a new resident"""
     try:
@@ -37,15 +38,16 @@ async def create_resident(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create resident: {str(e)}")
 
-@router.get("/", response_model=List[ResidentOut])
+@router.get("/", response_model=Union[List[ResidentOut], Page[ResidentOut]])
 async def list_residents(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     unit_id: Optional[int] = Query(None, description="Filter by unit ID"),
     resident_type: Optional[str] = Query(None, description="Filter by resident type"),
     search: Optional[str] = Query(None, description="Search by name or email"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all residents with optional filtering and pagination"""
     try:
@@ -64,17 +66,17 @@ async def list_residents(
                 (Resident.email.ilike(f"%{search}%"))
             )
         
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+        return await paginate(session, query, Resident, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch residents: {str(e)}")
 
 @router.get("/{resident_id}", response_model=ResidentOut)
 async def get_resident(
     resident_id: int, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get a specific resident by ID"""
     try:
@@ -92,7 +94,7 @@ async def update_resident(
     resident_id: int, 
     updates: ResidentUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Update a resident"""
     try:
@@ -118,7 +120,7 @@ async def update_resident(
 async def delete_resident(
     resident_id: int, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Delete a resident"""
     try:
@@ -139,8 +141,8 @@ async def get_residents_by_unit(
     unit_id: int,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all residents for a specific unit"""
     try:
@@ -160,8 +162,8 @@ async def get_residents_by_unit(
 @router.get("/{resident_id}/stats", response_model=dict)
 async def get_resident_stats(
     resident_id: int, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get resident statistics"""
     try:
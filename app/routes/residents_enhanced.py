@@ -3,14 +3,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List, Optional
+from sqlalchemy.orm import selectinload
+from typing import List, Optional, Union
 from datetime import datetime, date
 from uuid import UUID
 
-from ..database import get_session
-from ..models import ResidentEnhanced, User
-from ..schemas import ResidentEnhancedCreate, ResidentEnhancedUpdate, ResidentEnhancedOut
-from ..auth import get_current_active_user, require_roles
+from ..database import get_session, get_read_session
+from ..models import ResidentEnhanced, User, ResidentTypeEnhanced, UserRole
+from ..schemas import ResidentEnhancedCreate, ResidentEnhancedUpdate, ResidentEnhancedOut, Page
+from ..auth import get_current_active_user, require_roles, UserPrincipal
+from ..utils.pagination import paginate
+from ..utils.aggregation import Summary
+from ..utils.query_stats import query_budget
 
 router = APIRouter(prefix="/residents-enhanced", tags=["Enhanced Residents"])
 
@@ -18,7 +22,7 @@ router = APIRouter(prefix="/residents-enhanced", tags=["Enhanced Residents"])
 async def create_resident(
     data: ResidentEnhancedCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Create a new enhanced resident"""
     try:
@@ -39,10 +43,11 @@ async def create_resident(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create resident: {str(e)}")
 
-@router.get("/", response_model=List[ResidentEnhancedOut])
+@router.get("/", response_model=Union[List[ResidentEnhancedOut], Page[ResidentEnhancedOut]])
 async def list_residents(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     resident_type: Optional[str] = Query(None, description="Filter by resident type"),
     role: Optional[str] = Query(None, description="Filter by role"),
     unit_id: Optional[UUID] = Query(None, description="Filter by unit ID"),
@@ -50,8 +55,8 @@ async def list_residents(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     is_primary: Optional[bool] = Query(None, description="Filter by primary resident status"),
     search: Optional[str] = Query(None, description="Search by name or email"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all enhanced residents with optional filtering and pagination"""
     try:
@@ -76,17 +81,17 @@ async def list_residents(
                 (ResidentEnhanced.email.ilike(f"%{search}%"))
             )
         
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+        return await paginate(session, query, ResidentEnhanced, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch residents: {str(e)}")
 
 @router.get("/{resident_id}", response_model=ResidentEnhancedOut)
 async def get_resident(
     resident_id: UUID, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get a specific enhanced resident by ID"""
     try:
@@ -104,7 +109,7 @@ async def update_resident(
     resident_id: UUID, 
     updates: ResidentEnhancedUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Update an enhanced resident"""
     try:
@@ -137,7 +142,7 @@ async def update_resident(
 async def delete_resident(
     resident_id: UUID, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Delete an enhanced resident"""
     try:
@@ -158,8 +163,8 @@ async def get_residents_by_unit(
     unit_id: UUID,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all residents for a specific unit"""
     try:
@@ -174,8 +179,8 @@ async def get_residents_by_property(
     property_id: UUID,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all residents for a specific property"""
     try:
@@ -186,14 +191,15 @@ async def get_residents_by_property(
         raise HTTPException(status_code=500, detail=f"Failed to fetch residents: {str(e)}")
 
 @router.get("/user/{user_id}", response_model=List[ResidentEnhancedOut])
+@query_budget(3)
 async def get_residents_by_user(
     user_id: UUID,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all residents associated with a specific user"""
     try:
-        user = await session.get(User, user_id)
+        user = await session.get(User, user_id, options=[selectinload(User.residents)])
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -207,7 +213,7 @@ async def get_residents_by_user(
 async def activate_resident(
     resident_id: UUID, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Activate a resident account"""
     try:
@@ -230,7 +236,7 @@ async def activate_resident(
 async def deactivate_resident(
     resident_id: UUID, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Deactivate a resident account"""
     try:
@@ -253,7 +259,7 @@ async def deactivate_resident(
 async def set_primary_resident(
     resident_id: UUID, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Set a resident as the primary resident for their unit"""
     try:
@@ -283,40 +289,27 @@ async def set_primary_resident(
         raise HTTPException(status_code=400, detail=f"Failed to set primary resident: {str(e)}")
 
 @router.get("/stats/summary", response_model=dict)
+@query_budget(2)
 async def get_resident_summary(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get resident summary statistics"""
     try:
-        # Get total count
-        total_count = await session.scalar(select(func.count(ResidentEnhanced.id)))
-        
-        # Get active count
-        active_count = await session.scalar(select(func.count(ResidentEnhanced.id)).where(ResidentEnhanced.is_active == True))
-        
-        # Get primary residents count
-        primary_count = await session.scalar(select(func.count(ResidentEnhanced.id)).where(ResidentEnhanced.is_primary == True))
-        
-        # Get counts by resident type
-        type_counts = {}
-        types = ['owner', 'tenant', 'authorized_user']
-        
-        for resident_type in types:
-            count = await session.scalar(
-                select(func.count(ResidentEnhanced.id)).where(ResidentEnhanced.resident_type == resident_type)
-            )
-            type_counts[resident_type] = count or 0
-        
-        # Get counts by role
-        role_counts = {}
-        roles = ['super_admin', 'property_manager', 'board_member', 'community_admin', 'resident', 'tenant']
-        
-        for role in roles:
-            count = await session.scalar(
-                select(func.count(ResidentEnhanced.id)).where(ResidentEnhanced.role == role)
-            )
-            role_counts[role] = count or 0
+        summary = (
+            Summary(ResidentEnhanced)
+            .count("total_count")
+            .count("active_count", ResidentEnhanced.is_active == True)
+            .count("primary_count", ResidentEnhanced.is_primary == True)
+            .count_by("type_counts", ResidentEnhanced.resident_type, [(t.value, t) for t in ResidentTypeEnhanced])
+            .count_by("role_counts", ResidentEnhanced.role, [(role.value, role) for role in UserRole])
+        )
+        stats = await summary.fetch(session)
+        total_count = stats["total_count"]
+        active_count = stats["active_count"]
+        primary_count = stats["primary_count"]
+        type_counts = stats["type_counts"]
+        role_counts = stats["role_counts"]
         
         return {
             "total_residents": total_count or 0,
@@ -332,8 +325,8 @@ async def get_resident_summary(
 @router.get("/{resident_id}/vehicles", response_model=dict)
 async def get_resident_vehicles(
     resident_id: UUID,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get vehicle information for a specific resident"""
     try:
@@ -354,8 +347,8 @@ async def get_resident_vehicles(
 @router.get("/{resident_id}/pets", response_model=dict)
 async def get_resident_pets(
     resident_id: UUID,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get pet information for a specific resident"""
     try:
@@ -376,8 +369,8 @@ async def get_resident_pets(
 @router.get("/{resident_id}/emergency-contact", response_model=dict)
 async def get_resident_emergency_contact(
     resident_id: UUID,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get emergency contact information for a specific resident"""
     try:
@@ -1,15 +1,26 @@
 # routes/units.py
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
-from ..database import get_session
-from ..models import Unit, Property, User
-from ..schemas import UnitCreate, UnitUpdate, UnitOut
-from ..auth import get_current_active_user, require_roles
+from ..database import get_session, get_read_session, open_read_session
+from ..models import Unit, Property, Resident, Payment, MaintenanceRequest, Violation
+from ..schemas import UnitCreate, UnitUpdate, UnitOut, UnitDashboard, Page
+from ..auth import get_current_active_user, require_roles, UserPrincipal
+from ..utils.pagination import paginate
+from ..utils.query_stats import query_budget
+
+load_dotenv()
+
+# Dashboard section queries run at once per request, each holding a pooled connection
+DASHBOARD_CONCURRENCY = int(os.getenv("DASHBOARD_CONCURRENCY", 2))
 
 router = APIRouter(prefix="/units", tags=["Units"])
 
@@ -17,7 +28,7 @@ router = APIRouter(prefix="/units", tags=["Units"])
 async def create_unit(
     data: UnitCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Create a new unit"""
     try:
@@ -37,15 +48,16 @@ async def create_unit(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create unit: {str(e)}")
 
-@router.get("/", response_model=List[UnitOut])
+@router.get("/", response_model=Union[List[UnitOut], Page[UnitOut]])
 async def list_units(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     property_id: Optional[int] = Query(None, description="Filter by property ID"),
     unit_type: Optional[str] = Query(None, description="Filter by unit type"),
     search: Optional[str] = Query(None, description="Search by unit number"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all units with optional filtering and pagination"""
     try:
@@ -60,17 +72,17 @@ async def list_units(
         if search:
             query = query.where(Unit.unit_number.ilike(f"%{search}%"))
         
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+        return await paginate(session, query, Unit, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch units: {str(e)}")
 
 @router.get("/{unit_id}", response_model=UnitOut)
 async def get_unit(
     unit_id: int, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get a specific unit by ID"""
     try:
@@ -88,7 +100,7 @@ async def update_unit(
     unit_id: int, 
     updates: UnitUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Update a unit"""
     try:
@@ -114,7 +126,7 @@ async def update_unit(
 async def delete_unit(
     unit_id: int, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Delete a unit"""
     try:
@@ -135,8 +147,8 @@ async def get_units_by_property(
     property_id: int,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get all units for a specific property"""
     try:
@@ -156,8 +168,8 @@ async def get_units_by_property(
 @router.get("/{unit_id}/stats", response_model=dict)
 async def get_unit_stats(
     unit_id: int, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get unit statistics"""
     try:
@@ -179,4 +191,68 @@ async def get_unit_stats(
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch unit stats: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to fetch unit stats: {str(e)}")
+
+# Roles that may see a unit's payments and violations, as on /payments/unit and /violations/unit
+FINANCIAL_ROLES = {"super_admin", "property_manager", "board_member"}
+
+async def _read(request: Request, slots: asyncio.Semaphore, query, scalar: bool = False):
+    # Own session per query: one AsyncSession can't run statements concurrently.
+    # Opened inside the semaphore so a request never holds more than its share of the pool
+    async with slots:
+        session = await open_read_session(request)
+        async with session:
+            result = await session.execute(query)
+            return result.scalar_one_or_none() if scalar else result.scalars().all()
+
+def _section(rows: list, limit: int) -> dict:
+    return {"items": rows[:limit], "has_more": len(rows) > limit}
+
+@router.get("/{unit_id}/dashboard", response_model=UnitDashboard)
+@query_budget(6)
+async def get_unit_dashboard(
+    unit_id: int,
+    request: Request,
+    limit: int = Query(10, ge=1, le=100, description="Number of records to return per section"),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """Get a unit with its residents, recent payments, maintenance requests and violations.
+
+    The sections are queried ``DASHBOARD_CONCURRENCY`` at a time, each fetching
+    one row past ``limit`` to report ``has_more``; the budget leaves room for
+    the user lookup on a principal cache miss. Payments and violations are left
+    out for roles that can't list them.
+    """
+    try:
+        queries = {
+            "unit": select(Unit).where(Unit.id == unit_id),
+            "residents": select(Resident).where(Resident.unit_id == unit_id)
+                .order_by(Resident.id).limit(limit + 1),
+            "maintenance_requests": select(MaintenanceRequest).where(MaintenanceRequest.unit_id == unit_id)
+                .order_by(MaintenanceRequest.created_at.desc(), MaintenanceRequest.id.desc()).limit(limit + 1),
+        }
+        if current_user.role.value in FINANCIAL_ROLES:
+            queries["payments"] = (
+                select(Payment).where(Payment.unit_id == unit_id)
+                .order_by(Payment.payment_date.desc(), Payment.id.desc()).limit(limit + 1)
+            )
+            queries["violations"] = (
+                select(Violation).where(Violation.unit_id == unit_id)
+                .order_by(Violation.created_at.desc(), Violation.id.desc()).limit(limit + 1)
+            )
+
+        slots = asyncio.Semaphore(DASHBOARD_CONCURRENCY)
+        results = await asyncio.gather(
+            *(_read(request, slots, query, scalar=name == "unit") for name, query in queries.items())
+        )
+        sections = dict(zip(queries, results))
+
+        unit = sections.pop("unit")
+        if not unit:
+            raise HTTPException(status_code=404, detail="Unit not found")
+
+        return {"unit": unit, **{name: _section(rows, limit) for name, rows in sections.items()}}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch unit dashboard: {str(e)}")
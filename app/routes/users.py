@@ -3,22 +3,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List, Optional
+from sqlalchemy.orm import selectinload
+from typing import List, Optional, Union
 from datetime import datetime
 from uuid import UUID
 
-from ..database import get_session
-from ..models import User
-from ..schemas import UserCreate, UserUpdate, UserOut
-from ..auth import get_current_active_user, require_role, require_roles, get_password_hash
+from ..database import get_session, get_read_session
+from ..models import User, UserRole
+from ..schemas import UserCreate, UserUpdate, UserOut, UserDetail, ResidentEnhancedOut, Page
+from ..auth import get_current_active_user, require_role, require_roles, get_password_hash_async, UserPrincipal
+from ..utils.pagination import paginate
+from ..utils.user_cache import invalidate_user
+from ..utils.aggregation import Summary
+from ..utils.loading import parse_include, include_options, with_includes
+from ..utils.query_stats import query_budget
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+USER_INCLUDES = ("residents",)
+
 @router.post("/", response_model=UserOut, status_code=201)
 async def create_user(
     data: UserCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Create a new user (Admin only)"""
     try:
@@ -30,7 +38,7 @@ async def create_user(
             raise HTTPException(status_code=400, detail="Email already registered")
         
         # Hash the password
-        hashed_password = get_password_hash(data.password)
+        hashed_password = await get_password_hash_async(data.password)
         
         # Create user data without password
         user_data = data.dict()
@@ -48,16 +56,17 @@ async def create_user(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create user: {str(e)}")
 
-@router.get("/", response_model=List[UserOut])
+@router.get("/", response_model=Union[List[UserOut], Page[UserOut]])
 async def list_users(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     role: Optional[str] = Query(None, description="Filter by role"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     email_verified: Optional[bool] = Query(None, description="Filter by email verification status"),
     search: Optional[str] = Query(None, description="Search by name or email"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get all users with optional filtering and pagination"""
     try:
@@ -88,26 +97,27 @@ async def list_users(
                 (User.email.ilike(f"%{search}%"))
             )
         
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+        return await paginate(session, query, User, skip=skip, limit=limit, cursor=cursor)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch users: {str(e)}")
 
-@router.get("/{user_id}", response_model=UserOut)
+@router.get("/{user_id}", response_model=UserDetail, response_model_exclude_unset=True)
+@query_budget(3)
 async def get_user(
     user_id: UUID, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: residents"),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Get a specific user by ID"""
     try:
-        user = await session.get(User, user_id)
+        includes = parse_include(include, USER_INCLUDES)
+        user = await session.get(User, user_id, options=include_options(User, includes))
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        return user
+        return with_includes(UserDetail, UserOut, user, includes)
     except HTTPException:
         raise
     except Exception as e:
@@ -118,7 +128,7 @@ async def update_user(
     user_id: UUID, 
     updates: UserUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """Update a user"""
     try:
@@ -141,6 +151,7 @@ async def update_user(
         
         user.updated_at = datetime.utcnow()
         await session.commit()
+        await invalidate_user(session, user_id)
         await session.refresh(user)
         return user
     except HTTPException:
@@ -153,7 +164,7 @@ async def update_user(
 async def delete_user(
     user_id: UUID, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Delete a user"""
     try:
@@ -163,6 +174,7 @@ async def delete_user(
 
         await session.delete(user)
         await session.commit()
+        await invalidate_user(session, user_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -172,7 +184,7 @@ async def delete_user(
 @router.get("/email/{email}", response_model=UserOut)
 async def get_user_by_email(
     email: str, 
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get a user by email address"""
     try:
@@ -190,7 +202,7 @@ async def get_users_by_role(
     role: str,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get all users with a specific role"""
     try:
@@ -251,6 +263,7 @@ async def activate_user(
         user.is_active = True
         user.updated_at = datetime.utcnow()
         await session.commit()
+        await invalidate_user(session, user_id)
         await session.refresh(user)
         return user
     except HTTPException:
@@ -273,6 +286,7 @@ async def deactivate_user(
         user.is_active = False
         user.updated_at = datetime.utcnow()
         await session.commit()
+        await invalidate_user(session, user_id)
         await session.refresh(user)
         return user
     except HTTPException:
@@ -282,27 +296,24 @@ async def deactivate_user(
         raise HTTPException(status_code=400, detail=f"Failed to deactivate user: {str(e)}")
 
 @router.get("/stats/summary", response_model=dict)
+@query_budget(2)
 async def get_user_summary(
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get user summary statistics"""
     try:
-        # Get total count
-        total_count = await session.scalar(select(func.count(User.id)))
-        
-        # Get active count
-        active_count = await session.scalar(select(func.count(User.id)).where(User.is_active == True))
-        
-        # Get verified email count
-        verified_count = await session.scalar(select(func.count(User.id)).where(User.email_verified == True))
-        
-        # Get counts by role
-        role_counts = {}
-        roles = ['super_admin', 'property_manager', 'board_member', 'community_admin', 'resident', 'tenant']
-        
-        for role in roles:
-            count = await session.scalar(select(func.count(User.id)).where(User.role == role))
-            role_counts[role] = count or 0
+        summary = (
+            Summary(User)
+            .count("total_count")
+            .count("active_count", User.is_active == True)
+            .count("verified_count", User.email_verified == True)
+            .count_by("role_counts", User.role, [(role.value, role) for role in UserRole])
+        )
+        stats = await summary.fetch(session)
+        total_count = stats["total_count"]
+        active_count = stats["active_count"]
+        verified_count = stats["verified_count"]
+        role_counts = stats["role_counts"]
         
         return {
             "total_users": total_count or 0,
@@ -316,21 +327,22 @@ async def get_user_summary(
         raise HTTPException(status_code=500, detail=f"Failed to fetch user summary: {str(e)}")
 
 @router.get("/{user_id}/residents", response_model=dict)
+@query_budget(2)
 async def get_user_residents(
     user_id: UUID,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get all residents associated with a user"""
     try:
-        user = await session.get(User, user_id)
+        user = await session.get(User, user_id, options=[selectinload(User.residents)])
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
         return {
             "user_id": user_id,
             "user_name": f"{user.first_name} {user.last_name}",
-            "residents_count": len(user.residents) if user.residents else 0,
-            "residents": user.residents
+            "residents_count": len(user.residents),
+            "residents": [ResidentEnhancedOut.model_validate(resident) for resident in user.residents]
         }
     except HTTPException:
         raise
@@ -3,21 +3,44 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime, date
 
-from ..database import get_session
-from ..models import Violation, Resident, Unit, User
-from ..schemas import ViolationCreate, ViolationUpdate, ViolationOut
-from ..auth import get_current_active_user, require_roles
+from ..database import get_session, get_read_session
+from ..models import Violation, Resident, Unit, ViolationStatus, ViolationSeverity
+from ..schemas import ViolationCreate, ViolationUpdate, ViolationOut, Page
+from ..auth import get_current_active_user, require_roles, UserPrincipal
+from ..utils.pagination import paginate
+from ..utils.export import export_response
+from ..utils.aggregation import Summary
+from ..utils.query_stats import query_budget
 
 router = APIRouter(prefix="/violations", tags=["Violations"])
 
+def _filter_violations(query, unit_id, resident_id, severity, status, violation_type):
+    """Apply the list/export filters shared by the violation listing routes"""
+    if unit_id:
+        query = query.where(Violation.unit_id == unit_id)
+    
+    if resident_id:
+        query = query.where(Violation.resident_id == resident_id)
+    
+    if severity:
+        query = query.where(Violation.severity == severity)
+    
+    if status:
+        query = query.where(Violation.status == status)
+    
+    if violation_type:
+        query = query.where(Violation.violation_type.ilike(f"%{violation_type}%"))
+    
+    return query
+
 @router.post("/", response_model=ViolationOut, status_code=201)
 async def create_violation(
     data: ViolationCreate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Create a new violation"""
     try:
@@ -42,48 +65,49 @@ async def create_violation(
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create violation: {str(e)}")
 
-@router.get("/", response_model=List[ViolationOut])
+@router.get("/", response_model=Union[List[ViolationOut], Page[ViolationOut]])
 async def list_violations(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value to start from the beginning"),
     unit_id: Optional[int] = Query(None, description="Filter by unit ID"),
     resident_id: Optional[int] = Query(None, description="Filter by resident ID"),
     severity: Optional[str] = Query(None, description="Filter by severity"),
     status: Optional[str] = Query(None, description="Filter by status"),
     violation_type: Optional[str] = Query(None, description="Filter by violation type"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get all violations with optional filtering and pagination"""
     try:
-        query = select(Violation)
-        
-        if unit_id:
-            query = query.where(Violation.unit_id == unit_id)
-        
-        if resident_id:
-            query = query.where(Violation.resident_id == resident_id)
-        
-        if severity:
-            query = query.where(Violation.severity == severity)
-        
-        if status:
-            query = query.where(Violation.status == status)
-        
-        if violation_type:
-            query = query.where(Violation.violation_type.ilike(f"%{violation_type}%"))
-        
-        query = query.offset(skip).limit(limit)
-        result = await session.execute(query)
-        return result.scalars().all()
+        query = _filter_violations(select(Violation), unit_id, resident_id, severity, status, violation_type)
+        return await paginate(session, query, Violation, skip=skip, limit=limit, cursor=cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch violations: {str(e)}")
 
+@router.get("/export")
+async def export_violations(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    unit_id: Optional[int] = Query(None, description="Filter by unit ID"),
+    resident_id: Optional[int] = Query(None, description="Filter by resident ID"),
+    severity: Optional[str] = Query(None, description="Filter by severity"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    violation_type: Optional[str] = Query(None, description="Filter by violation type"),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+):
+    """Stream every matching violation as NDJSON or CSV"""
+    query = _filter_violations(
+        select(*Violation.__table__.c), unit_id, resident_id, severity, status, violation_type
+    ).order_by(Violation.created_at, Violation.id)
+    return export_response(query, format, "violations")
+
 @router.get("/{violation_id}", response_model=ViolationOut)
 async def get_violation(
     violation_id: int, 
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get a specific violation by ID"""
     try:
@@ -101,7 +125,7 @@ async def update_violation(
     violation_id: int, 
     updates: ViolationUpdate, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Update a violation"""
     try:
@@ -127,7 +151,7 @@ async def update_violation(
 async def delete_violation(
     violation_id: int, 
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager"]))
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager"]))
 ):
     """Delete a violation"""
     try:
@@ -148,8 +172,8 @@ async def get_violations_by_unit(
     unit_id: int,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get all violations for a specific unit"""
     try:
@@ -171,8 +195,8 @@ async def get_violations_by_resident(
     resident_id: int,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get all violations for a specific resident"""
     try:
@@ -190,38 +214,27 @@ async def get_violations_by_resident(
         raise HTTPException(status_code=500, detail=f"Failed to fetch violations: {str(e)}")
 
 @router.get("/stats/summary", response_model=dict)
+@query_budget(2)
 async def get_violation_summary(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
+    session: AsyncSession = Depends(get_read_session),
+    current_user: UserPrincipal = Depends(require_roles(["super_admin", "property_manager", "board_member"]))
 ):
     """Get violation summary statistics"""
     try:
-        # Get counts by status
-        status_counts = await session.execute(
-            select(
-                Violation.status,
-                func.count(Violation.id).label("count")
-            ).group_by(Violation.status)
-        )
-        
-        # Get counts by severity
-        severity_counts = await session.execute(
-            select(
-                Violation.severity,
-                func.count(Violation.id).label("count")
-            ).group_by(Violation.severity)
-        )
-        
-        # Get total fines
-        total_fines = await session.execute(
-            select(func.sum(Violation.fine_amount))
+        stats = await (
+            Summary(Violation)
+            .count("total_violations")
+            .count_by("status_counts", Violation.status, [(status.value, status) for status in ViolationStatus])
+            .count_by("severity_counts", Violation.severity, [(severity.value, severity) for severity in ViolationSeverity])
+            .sum("total_fines", Violation.fine_amount)
+            .fetch(session)
         )
         
         return {
-            "status_counts": {row.status.value: row.count for row in status_counts},
-            "severity_counts": {row.severity.value: row.count for row in severity_counts},
-            "total_fines": float(total_fines.scalar() or 0),
-            "total_violations": sum(row.count for row in status_counts)
+            "status_counts": stats["status_counts"],
+            "severity_counts": stats["severity_counts"],
+            "total_fines": float(stats["total_fines"] or 0),
+            "total_violations": stats["total_violations"] or 0
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch violation summary: {str(e)}") 
\ No newline at end of file
@@ -1,7 +1,7 @@
 #pydantic Schema
 
 from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from typing import Generic, List, Optional, TypeVar
 from datetime import datetime, date, time
 from uuid import UUID
 from decimal import Decimal
@@ -16,6 +16,13 @@ from .models import (
 class Config:
     from_attributes = True
 
+T = TypeVar("T")
+
+# Keyset pagination envelope, returned by list endpoints when a cursor is passed
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str]
+
 # Property Schemas
 class PropertyCreate(BaseModel):
     name: str = Field(..., max_length=255)
@@ -162,6 +169,43 @@ class FinancialAccountOut(BaseModel):
     class Config:
         from_attributes = True
 
+class JournalLineIn(BaseModel):
+    account_id: int
+    amount: Decimal = Field(..., description="Debit positive, credit negative")
+
+class JournalEntryCreate(BaseModel):
+    entry_date: date
+    description: Optional[str] = None
+    lines: List[JournalLineIn] = Field(..., min_length=2)
+
+class JournalLineOut(BaseModel):
+    id: int
+    account_id: int
+    entry_date: date
+    amount: Decimal
+
+    class Config:
+        from_attributes = True
+
+class JournalEntryOut(BaseModel):
+    id: int
+    entry_date: date
+    description: Optional[str]
+    source: str
+    source_id: Optional[int]
+    created_by: Optional[UUID]
+    created_at: datetime
+    lines: List[JournalLineOut]
+
+    class Config:
+        from_attributes = True
+
+class AccountBalanceOut(BaseModel):
+    account_id: int
+    as_of: date
+    balance: Decimal
+    snapshot_as_of: Optional[date]
+
 # Payment Schemas
 class PaymentCreate(BaseModel):
     resident_id: int
@@ -200,11 +244,63 @@ class PaymentOut(BaseModel):
     due_date: Optional[date]
     status: PaymentStatus
     notes: Optional[str]
+    billing_run_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class AgingUnit(BaseModel):
+    unit_id: int
+    property_id: int
+    unit_number: str
+    monthly_fee: Decimal
+    charged: Decimal
+    received: Decimal
+    balance: Decimal
+    days_0_30: Decimal
+    days_31_60: Decimal
+    days_61_90: Decimal
+    days_over_90: Decimal
+    oldest_due: Optional[date]
+
+class AgingTotals(BaseModel):
+    units: int
+    balance: Decimal
+    days_0_30: Decimal
+    days_31_60: Decimal
+    days_61_90: Decimal
+    days_over_90: Decimal
+
+class AgingReport(BaseModel):
+    as_of: date
+    totals: AgingTotals
+    units: List[AgingUnit]
+
+class BillingRunCreate(BaseModel):
+    period: date
+    property_ids: Optional[List[int]] = None
+
+class BillingRunOut(BaseModel):
+    id: int
+    property_id: int
+    period: date
+    units_billed: int
+    charges_created: int
+    total_amount: Decimal
+    created_by: Optional[UUID]
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class BillingRunResult(BaseModel):
+    period: date
+    runs: List[BillingRunOut]
+    already_billed: List[int]
+    # Units of the newly billed properties that got no charges because they have no resident
+    unbilled_units: List[int]
+
 # Maintenance Request Schemas
 class MaintenanceRequestCreate(BaseModel):
     unit_id: int
@@ -305,6 +401,19 @@ class ViolationOut(BaseModel):
     class Config:
         from_attributes = True
 
+# Unit Dashboard Schemas
+class DashboardSection(BaseModel, Generic[T]):
+    items: List[T]
+    has_more: bool
+
+class UnitDashboard(BaseModel):
+    unit: UnitOut
+    residents: DashboardSection[ResidentOut]
+    maintenance_requests: DashboardSection[MaintenanceRequestOut]
+    # Only filled in for roles allowed to see a unit's payments and violations
+    payments: Optional[DashboardSection[PaymentOut]] = None
+    violations: Optional[DashboardSection[ViolationOut]] = None
+
 # Meeting Schemas
 class MeetingCreate(BaseModel):
     title: str = Field(..., max_length=255)
@@ -514,6 +623,34 @@ class ContractorOut(BaseModel):
     class Config:
         from_attributes = True
 
+# Contractor Matching Schemas
+class ContractorMatch(BaseModel):
+    contractor_id: UUID
+    name: str
+    company: Optional[str]
+    rating: Decimal
+    insurance_expiry: Optional[date]
+    open_requests: int
+    score: float
+
+class MaintenanceRequestMatchOut(BaseModel):
+    request_id: UUID
+    category: MaintenanceCategory
+    candidates: List[ContractorMatch]
+    assigned_contractor_id: Optional[UUID] = None
+
+class DispatchAssignment(BaseModel):
+    request_id: UUID
+    contractor_id: UUID
+    contractor_name: str
+    score: float
+
+class DispatchResult(BaseModel):
+    dry_run: bool
+    considered: int
+    assignments: List[DispatchAssignment]
+    unmatched: List[UUID]
+
 # Enhanced Maintenance Request Schemas
 class MaintenanceRequestEnhancedCreate(BaseModel):
     title: str = Field(..., max_length=200)
@@ -606,24 +743,33 @@ class MaintenanceWorkLogCreate(BaseModel):
     worker_id: Optional[UUID]
     worker_name: str = Field(..., max_length=100)
     work_date: date
-    hours_worked: Decimal = Field(..., ge=0)
+    hours_worked: Decimal = Field(..., ge=0, max_digits=4, decimal_places=2)
     work_description: str
     materials_used: Optional[List[str]] = Field(default=[])
-    cost: Optional[Decimal] = Field(0.00, ge=0)
+    cost: Optional[Decimal] = Field(0.00, ge=0, max_digits=10, decimal_places=2)
     images: Optional[List[str]] = Field(default=[])
     created_by: UUID
 
     class Config:
         from_attributes = True
 
+class BulkItemError(BaseModel):
+    index: int
+    error: str
+
+class BulkWorkLogResult(BaseModel):
+    received: int
+    inserted: int
+    errors: List[BulkItemError]
+
 class MaintenanceWorkLogUpdate(BaseModel):
     worker_id: Optional[UUID]
     worker_name: Optional[str] = Field(None, max_length=100)
     work_date: Optional[date]
-    hours_worked: Optional[Decimal] = Field(None, ge=0)
+    hours_worked: Optional[Decimal] = Field(None, ge=0, max_digits=4, decimal_places=2)
     work_description: Optional[str]
     materials_used: Optional[List[str]]
-    cost: Optional[Decimal] = Field(None, ge=0)
+    cost: Optional[Decimal] = Field(None, ge=0, max_digits=10, decimal_places=2)
     images: Optional[List[str]]
 
     class Config:
@@ -646,6 +792,13 @@ class MaintenanceWorkLogOut(BaseModel):
     class Config:
         from_attributes = True
 
+class MaintenanceRequestEnhancedDetail(MaintenanceRequestEnhancedOut):
+    work_logs: Optional[List[MaintenanceWorkLogOut]] = None
+    contractor: Optional[ContractorOut] = None
+
+class ContractorDetail(ContractorOut):
+    maintenance_requests: Optional[List[MaintenanceRequestEnhancedOut]] = None
+
 # Authentication Schemas
 class Token(BaseModel):
     access_token: str
@@ -785,3 +938,6 @@ class ResidentEnhancedOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class UserDetail(UserOut):
+    residents: Optional[List[ResidentEnhancedOut]] = None
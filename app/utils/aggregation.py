@@ -0,0 +1,68 @@
+from typing import Iterable, Tuple, Any
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class Summary:
+    """Collects the measures for a stats endpoint and runs them as one query.
+
+    Every measure becomes a column of a single ``SELECT`` over the model's
+    table; conditional counts compile to ``COUNT(*) FILTER (WHERE ...)`` so a
+    whole summary costs one round trip regardless of how many breakdowns it has.
+
+        summary = Summary(User)
+        summary.count("total_users")
+        summary.count("active_users", User.is_active == True)
+        summary.count_by("role_distribution", User.role, [(r.value, r) for r in UserRole])
+        data = await summary.fetch(session)
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._columns = []
+        self._groups = {}
+
+    def _add(self, name: str, expression):
+        self._columns.append(expression.label(name))
+        return self
+
+    def count(self, name: str, condition=None):
+        expression = func.count()
+        if condition is not None:
+            expression = expression.filter(condition)
+        return self._add(name, expression)
+
+    def sum(self, name: str, column, condition=None):
+        expression = func.sum(column)
+        if condition is not None:
+            expression = expression.filter(condition)
+        return self._add(name, expression)
+
+    def avg(self, name: str, column, condition=None):
+        expression = func.avg(column)
+        if condition is not None:
+            expression = expression.filter(condition)
+        return self._add(name, expression)
+
+    def count_by(self, name: str, column, values: Iterable[Tuple[str, Any]]):
+        """Count rows per value of ``column``; returned as ``{key: count}`` under ``name``"""
+        keys = []
+        for index, (key, value) in enumerate(values):
+            label = f"{name}_{index}"
+            keys.append((key, label))
+            self._add(label, func.count().filter(column == value))
+        self._groups[name] = keys
+        return self
+
+    def query(self, *criteria):
+        query = select(*self._columns).select_from(self.model)
+        if criteria:
+            query = query.where(*criteria)
+        return query
+
+    async def fetch(self, session: AsyncSession, *criteria) -> dict:
+        result = await session.execute(self.query(*criteria))
+        row = dict(result.one()._mapping)
+        for name, keys in self._groups.items():
+            row[name] = {key: row.pop(label) or 0 for key, label in keys}
+        return row
@@ -0,0 +1,145 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Boolean, Date, Integer, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+BUCKETS = ("days_0_30", "days_31_60", "days_61_90", "days_over_90")
+
+# One pass over units and payments. Dues of ``monthly_fee`` are charged on the
+# 1st of every month from ``first_due`` through ``as_of``; paid and partial
+# dues payments made in that same window settle the oldest charges first. Only the months left unpaid
+# are expanded into rows (usually none or one per unit), so the cost is a scan
+# of units plus one grouped scan of payments, not units x months.
+AGING_SQL = text("""
+WITH params AS (
+    SELECT CAST(:as_of AS date) AS as_of,
+           CAST(:since AS date) AS since,
+           CAST(:property_id AS integer) AS property_id
+),
+scope AS (
+    SELECT u.id AS unit_id, u.property_id, u.unit_number, u.monthly_fee AS fee, params.as_of,
+           CAST(date_trunc('month', COALESCE(params.since, CAST(u.created_at AS date))) AS date) AS first_due
+    FROM units u
+    CROSS JOIN params
+    WHERE u.monthly_fee > 0
+      AND (params.property_id IS NULL OR u.property_id = params.property_id)
+),
+received AS (
+    SELECT p.unit_id, SUM(p.amount) AS received
+    FROM payments p
+    JOIN scope s ON s.unit_id = p.unit_id
+    WHERE p.payment_type = 'monthly_fee'
+      AND p.status IN ('paid', 'partial')
+      AND p.payment_date BETWEEN s.first_due AND s.as_of
+    GROUP BY p.unit_id
+),
+ledger AS (
+    SELECT s.*,
+           COALESCE(r.received, 0) AS received,
+           CAST((EXTRACT(YEAR FROM s.as_of) - EXTRACT(YEAR FROM s.first_due)) * 12
+                + EXTRACT(MONTH FROM s.as_of) - EXTRACT(MONTH FROM s.first_due) + 1 AS integer) AS months_charged
+    FROM scope s
+    LEFT JOIN received r ON r.unit_id = s.unit_id
+    WHERE s.first_due <= s.as_of
+),
+settled AS (
+    SELECT l.*,
+           l.months_charged * l.fee AS charged,
+           CAST(FLOOR(l.received / l.fee) AS integer) AS months_covered,
+           l.received - FLOOR(l.received / l.fee) * l.fee AS carried
+    FROM ledger l
+),
+report AS (
+    SELECT s.unit_id, s.property_id, s.unit_number, s.fee AS monthly_fee,
+           s.charged, s.received, s.charged - s.received AS balance,
+           COALESCE(o.days_0_30, 0) AS days_0_30,
+           COALESCE(o.days_31_60, 0) AS days_31_60,
+           COALESCE(o.days_61_90, 0) AS days_61_90,
+           COALESCE(o.days_over_90, 0) AS days_over_90,
+           o.oldest_due
+    FROM settled s
+    LEFT JOIN LATERAL (
+        SELECT SUM(amount) FILTER (WHERE age <= 30) AS days_0_30,
+               SUM(amount) FILTER (WHERE age BETWEEN 31 AND 60) AS days_31_60,
+               SUM(amount) FILTER (WHERE age BETWEEN 61 AND 90) AS days_61_90,
+               SUM(amount) FILTER (WHERE age > 90) AS days_over_90,
+               MIN(due) AS oldest_due
+        FROM (
+            SELECT due, s.as_of - due AS age, amount
+            FROM generate_series(s.months_covered, s.months_charged - 1) AS m
+            CROSS JOIN LATERAL (
+                SELECT CAST(s.first_due + make_interval(months => m) AS date) AS due,
+                       s.fee - CASE WHEN m = s.months_covered THEN s.carried ELSE 0 END AS amount
+            ) charge
+        ) unpaid
+    ) o ON true
+),
+matching AS (
+    SELECT * FROM report
+    WHERE NOT CAST(:delinquent_only AS boolean) OR balance > 0
+),
+totals AS (
+    SELECT COUNT(*) AS total_units,
+           COALESCE(SUM(balance), 0) AS total_balance,
+           COALESCE(SUM(days_0_30), 0) AS total_days_0_30,
+           COALESCE(SUM(days_31_60), 0) AS total_days_31_60,
+           COALESCE(SUM(days_61_90), 0) AS total_days_61_90,
+           COALESCE(SUM(days_over_90), 0) AS total_days_over_90
+    FROM matching
+),
+page AS (
+    SELECT * FROM matching
+    ORDER BY days_over_90 DESC, balance DESC, unit_id
+    OFFSET :skip LIMIT :limit
+)
+-- Always at least one row, so the totals come back even for an empty page
+SELECT t.*, p.*
+FROM totals t
+LEFT JOIN page p ON true
+ORDER BY p.days_over_90 DESC, p.balance DESC, p.unit_id
+""").bindparams(
+    bindparam("as_of", type_=Date),
+    bindparam("since", type_=Date),
+    bindparam("property_id", type_=Integer),
+    bindparam("delinquent_only", type_=Boolean),
+    bindparam("skip", type_=Integer),
+    bindparam("limit", type_=Integer),
+)
+
+
+async def aging_report(
+    session: AsyncSession,
+    as_of: date,
+    since: Optional[date] = None,
+    property_id: Optional[int] = None,
+    delinquent_only: bool = True,
+    skip: int = 0,
+    limit: int = 100,
+) -> dict:
+    """Expected dues vs dues received per unit, with the unpaid part split by age.
+
+    ``since`` overrides each unit's creation date as the first month charged.
+    Portfolio totals cover every matching unit, not just the returned page.
+    """
+    result = await session.execute(AGING_SQL, {
+        "as_of": as_of,
+        "since": since,
+        "property_id": property_id,
+        "delinquent_only": delinquent_only,
+        "skip": skip,
+        "limit": limit,
+    })
+    rows = result.mappings().all()
+    first = rows[0]
+    totals = {"units": first["total_units"], "balance": first["total_balance"]}
+    totals.update({bucket: first[f"total_{bucket}"] for bucket in BUCKETS})
+    units = [
+        {key: row[key] for key in (
+            "unit_id", "property_id", "unit_number", "monthly_fee", "charged", "received",
+            "balance", *BUCKETS, "oldest_due",
+        )}
+        for row in rows
+        if row["unit_id"] is not None
+    ]
+    return {"as_of": as_of, "totals": totals, "units": units}
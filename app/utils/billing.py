@@ -0,0 +1,205 @@
+import os
+from datetime import date, timedelta
+from typing import Optional
+from uuid import UUID
+
+from dotenv import load_dotenv
+from sqlalchemy import Date, Integer, Text, any_, bindparam, case, cast, func, insert, literal, or_, select, true, union_all, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import (
+    BillingFrequency, BillingRun, ManagementFee, ManagementFeeBilling, Payment, PaymentStatus, PaymentType,
+    Resident, ResidentType, Unit,
+)
+from .rollups import adjust_payment_rollups_where
+
+load_dotenv()
+
+# Charges are dated the 1st of the period and due this many days later
+BILLING_DUE_DAYS = int(os.getenv("BILLING_DUE_DAYS", 15))
+
+# payments columns filled by a billing run, in the order ``_charges`` selects them
+CHARGE_COLUMNS = [
+    "unit_id", "resident_id", "amount", "payment_type", "notes",
+    "payment_date", "due_date", "status", "billing_run_id",
+]
+
+
+def billing_period(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _recurring_frequencies(period: date) -> list:
+    frequencies = [BillingFrequency.monthly]
+    if period.month in (1, 4, 7, 10):
+        frequencies.append(BillingFrequency.quarterly)
+    if period.month == 1:
+        frequencies.append(BillingFrequency.annually)
+    return frequencies
+
+
+def _constant(value, type_):
+    # Explicit casts: asyncpg can't infer parameter types in a SELECT list
+    return cast(literal(value, type_), type_)
+
+
+def _billable_residents(property_id: int):
+    """The resident each unit's charges are issued to: its earliest owner, else its earliest resident"""
+    return (
+        select(Resident.unit_id, Resident.id.label("resident_id"))
+        .join(Unit, Unit.id == Resident.unit_id)
+        .where(Unit.property_id == property_id)
+        .distinct(Resident.unit_id)
+        .order_by(Resident.unit_id, Resident.resident_type != ResidentType.owner, Resident.id)
+        .cte("billable_residents")
+    )
+
+
+def _billable_units(property_id: int):
+    """The property's units that have someone to charge, numbered so flat fees can be split between them"""
+    residents = _billable_residents(property_id)
+    return (
+        select(
+            Unit.id.label("unit_id"),
+            residents.c.resident_id,
+            Unit.monthly_fee,
+            func.row_number().over(order_by=Unit.id).label("position"),
+            func.count().over().label("unit_count"),
+        )
+        .join(residents, residents.c.unit_id == Unit.id)
+        .where(Unit.property_id == property_id)
+        .cte("billable_units")
+    )
+
+
+def _charges(property_id: int, period: date, run_id: int, one_time_fee_ids: list):
+    """Every charge for the property's units in ``period``, as rows in ``CHARGE_COLUMNS`` order.
+
+    Monthly dues come from ``Unit.monthly_fee``. Active management fees are
+    billed in the months their frequency falls due: ``rate_per_unit`` to
+    every unit, a flat ``amount`` split across the units being billed (the
+    leftover cents go to the lowest unit ids). One-time fees (special
+    assessments) are only billed when listed in ``one_time_fee_ids``.
+    """
+    payment_type = Payment.__table__.c.payment_type.type
+    status = Payment.__table__.c.status.type
+    units = _billable_units(property_id)
+    common = (
+        _constant(period, Date),
+        _constant(period + timedelta(days=BILLING_DUE_DAYS), Date),
+        _constant(PaymentStatus.pending, status),
+        _constant(run_id, Integer),
+    )
+
+    dues = (
+        select(
+            units.c.unit_id, units.c.resident_id, units.c.monthly_fee,
+            _constant(PaymentType.monthly_fee, payment_type),
+            _constant("Monthly dues", Text),
+            *common,
+        )
+        .where(units.c.monthly_fee > 0)
+    )
+
+    cents = ManagementFee.amount * 100
+    share = func.floor(cents / units.c.unit_count)
+    leftover = case((units.c.position <= cents - share * units.c.unit_count, _constant(1, Integer)), else_=_constant(0, Integer))
+    fee_amount = cast(
+        func.coalesce(ManagementFee.rate_per_unit, (share + leftover) / 100), Payment.__table__.c.amount.type
+    )
+    fee_due = or_(
+        ManagementFee.billing_frequency.in_(_recurring_frequencies(period)),
+        ManagementFee.id == any_(bindparam("one_time_fee_ids", one_time_fee_ids, type_=ARRAY(Integer))),
+    )
+    fees = (
+        select(
+            units.c.unit_id, units.c.resident_id, fee_amount,
+            case(
+                (ManagementFee.billing_frequency == BillingFrequency.one_time,
+                 _constant(PaymentType.special_assessment, payment_type)),
+                else_=_constant(PaymentType.other, payment_type),
+            ),
+            ManagementFee.fee_type,
+            *common,
+        )
+        .select_from(units)
+        .join(ManagementFee, true())
+        .where(ManagementFee.is_active == True, fee_due, fee_amount > 0)
+    )
+    return union_all(dues, fees)
+
+
+async def _claim_one_time_fees(session: AsyncSession, property_id: int, period: date, run_id: int) -> list:
+    """Mark the one-time fees this run bills: active, created by the end of ``period``, never billed to the property.
+
+    A fee created after its month was billed is picked up by the next run
+    instead of being skipped. Nothing is claimed for a property with nobody
+    to charge, so its fees wait until it has residents.
+    """
+    has_residents = select(Resident.id).join(Unit, Unit.id == Resident.unit_id).where(Unit.property_id == property_id).exists()
+    claimed = await session.execute(
+        pg_insert(ManagementFeeBilling)
+        .from_select(
+            ["fee_id", "property_id", "billing_run_id"],
+            select(ManagementFee.id, _constant(property_id, Integer), _constant(run_id, Integer)).where(
+                ManagementFee.billing_frequency == BillingFrequency.one_time,
+                ManagementFee.is_active == True,
+                cast(func.date_trunc("month", ManagementFee.created_at), Date) <= period,
+                has_residents,
+            ),
+        )
+        .on_conflict_do_nothing()
+        .returning(ManagementFeeBilling.fee_id)
+    )
+    return claimed.scalars().all()
+
+
+async def bill_property(
+    session: AsyncSession, property_id: int, period: date, created_by: Optional[UUID] = None
+) -> Optional[BillingRun]:
+    """Charge one property for ``period``; ``None`` if it was already billed.
+
+    Claims the (property, period) slot first, so concurrent or repeated runs
+    never double bill, then inserts every charge with one ``INSERT ... SELECT``
+    and folds them into the payment rollups. Units with no resident get no
+    charges (see ``units_without_resident``). The caller commits.
+    """
+    period = billing_period(period)
+    claimed = await session.execute(
+        pg_insert(BillingRun)
+        .values(property_id=property_id, period=period, created_by=created_by)
+        .on_conflict_do_nothing(constraint="uq_billing_runs_property_period")
+        .returning(BillingRun.id)
+    )
+    run_id = claimed.scalar()
+    if run_id is None:
+        return None
+
+    one_time_fee_ids = await _claim_one_time_fees(session, property_id, period, run_id)
+    await session.execute(
+        insert(Payment).from_select(CHARGE_COLUMNS, _charges(property_id, period, run_id, one_time_fee_ids))
+    )
+    totals = await session.execute(
+        select(func.count(), func.count(func.distinct(Payment.unit_id)), func.coalesce(func.sum(Payment.amount), 0))
+        .where(Payment.billing_run_id == run_id)
+    )
+    charges_created, units_billed, total_amount = totals.one()
+    await adjust_payment_rollups_where(session, [Payment.billing_run_id == run_id])
+
+    await session.execute(
+        update(BillingRun)
+        .where(BillingRun.id == run_id)
+        .values(units_billed=units_billed, charges_created=charges_created, total_amount=total_amount)
+    )
+    return await session.get(BillingRun, run_id)
+
+
+async def units_without_resident(session: AsyncSession, property_id: int) -> list:
+    """Ids of the property's units that billing skips because nobody lives there to charge"""
+    result = await session.execute(
+        select(Unit.id)
+        .where(Unit.property_id == property_id, ~select(Resident.id).where(Resident.unit_id == Unit.id).exists())
+        .order_by(Unit.id)
+    )
+    return result.scalars().all()
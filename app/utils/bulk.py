@@ -0,0 +1,85 @@
+import json
+from typing import Sequence
+
+import asyncpg
+from sqlalchemy import exc, insert, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Records retried per COPY after the whole batch was rejected
+FALLBACK_CHUNK_SIZE = 1000
+
+# What a rejected row raises: through SQLAlchemy, from the server during asyncpg's
+# COPY, or from asyncpg encoding a value client side (a ValueError subclass)
+ROW_ERRORS = (exc.DBAPIError, asyncpg.PostgresError, ValueError)
+
+
+async def copy_rows(session: AsyncSession, table, columns: Sequence[str], records: list) -> int:
+    """Bulk insert ``records`` (tuples in ``columns`` order) inside the session's transaction.
+
+    Uses asyncpg's binary ``COPY`` when available and falls back to an
+    executemany ``INSERT`` otherwise. Columns left out of ``columns`` take
+    their server defaults either way. JSONB values may be passed as Python
+    objects; they are serialized here because COPY expects text.
+    """
+    if not records:
+        return 0
+
+    json_positions = [i for i, name in enumerate(columns) if isinstance(table.c[name].type, JSONB)]
+
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    driver = raw.driver_connection
+
+    if hasattr(driver, "copy_records_to_table"):
+        # SQLAlchemy opens the asyncpg transaction lazily on the first
+        # statement; make sure COPY runs inside it rather than autocommitting
+        if not getattr(raw.connection, "_started", True):
+            await connection.execute(text("SELECT 1"))
+        if json_positions:
+            records = [
+                tuple(json.dumps(value) if i in json_positions and value is not None else value
+                      for i, value in enumerate(record))
+                for record in records
+            ]
+        await driver.copy_records_to_table(table.name, records=records, columns=list(columns))
+    else:
+        await session.execute(insert(table), [dict(zip(columns, record)) for record in records])
+    return len(records)
+
+
+async def copy_rows_reporting(
+    session: AsyncSession, table, columns: Sequence[str], records: list, keys: list,
+    chunk_size: int = FALLBACK_CHUNK_SIZE,
+) -> tuple:
+    """``copy_rows`` where a record the database rejects fails on its own.
+
+    Everything goes in one COPY under a savepoint first. If the database
+    rejects it, the records are retried ``chunk_size`` at a time, and a chunk
+    that fails again row by row. Returns ``(inserted, [(key, error), ...])``,
+    where ``keys[i]`` names ``records[i]`` in the failures.
+    """
+    if not records:
+        return 0, []
+    try:
+        async with session.begin_nested():
+            return await copy_rows(session, table, columns, records), []
+    except ROW_ERRORS:
+        pass
+
+    inserted, failures = 0, []
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        try:
+            async with session.begin_nested():
+                inserted += await copy_rows(session, table, columns, chunk)
+            continue
+        except ROW_ERRORS:
+            pass
+        for key, record in zip(keys[start:start + chunk_size], chunk):
+            try:
+                async with session.begin_nested():
+                    inserted += await copy_rows(session, table, columns, [record])
+            except ROW_ERRORS as e:
+                failures.append((key, str(e)))
+    return inserted, failures
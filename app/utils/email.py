@@ -1,25 +1,264 @@
+import asyncio
+import logging
 import os
+import time
 from email.message import EmailMessage
-from aiosmtplib import SMTP
+from typing import Optional
+from aiosmtplib import SMTP, SMTPConnectError, SMTPServerDisconnected, SMTPTimeoutError
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 EMAIL_FROM = os.getenv("EMAIL_FROM", EMAIL_USER)
+EMAIL_START_TLS = os.getenv("EMAIL_START_TLS", "true").lower() == "true"
 
-async def send_email_async(to_email: str, subject: str, body: str):
+# Background dispatcher tuning
+EMAIL_POOL_SIZE = int(os.getenv("EMAIL_POOL_SIZE", 2))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 50))
+EMAIL_QUEUE_SIZE = int(os.getenv("EMAIL_QUEUE_SIZE", 10000))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", 1))
+EMAIL_IDLE_TIMEOUT_SECONDS = float(os.getenv("EMAIL_IDLE_TIMEOUT_SECONDS", 60))
+
+# Errors after which the SMTP session can't be reused
+CONNECTION_ERRORS = (SMTPServerDisconnected, SMTPConnectError, SMTPTimeoutError, OSError)
+
+
+def build_message(to_email: str, subject: str, body: str) -> EmailMessage:
     message = EmailMessage()
     message["From"] = EMAIL_FROM
     message["To"] = to_email
     message["Subject"] = subject
     message.set_content(body)
+    return message
 
-    smtp = SMTP(hostname=EMAIL_HOST, port=EMAIL_PORT, start_tls=True)
+
+async def open_smtp() -> SMTP:
+    smtp = SMTP(hostname=EMAIL_HOST, port=EMAIL_PORT, start_tls=EMAIL_START_TLS)
     await smtp.connect()
-    await smtp.login(EMAIL_USER, EMAIL_PASSWORD)
-    await smtp.send_message(message)
-    await smtp.quit() 
\ No newline at end of file
+    if EMAIL_USER:
+        await smtp.login(EMAIL_USER, EMAIL_PASSWORD)
+    return smtp
+
+
+async def send_email_async(to_email: str, subject: str, body: str):
+    """Send one message over a dedicated SMTP session"""
+    smtp = await open_smtp()
+    try:
+        await smtp.send_message(build_message(to_email, subject, body))
+    finally:
+        await smtp.quit()
+
+
+class EmailQueueFull(Exception):
+    """Raised when the dispatcher queue is at capacity"""
+
+
+class _Job:
+    __slots__ = ("message", "attempts", "max_attempts", "future")
+
+    def __init__(self, message: EmailMessage, future: asyncio.Future, max_attempts: int):
+        self.message = message
+        self.attempts = 0
+        self.max_attempts = max_attempts
+        self.future = future
+
+
+class EmailDispatcher:
+    """Delivers queued messages over a small pool of persistent SMTP sessions.
+
+    Each worker owns one connection, drains up to ``batch_size`` queued
+    messages per wake-up and sends them all on that session. Broken sessions
+    are dropped and reopened on the next message; failed messages are retried
+    with exponential backoff until ``max_attempts``.
+    """
+
+    def __init__(self, pool_size: int = 2, batch_size: int = 50, queue_size: int = 10000,
+                 max_attempts: int = 5, retry_base_seconds: float = 1, idle_timeout: float = 60):
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.idle_timeout = idle_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._started_at: Optional[float] = None
+        # job -> TimerHandle of messages waiting out a retry backoff
+        self._retry_timers: dict = {}
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+        self.connections_opened = 0
+        self.send_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._started_at = time.monotonic()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.pool_size)]
+
+    async def stop(self, timeout: float = 10):
+        """Give queued mail and pending retries a short grace period, then stop the workers"""
+        if not self._workers:
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                await asyncio.wait_for(self._queue.join(), max(0.0, deadline - loop.time()))
+                if not self._retry_timers:
+                    break
+                if loop.time() >= deadline:
+                    raise asyncio.TimeoutError
+                await asyncio.sleep(min(0.1, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Email dispatcher stopped with %s message(s) still queued and %s waiting to retry; dropping them",
+                self.queue_depth, len(self._retry_timers),
+            )
+        for job, timer in list(self._retry_timers.items()):
+            timer.cancel()
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("Email dispatcher stopped before the retry"))
+        self._retry_timers.clear()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, message: EmailMessage, max_attempts: Optional[int] = None) -> asyncio.Future:
+        """Queue a message; the returned future resolves once it has been delivered.
+
+        Pass ``max_attempts=1`` when the caller retries failures itself.
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(self._log_failure)
+        try:
+            self._queue.put_nowait(_Job(message, future, max_attempts or self.max_attempts))
+        except asyncio.QueueFull:
+            raise EmailQueueFull("Email queue is full")
+        self.enqueued += 1
+        return future
+
+    def send(self, to_email: str, subject: str, body: str, max_attempts: Optional[int] = None) -> asyncio.Future:
+        return self.submit(build_message(to_email, subject, body), max_attempts=max_attempts)
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning("Giving up on email delivery: %s", future.exception())
+
+    async def _worker(self):
+        smtp: Optional[SMTP] = None
+        try:
+            while True:
+                try:
+                    job = await asyncio.wait_for(self._queue.get(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    smtp = await self._close(smtp)
+                    continue
+
+                batch = [job]
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                self.batches += 1
+                smtp = await self._deliver(smtp, batch)
+        finally:
+            await self._close(smtp)
+
+    async def _close(self, smtp: Optional[SMTP]):
+        if smtp is not None:
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+        return None
+
+    async def _deliver(self, smtp: Optional[SMTP], batch: list) -> Optional[SMTP]:
+        for job in batch:
+            start = time.perf_counter()
+            try:
+                if smtp is None or not smtp.is_connected:
+                    smtp = await open_smtp()
+                    self.connections_opened += 1
+                await smtp.send_message(job.message)
+                self.sent += 1
+                if not job.future.done():
+                    job.future.set_result(True)
+            except Exception as e:
+                if isinstance(e, CONNECTION_ERRORS):
+                    if smtp is not None:
+                        smtp.close()
+                    smtp = None
+                self._retry_or_fail(job, e)
+            finally:
+                self.send_seconds += time.perf_counter() - start
+                self._queue.task_done()
+        return smtp
+
+    def _retry_or_fail(self, job: _Job, error: Exception):
+        job.attempts += 1
+        if job.attempts >= job.max_attempts:
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(error)
+            return
+        self.retried += 1
+        delay = self.retry_base_seconds * (2 ** (job.attempts - 1))
+        self._retry_timers[job] = asyncio.get_running_loop().call_later(delay, self._requeue, job, error)
+
+    def _requeue(self, job: _Job, error: Exception):
+        self._retry_timers.pop(job, None)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(error)
+
+    def stats(self) -> dict:
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "queue_depth": self.queue_depth,
+            "retry_pending": len(self._retry_timers),
+            "workers": len(self._workers),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "batches": self.batches,
+            "connections_opened": self.connections_opened,
+            "average_send_seconds": self.send_seconds / (self.sent + self.failed + self.retried) if self.sent + self.failed + self.retried else 0.0,
+            "messages_per_second": self.sent / uptime if uptime else 0.0,
+        }
+
+
+email_dispatcher = EmailDispatcher(
+    pool_size=EMAIL_POOL_SIZE,
+    batch_size=EMAIL_BATCH_SIZE,
+    queue_size=EMAIL_QUEUE_SIZE,
+    max_attempts=EMAIL_MAX_ATTEMPTS,
+    retry_base_seconds=EMAIL_RETRY_BASE_SECONDS,
+    idle_timeout=EMAIL_IDLE_TIMEOUT_SECONDS,
+)
+
+
+def enqueue_email(to_email: str, subject: str, body: str) -> asyncio.Future:
+    """Hand a message to the background dispatcher without waiting for delivery"""
+    return email_dispatcher.send(to_email, subject, body)
@@ -0,0 +1,86 @@
+import csv
+import enum
+import io
+import json
+import logging
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from fastapi.responses import StreamingResponse
+from dotenv import load_dotenv
+
+from ..database import read_session_factory
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _plain(value):
+    """Convert a column value to something json/csv can write verbatim"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+async def _stream_rows(query, format: str, chunk_size: int):
+    # The request-scoped session is closed before a streaming body is sent,
+    # so the export owns its own (replica, when available) session for the
+    # lifetime of the cursor.
+    try:
+        async with read_session_factory()() as session:
+            result = await session.stream(query.execution_options(yield_per=chunk_size))
+
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(result.keys())
+                async for partition in result.partitions(chunk_size):
+                    for row in partition:
+                        writer.writerow(["" if value is None else _plain(value) for value in row])
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue()
+            else:
+                keys = list(result.keys())
+                async for partition in result.partitions(chunk_size):
+                    yield "".join(
+                        json.dumps({key: _plain(value) for key, value in zip(keys, row)}) + "\n"
+                        for row in partition
+                    )
+    except Exception as e:
+        # Headers (and a 200) are long gone. NDJSON ends with an error record;
+        # either way re-raising aborts the response, so the client sees an
+        # incomplete transfer rather than a short file that looks finished.
+        logger.exception("Export failed mid-stream")
+        if format != "csv":
+            yield json.dumps({"error": f"Export failed: {str(e)}", "complete": False}) + "\n"
+        raise
+
+
+def export_response(query, format: str, filename: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> StreamingResponse:
+    """Stream a column query as NDJSON or CSV through a server-side cursor.
+
+    ``query`` should select plain columns (not ORM entities) so rows are never
+    materialized as objects; memory stays bounded by ``chunk_size``.
+    """
+    return StreamingResponse(
+        _stream_rows(query, format, chunk_size),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
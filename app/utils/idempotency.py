@@ -0,0 +1,338 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from starlette.responses import JSONResponse, Response
+
+from ..auth import get_principal, verify_token
+from ..database import AsyncSessionLocal
+from ..models import IdempotencyKey
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", 86400))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 10000))
+# Larger responses are not stored; a retry simply runs again
+IDEMPOTENCY_MAX_BODY_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BODY_BYTES", 1024 * 1024))
+# How often each worker deletes expired keys
+IDEMPOTENCY_PURGE_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_SECONDS", 600))
+# How long a running request holds its key; a retry after that runs it again
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 60))
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    content_type: Optional[str]
+    body: bytes
+    expires_at: float  # time.time()
+
+
+class ResponseCache:
+    """Per-process LRU of completed responses, so hot retries never reach the database"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, scope_id: str) -> Optional[StoredResponse]:
+        stored = self._entries.get(scope_id)
+        if stored is None or stored.expires_at <= time.time():
+            self._entries.pop(scope_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(scope_id)
+        self.hits += 1
+        return stored
+
+    def set(self, scope_id: str, stored: StoredResponse):
+        if self.max_size <= 0:
+            return
+        self._entries[scope_id] = stored
+        self._entries.move_to_end(scope_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache(max_size=IDEMPOTENCY_CACHE_SIZE)
+
+
+def _scope_id(subject: str, scope, key: bytes) -> str:
+    # Bound to the verified user rather than the token, so a key still
+    # replays after the client refreshes its token
+    digest = hashlib.sha256()
+    for part in (subject.encode(), scope["method"].encode(), scope["path"].encode(), key):
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+async def _authenticate(scope):
+    """``(subject, None)`` for a request a stored response may be replayed to, else ``(None, error response)``.
+
+    Checked the way ``get_current_user`` checks it, since a replay never
+    reaches the route's own dependencies. Requests without credentials (login,
+    registration) share the anonymous subject ``""``.
+    """
+    authorization = dict(scope["headers"]).get(b"authorization")
+    if authorization is None:
+        return "", None
+
+    unauthorized = JSONResponse(
+        {"detail": "Could not validate credentials"}, status_code=401, headers={"WWW-Authenticate": "Bearer"}
+    )
+    scheme, _, token = authorization.decode("latin-1").partition(" ")
+    payload = verify_token(token) if scheme.lower() == "bearer" and token else None
+    subject = payload.get("sub") if payload else None
+    if subject is None:
+        return None, unauthorized
+
+    async with AsyncSessionLocal() as session:
+        principal = await get_principal(session, subject)
+    if principal is None:
+        return None, unauthorized
+    if not principal.is_active:
+        return None, JSONResponse({"detail": "Inactive user"}, status_code=400)
+    return str(subject), None
+
+
+def _request_hash(scope, body: bytes) -> str:
+    # Query parameters drive some POST routes, so they are part of "the same request"
+    digest = hashlib.sha256()
+    for part in (scope.get("query_string", b""), body):
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _replay(stored: StoredResponse) -> Response:
+    headers = {"Idempotent-Replayed": "true"}
+    return Response(stored.body, status_code=stored.status_code, media_type=stored.content_type, headers=headers)
+
+
+class IdempotencyMiddleware:
+    """Honors ``Idempotency-Key`` on POST requests.
+
+    The first request with a key claims a row in ``idempotency_keys`` and runs
+    normally; its response is stored (unless it is a 5xx or 429, which frees
+    the key for a retry). Retries with the same key, user and path get the
+    stored response back without the route running again, from this worker's
+    cache when possible; the token is verified first, so a stored response is
+    never replayed to invalid credentials or a deactivated user. A retry that arrives while the original is still
+    running gets 409, and reusing a key for a different body or query string
+    gets 422. A claim is leased for ``lock_seconds``; once that runs out
+    without a stored response, a retry takes the key over and runs again.
+    """
+
+    def __init__(self, app, ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+                 max_body_bytes: int = IDEMPOTENCY_MAX_BODY_BYTES,
+                 purge_seconds: float = IDEMPOTENCY_PURGE_SECONDS,
+                 lock_seconds: float = IDEMPOTENCY_LOCK_SECONDS):
+        self.app = app
+        self.ttl_seconds = ttl_seconds
+        self.max_body_bytes = max_body_bytes
+        self.purge_seconds = purge_seconds
+        self.lock_seconds = lock_seconds
+        self._last_purge = time.monotonic()
+        self._purge_task: Optional[asyncio.Task] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        key = dict(scope["headers"]).get(HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await JSONResponse(
+                {"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"}, status_code=400
+            )(scope, receive, send)
+            return
+
+        subject, rejected = await _authenticate(scope)
+        if rejected is not None:
+            await rejected(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        request_hash = _request_hash(scope, body)
+        scope_id = _scope_id(subject, scope, key)
+
+        lease = None
+        stored = response_cache.get(scope_id)
+        if stored is None:
+            lease, stored = await self._claim(scope_id, request_hash)
+            if lease is None and stored is None:
+                await JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still being processed"}, status_code=409
+                )(scope, receive, send)
+                return
+
+        if lease is None:
+            if stored.request_hash != request_hash:
+                await JSONResponse(
+                    {"detail": "Idempotency-Key was already used with a different request body"}, status_code=422
+                )(scope, receive, send)
+                return
+            response_cache.set(scope_id, stored)
+            await _replay(stored)(scope, receive, send)
+            return
+
+        await self._run_and_store(scope, body, receive, send, scope_id, request_hash, lease)
+        self._maybe_purge()
+
+    async def _claim(self, scope_id: str, request_hash: str):
+        """``(lease, None)`` if this request now owns the key, else ``(None, stored or None while running)``"""
+        now = datetime.now(timezone.utc)
+        lease = now + timedelta(seconds=self.lock_seconds)
+        table = IdempotencyKey.__table__
+        statement = pg_insert(table).values(
+            scope_id=scope_id, request_hash=request_hash, locked_until=lease,
+            expires_at=now + timedelta(seconds=self.ttl_seconds),
+        )
+        # An expired row, or a claim whose worker never finished, is taken over
+        # in place rather than waiting for the purge
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.scope_id],
+            set_={
+                "request_hash": statement.excluded.request_hash,
+                "status_code": None,
+                "content_type": None,
+                "response_body": None,
+                "created_at": func.now(),
+                "locked_until": statement.excluded.locked_until,
+                "expires_at": statement.excluded.expires_at,
+            },
+            where=or_(
+                table.c.expires_at < func.now(),
+                and_(table.c.status_code.is_(None), table.c.locked_until < func.now()),
+            ),
+        ).returning(table.c.scope_id)
+
+        async with AsyncSessionLocal() as session:
+            claimed = (await session.execute(statement)).first() is not None
+            if claimed:
+                await session.commit()
+                return lease, None
+            row = (await session.execute(select(IdempotencyKey).where(IdempotencyKey.scope_id == scope_id))).scalar_one_or_none()
+            if row is None or row.status_code is None:
+                return None, None
+            return None, StoredResponse(
+                request_hash=row.request_hash,
+                status_code=row.status_code,
+                content_type=row.content_type,
+                body=row.response_body or b"",
+                expires_at=row.expires_at.timestamp(),
+            )
+
+    async def _run_and_store(self, scope, body: bytes, receive, send, scope_id: str, request_hash: str,
+                             lease: datetime):
+        body_sent = False
+
+        async def replay_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": None, "content_type": None, "chunks": [], "size": 0}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["content_type"] = dict(message.get("headers", [])).get(b"content-type", b"").decode() or None
+            elif message["type"] == "http.response.body" and response["size"] <= self.max_body_bytes:
+                chunk = message.get("body", b"")
+                response["chunks"].append(chunk)
+                response["size"] += len(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        finally:
+            await self._store(scope_id, request_hash, response, lease)
+
+    async def _store(self, scope_id: str, request_hash: str, response: dict, lease: datetime):
+        status = response["status"]
+        # Only while the row still carries this request's lease; after a
+        # takeover the key belongs to the retry
+        owned = (IdempotencyKey.scope_id == scope_id, IdempotencyKey.locked_until == lease)
+        try:
+            async with AsyncSessionLocal() as session:
+                if status is None or status >= 500 or status == 429 or response["size"] > self.max_body_bytes:
+                    await session.execute(delete(IdempotencyKey).where(*owned))
+                else:
+                    body = b"".join(response["chunks"])
+                    result = await session.execute(
+                        update(IdempotencyKey)
+                        .where(*owned)
+                        .values(status_code=status, content_type=response["content_type"], response_body=body)
+                        .returning(IdempotencyKey.expires_at)
+                        .execution_options(synchronize_session=False)
+                    )
+                    expires_at = result.scalar()
+                    if expires_at is not None:
+                        response_cache.set(scope_id, StoredResponse(
+                            request_hash=request_hash,
+                            status_code=status,
+                            content_type=response["content_type"],
+                            body=body,
+                            expires_at=expires_at.timestamp(),
+                        ))
+                await session.commit()
+        except Exception:
+            # The key stays claimed until its lease runs out; retries get 409 meanwhile
+            logger.exception("Failed to store idempotent response for %s", scope_id)
+
+    def _maybe_purge(self):
+        now = time.monotonic()
+        if now - self._last_purge < self.purge_seconds:
+            return
+        if self._purge_task is not None and not self._purge_task.done():
+            return
+        self._last_purge = now
+        self._purge_task = asyncio.create_task(purge_expired_keys())
+
+
+async def purge_expired_keys() -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < func.now()))
+            await session.commit()
+            return result.rowcount
+    except Exception:
+        logger.exception("Failed to purge expired idempotency keys")
+        return 0
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import Date, Integer, Numeric, Text, any_, bindparam, cast, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from ..database import AsyncSessionLocal
+from ..models import Payment, PaymentStatus, PaymentType, Property, Unit
+from .rollups import adjust_payment_rollups
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LATE_FEE_JOB_ENABLED = os.getenv("LATE_FEE_JOB_ENABLED", "false").lower() == "true"
+LATE_FEE_INTERVAL_SECONDS = float(os.getenv("LATE_FEE_INTERVAL_SECONDS", 3600))
+# Days past due_date before a pending payment is marked overdue
+LATE_FEE_GRACE_DAYS = int(os.getenv("LATE_FEE_GRACE_DAYS", 0))
+# Fee per overdue payment: flat amount plus a percentage of the payment
+LATE_FEE_FLAT = Decimal(os.getenv("LATE_FEE_FLAT", "25.00"))
+LATE_FEE_PERCENT = Decimal(os.getenv("LATE_FEE_PERCENT", "0"))
+# The late fee itself is due this many days after it is charged
+LATE_FEE_DUE_DAYS = int(os.getenv("LATE_FEE_DUE_DAYS", 15))
+
+# payments columns filled for a late fee, in the order ``_late_fees`` selects them
+FEE_COLUMNS = ["unit_id", "resident_id", "amount", "payment_type", "notes", "payment_date", "due_date", "status"]
+
+
+def _constant(value, type_):
+    return cast(literal(value, type_), type_)
+
+
+def _late_fees(payment_ids: list, today: date, flat: Decimal, percent: Decimal):
+    """One pending late-fee row per payment in ``payment_ids``, in ``FEE_COLUMNS`` order"""
+    payment_type = Payment.__table__.c.payment_type.type
+    status = Payment.__table__.c.status.type
+    amount = func.round(_constant(flat, Numeric(10, 2)) + Payment.amount * _constant(percent, Numeric(6, 3)) / 100, 2)
+    return (
+        select(
+            Payment.unit_id,
+            Payment.resident_id,
+            amount,
+            _constant(PaymentType.late_fee, payment_type),
+            _constant("Late fee for payment #", Text).concat(cast(Payment.id, Text)),
+            _constant(today, Date),
+            _constant(today + timedelta(days=LATE_FEE_DUE_DAYS), Date),
+            _constant(PaymentStatus.pending, status),
+        )
+        .where(Payment.id == any_(bindparam("overdue_ids", payment_ids, type_=ARRAY(Integer))), amount > 0)
+        .order_by(Payment.id)
+    )
+
+
+class LateFeeJob:
+    """Marks pending payments past due as overdue and charges a late fee for each.
+
+    Works one property per transaction: a single ``UPDATE ... RETURNING``
+    flips the property's overdue payments, one ``INSERT ... SELECT`` creates
+    their fees, and the payment rollups are adjusted for both before commit.
+    Only rows still ``pending`` are updated, so a payment is charged at most
+    once even when several workers run the job at the same time. Late fees
+    themselves go overdue but never accrue further fees.
+    """
+
+    def __init__(self, interval_seconds: float = 3600, grace_days: int = 0,
+                 flat: Decimal = Decimal("25.00"), percent: Decimal = Decimal("0")):
+        self.interval_seconds = interval_seconds
+        self.grace_days = grace_days
+        self.flat = flat
+        self.percent = percent
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.marked_overdue = 0
+        self.fees_created = 0
+        self.last_run: Optional[dict] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Late fee run failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, today: Optional[date] = None, property_ids: Optional[list] = None) -> dict:
+        """Process every property (or ``property_ids``); returns counts and throughput"""
+        today = today or date.today()
+        cutoff = today - timedelta(days=self.grace_days)
+        started = time.perf_counter()
+        marked = fees = 0
+
+        async with AsyncSessionLocal() as session:
+            query = select(Property.id).order_by(Property.id)
+            if property_ids is not None:
+                query = query.where(Property.id.in_(property_ids))
+            properties = (await session.execute(query)).scalars().all()
+
+            for property_id in properties:
+                property_marked, property_fees = await self._process_property(session, property_id, cutoff, today)
+                await session.commit()
+                marked += property_marked
+                fees += property_fees
+
+        seconds = time.perf_counter() - started
+        self.runs += 1
+        self.marked_overdue += marked
+        self.fees_created += fees
+        self.last_run = {
+            "as_of": today.isoformat(),
+            "properties": len(properties),
+            "marked_overdue": marked,
+            "late_fees_created": fees,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round((marked + fees) / seconds, 1) if seconds > 0 else None,
+        }
+        logger.info("Late fee run: %s", self.last_run)
+        return self.last_run
+
+    async def _process_property(self, session, property_id: int, cutoff: date, today: date):
+        result = await session.execute(
+            update(Payment)
+            .where(
+                Payment.status == PaymentStatus.pending,
+                Payment.due_date < cutoff,
+                Payment.unit_id.in_(select(Unit.id).where(Unit.property_id == property_id)),
+            )
+            .values(status=PaymentStatus.overdue)
+            .returning(Payment.id, Payment.payment_type)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        if not rows:
+            return 0, 0
+
+        overdue_ids = [row.id for row in rows]
+        await adjust_payment_rollups(session, overdue_ids, sign=-1, status=PaymentStatus.pending)
+        await adjust_payment_rollups(session, overdue_ids)
+
+        chargeable = [row.id for row in rows if row.payment_type != PaymentType.late_fee]
+        fee_ids = []
+        if chargeable:
+            created = await session.execute(
+                insert(Payment)
+                .from_select(FEE_COLUMNS, _late_fees(chargeable, today, self.flat, self.percent))
+                .returning(Payment.id)
+            )
+            fee_ids = created.scalars().all()
+            await adjust_payment_rollups(session, fee_ids)
+        return len(overdue_ids), len(fee_ids)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "runs": self.runs,
+            "marked_overdue": self.marked_overdue,
+            "fees_created": self.fees_created,
+            "last_run": self.last_run,
+        }
+
+
+late_fee_job = LateFeeJob(
+    interval_seconds=LATE_FEE_INTERVAL_SECONDS,
+    grace_days=LATE_FEE_GRACE_DAYS,
+    flat=LATE_FEE_FLAT,
+    percent=LATE_FEE_PERCENT,
+)
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+from uuid import UUID
+
+from dotenv import load_dotenv
+from sqlalchemy import Date, Integer, bindparam, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import AsyncSessionLocal
+from ..models import (
+    AccountBalanceSnapshot, FinancialAccount, JournalEntry, JournalLine, Payment, PaymentStatus, PaymentType,
+)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def _account_id(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+# Accounts received payments post to; payments are not posted unless the
+# operating and income accounts are configured
+LEDGER_OPERATING_ACCOUNT_ID = _account_id("LEDGER_OPERATING_ACCOUNT_ID")
+LEDGER_SPECIAL_ASSESSMENT_ACCOUNT_ID = _account_id("LEDGER_SPECIAL_ASSESSMENT_ACCOUNT_ID")
+LEDGER_INCOME_ACCOUNT_ID = _account_id("LEDGER_INCOME_ACCOUNT_ID")
+# Equity account that offsets the opening balances of new accounts
+LEDGER_OPENING_BALANCE_ACCOUNT_ID = _account_id("LEDGER_OPENING_BALANCE_ACCOUNT_ID")
+
+LEDGER_SNAPSHOT_JOB_ENABLED = os.getenv("LEDGER_SNAPSHOT_JOB_ENABLED", "false").lower() == "true"
+LEDGER_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("LEDGER_SNAPSHOT_INTERVAL_SECONDS", 86400))
+
+RECEIVED_STATUSES = (PaymentStatus.paid, PaymentStatus.partial)
+CENT = Decimal("0.01")
+
+
+class LedgerError(ValueError):
+    """An entry that can't be posted (unbalanced, unknown account, ...)"""
+
+
+async def post_entry(
+    session: AsyncSession,
+    entry_date: date,
+    lines: Iterable[tuple],
+    description: Optional[str] = None,
+    source: str = "manual",
+    source_id: Optional[int] = None,
+    created_by: Optional[UUID] = None,
+) -> JournalEntry:
+    """Record a balanced entry of ``(account_id, amount)`` lines in the caller's transaction.
+
+    Each touched account's running ``balance`` and every snapshot dated on or
+    after ``entry_date`` move by the account's net amount, so balances stay
+    correct for back-dated entries without rescanning history.
+    """
+    lines = [(account_id, Decimal(amount).quantize(CENT)) for account_id, amount in lines]
+    if len(lines) < 2:
+        raise LedgerError("A journal entry needs at least two lines")
+    if any(amount == 0 for _, amount in lines):
+        raise LedgerError("Journal line amounts must be non-zero")
+    if sum(amount for _, amount in lines) != 0:
+        raise LedgerError("Journal entry does not balance: debits and credits must sum to zero")
+
+    net: dict = {}
+    for account_id, amount in lines:
+        net[account_id] = net.get(account_id, Decimal("0")) + amount
+    found = await session.execute(select(FinancialAccount.id).where(FinancialAccount.id.in_(net)))
+    missing = set(net) - set(found.scalars().all())
+    if missing:
+        raise LedgerError(f"Unknown accounts: {sorted(missing)}")
+
+    entry = JournalEntry(
+        entry_date=entry_date,
+        description=description,
+        source=source,
+        source_id=source_id,
+        created_by=created_by,
+        lines=[JournalLine(account_id=account_id, entry_date=entry_date, amount=amount) for account_id, amount in lines],
+    )
+    session.add(entry)
+    await session.flush()
+
+    # Fixed account order so concurrent postings lock balances without deadlocking
+    for account_id in sorted(net):
+        delta = net[account_id]
+        if delta == 0:
+            continue
+        await session.execute(
+            update(FinancialAccount)
+            .where(FinancialAccount.id == account_id)
+            .values(balance=func.coalesce(FinancialAccount.balance, 0) + delta)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(
+            update(AccountBalanceSnapshot)
+            .where(AccountBalanceSnapshot.account_id == account_id, AccountBalanceSnapshot.as_of >= entry_date)
+            .values(balance=AccountBalanceSnapshot.balance + delta)
+            .execution_options(synchronize_session=False)
+        )
+    return entry
+
+
+async def balance_as_of(session: AsyncSession, account_id: int, as_of: date) -> dict:
+    """Balance at the end of ``as_of``: nearest snapshot on or before it plus the lines after it"""
+    snapshot = (await session.execute(
+        select(AccountBalanceSnapshot.as_of, AccountBalanceSnapshot.balance)
+        .where(AccountBalanceSnapshot.account_id == account_id, AccountBalanceSnapshot.as_of <= as_of)
+        .order_by(AccountBalanceSnapshot.as_of.desc())
+        .limit(1)
+    )).first()
+
+    criteria = [JournalLine.account_id == account_id, JournalLine.entry_date <= as_of]
+    if snapshot is not None:
+        criteria.append(JournalLine.entry_date > snapshot.as_of)
+    delta = (await session.execute(
+        select(func.coalesce(func.sum(JournalLine.amount), 0)).where(*criteria)
+    )).scalar()
+
+    return {
+        "account_id": account_id,
+        "as_of": as_of,
+        "balance": (snapshot.balance if snapshot is not None else Decimal("0")) + delta,
+        "snapshot_as_of": snapshot.as_of if snapshot is not None else None,
+    }
+
+
+CHECKPOINT_SQL = text("""
+INSERT INTO account_balance_snapshots (account_id, as_of, balance)
+SELECT a.id, CAST(:as_of AS date), COALESCE(s.balance, 0) + COALESCE(d.delta, 0)
+FROM financial_accounts a
+LEFT JOIN LATERAL (
+    SELECT as_of, balance
+    FROM account_balance_snapshots
+    WHERE account_id = a.id AND as_of < CAST(:as_of AS date)
+    ORDER BY as_of DESC
+    LIMIT 1
+) s ON true
+LEFT JOIN LATERAL (
+    SELECT SUM(l.amount) AS delta
+    FROM journal_lines l
+    WHERE l.account_id = a.id
+      AND l.entry_date <= CAST(:as_of AS date)
+      AND (s.as_of IS NULL OR l.entry_date > s.as_of)
+) d ON true
+WHERE a.id = :account_id
+ON CONFLICT (account_id, as_of) DO NOTHING
+""").bindparams(bindparam("as_of", type_=Date), bindparam("account_id", type_=Integer))
+
+
+async def checkpoint_balances(session: AsyncSession, as_of: date) -> int:
+    """Snapshot every account's balance at the end of ``as_of``; returns the snapshots written.
+
+    Each snapshot is the previous one plus the lines since, so a checkpoint
+    only scans the period it closes. Accounts are checkpointed and committed
+    one at a time under a lock on the account's row, the same row
+    ``post_entry`` updates before it adjusts snapshots: a concurrent posting
+    is either counted in the snapshot or adds itself to it once committed,
+    and only postings to that one account wait, for one statement.
+    """
+    account_ids = (await session.execute(select(FinancialAccount.id).order_by(FinancialAccount.id))).scalars().all()
+    await session.commit()
+
+    written = 0
+    for account_id in account_ids:
+        await session.execute(select(FinancialAccount.id).where(FinancialAccount.id == account_id).with_for_update())
+        result = await session.execute(CHECKPOINT_SQL, {"as_of": as_of, "account_id": account_id})
+        await session.commit()
+        written += result.rowcount
+    return written
+
+
+async def post_opening_balance(
+    session: AsyncSession, account: FinancialAccount, amount: Decimal, created_by: Optional[UUID] = None
+) -> JournalEntry:
+    """Post a new account's opening balance against the opening balance equity account"""
+    if LEDGER_OPENING_BALANCE_ACCOUNT_ID is None:
+        raise LedgerError("Opening balances need LEDGER_OPENING_BALANCE_ACCOUNT_ID to be configured")
+    return await post_entry(
+        session, date.today(), [(account.id, amount), (LEDGER_OPENING_BALANCE_ACCOUNT_ID, -amount)],
+        description=f"Opening balance of {account.account_name}", source="opening_balance",
+        source_id=account.id, created_by=created_by,
+    )
+
+
+def _payment_lines(payment: Payment) -> Optional[list]:
+    if payment.status not in RECEIVED_STATUSES or not payment.amount:
+        return None
+    if LEDGER_OPERATING_ACCOUNT_ID is None or LEDGER_INCOME_ACCOUNT_ID is None:
+        return None
+    cash_account = LEDGER_OPERATING_ACCOUNT_ID
+    if payment.payment_type == PaymentType.special_assessment and LEDGER_SPECIAL_ASSESSMENT_ACCOUNT_ID is not None:
+        cash_account = LEDGER_SPECIAL_ASSESSMENT_ACCOUNT_ID
+    return [(cash_account, payment.amount), (LEDGER_INCOME_ACCOUNT_ID, -payment.amount)]
+
+
+async def post_payment(session: AsyncSession, payment: Payment, created_by: Optional[UUID] = None):
+    """Post a received (paid / partial) payment: debit cash, credit income"""
+    lines = _payment_lines(payment)
+    if lines is None:
+        return None
+    return await post_entry(
+        session, payment.payment_date, lines,
+        description=f"Payment #{payment.id}", source="payment", source_id=payment.id, created_by=created_by,
+    )
+
+
+async def reverse_payment(session: AsyncSession, payment_id: int, created_by: Optional[UUID] = None):
+    """Post today an entry cancelling whatever is currently posted for the payment"""
+    result = await session.execute(
+        select(JournalLine.account_id, func.sum(JournalLine.amount))
+        .join(JournalEntry, JournalEntry.id == JournalLine.entry_id)
+        .where(JournalEntry.source == "payment", JournalEntry.source_id == payment_id)
+        .group_by(JournalLine.account_id)
+        .having(func.sum(JournalLine.amount) != 0)
+    )
+    lines = [(account_id, -amount) for account_id, amount in result.all()]
+    if not lines:
+        return None
+    return await post_entry(
+        session, date.today(), lines,
+        description=f"Reversal of payment #{payment_id}", source="payment", source_id=payment_id, created_by=created_by,
+    )
+
+
+class SnapshotJob:
+    """Checkpoints every account's balance as of yesterday, once per interval"""
+
+    def __init__(self, interval_seconds: float = 86400):
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    written = await checkpoint_balances(session, date.today() - timedelta(days=1))
+                logger.info("Ledger checkpoint wrote %s snapshots", written)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ledger checkpoint failed")
+            await asyncio.sleep(self.interval_seconds)
+
+
+snapshot_job = SnapshotJob(interval_seconds=LEDGER_SNAPSHOT_INTERVAL_SECONDS)
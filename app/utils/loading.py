@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import selectinload
+
+
+def parse_include(include: Optional[str], allowed) -> list:
+    """Split ``include=a,b`` and reject relations the route doesn't offer"""
+    if not include:
+        return []
+    names = []
+    for name in (part.strip() for part in include.split(",")):
+        if not name or name in names:
+            continue
+        if name not in allowed:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown include '{name}'; expected one of: {', '.join(allowed)}",
+            )
+        names.append(name)
+    return names
+
+
+def include_options(model, names) -> list:
+    """One ``selectinload`` per requested relation: a fixed extra query each, whatever the collection size"""
+    return [selectinload(getattr(model, name)) for name in names]
+
+
+def with_includes(detail_schema, base_schema, instance, names):
+    """Serialize ``instance`` plus only the requested (already loaded) relations.
+
+    Relations that were not asked for are never touched, so nothing lazy-loads;
+    pair with ``response_model_exclude_unset=True`` to leave them out of the body.
+    """
+    data = base_schema.model_validate(instance).model_dump()
+    for name in names:
+        data[name] = getattr(instance, name)
+    return detail_schema.model_validate(data, from_attributes=True)
@@ -0,0 +1,159 @@
+import os
+import time
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional
+from uuid import UUID
+
+from dotenv import load_dotenv
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Contractor, MaintenanceRequestEnhanced, MaintenanceStatusEnhanced
+
+load_dotenv()
+
+# Rebuild the in-memory index at least this often so other workers' contractor
+# writes are picked up; writes in this process invalidate it immediately
+MATCH_INDEX_TTL_SECONDS = float(os.getenv("MATCH_INDEX_TTL_SECONDS", 300))
+# Contractors with this many open requests are not offered more work
+MATCH_MAX_OPEN_REQUESTS = int(os.getenv("MATCH_MAX_OPEN_REQUESTS", 10))
+
+# Share of the score coming from rating; the rest rewards a light workload
+RATING_WEIGHT = 0.6
+WORKLOAD_WEIGHT = 0.4
+
+OPEN_STATUSES = (
+    MaintenanceStatusEnhanced.pending,
+    MaintenanceStatusEnhanced.approved,
+    MaintenanceStatusEnhanced.scheduled,
+    MaintenanceStatusEnhanced.in_progress,
+    MaintenanceStatusEnhanced.on_hold,
+    MaintenanceStatusEnhanced.requires_approval,
+)
+
+
+def normalize_specialty(value: str) -> str:
+    """'Pest Control' / 'pest-control' -> 'pest_control', matching MaintenanceCategory values"""
+    return "_".join(value.strip().lower().replace("-", " ").split())
+
+
+@dataclass(frozen=True)
+class Candidate:
+    id: UUID
+    name: str
+    company: Optional[str]
+    rating: Decimal
+    insurance_expiry: Optional[date]
+
+    def insured_on(self, day: date) -> bool:
+        return self.insurance_expiry is None or self.insurance_expiry >= day
+
+
+class ContractorIndex:
+    """Active contractors grouped by normalized specialty.
+
+    Loaded with one query and kept until a contractor write calls
+    ``invalidate()`` or the TTL passes, so scoring a backlog never rescans the
+    contractors table.
+    """
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._by_specialty: dict = {}
+        self._loaded_at: Optional[float] = None
+        self.loads = 0
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    async def ensure_loaded(self, session: AsyncSession):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return
+        result = await session.execute(
+            select(
+                Contractor.id, Contractor.name, Contractor.company, Contractor.rating,
+                Contractor.insurance_expiry, Contractor.specialties,
+            ).where(Contractor.is_active == True)
+        )
+        by_specialty: dict = {}
+        for row in result:
+            candidate = Candidate(row.id, row.name, row.company, row.rating or Decimal("0"), row.insurance_expiry)
+            for specialty in {normalize_specialty(item) for item in row.specialties or [] if isinstance(item, str)}:
+                by_specialty.setdefault(specialty, []).append(candidate)
+        self._by_specialty = by_specialty
+        self._loaded_at = time.monotonic()
+        self.loads += 1
+
+    def candidates(self, category: str, day: date) -> list:
+        return [c for c in self._by_specialty.get(category, []) if c.insured_on(day)]
+
+
+contractor_index = ContractorIndex(ttl_seconds=MATCH_INDEX_TTL_SECONDS)
+
+
+async def open_workloads(session: AsyncSession, contractor_ids: Iterable[UUID]) -> dict:
+    """``{contractor_id: open request count}`` in one grouped query"""
+    contractor_ids = list(contractor_ids)
+    if not contractor_ids:
+        return {}
+    result = await session.execute(
+        select(MaintenanceRequestEnhanced.contractor_id, func.count())
+        .where(
+            MaintenanceRequestEnhanced.contractor_id.in_(contractor_ids),
+            MaintenanceRequestEnhanced.status.in_(OPEN_STATUSES),
+        )
+        .group_by(MaintenanceRequestEnhanced.contractor_id)
+    )
+    return dict(result.all())
+
+
+def score(candidate: Candidate, workload: int) -> float:
+    return round(
+        RATING_WEIGHT * float(candidate.rating) / 5 + WORKLOAD_WEIGHT / (1 + workload),
+        4,
+    )
+
+
+def rank(candidates: list, workloads: dict, limit: Optional[int] = None) -> list:
+    """``[(score, candidate, workload), ...]`` best first, skipping contractors at capacity"""
+    ranked = []
+    for candidate in candidates:
+        workload = workloads.get(candidate.id, 0)
+        if workload >= MATCH_MAX_OPEN_REQUESTS:
+            continue
+        ranked.append((score(candidate, workload), candidate, workload))
+    ranked.sort(key=lambda item: (-item[0], item[1].name, str(item[1].id)))
+    return ranked[:limit] if limit else ranked
+
+
+class Dispatcher:
+    """Greedy assignment of many requests against one workload snapshot.
+
+    Each assignment bumps the chosen contractor's workload in memory, so a
+    backlog spreads across contractors instead of piling onto the top-rated one.
+    """
+
+    def __init__(self, workloads: dict, day: date):
+        self.workloads = dict(workloads)
+        self.day = day
+
+    def assign(self, category: str):
+        ranked = rank(contractor_index.candidates(category, self.day), self.workloads, limit=1)
+        if not ranked:
+            return None
+        best_score, candidate, _ = ranked[0]
+        self.workloads[candidate.id] = self.workloads.get(candidate.id, 0) + 1
+        return best_score, candidate
+
+
+async def dispatcher_for(session: AsyncSession, categories: Iterable[str], day: date) -> Dispatcher:
+    """Load the index and the workloads of every contractor eligible for ``categories``"""
+    await contractor_index.ensure_loaded(session)
+    contractor_ids = {
+        candidate.id
+        for category in set(categories)
+        for candidate in contractor_index.candidates(category, day)
+    }
+    return Dispatcher(await open_workloads(session, contractor_ids), day)
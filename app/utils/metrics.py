@@ -0,0 +1,197 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+class Counter:
+    """Monotonic counter keyed by label values.
+
+    Updated only from the event loop thread, so a plain dict increment is
+    enough; there is no lock on the request path.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        for label_values, value in self._values.items():
+            yield self.name, _labels(self.labels, label_values), value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: dict = {}
+
+    def observe(self, value: float, *label_values):
+        entry = self._values.get(label_values)
+        if entry is None:
+            entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self):
+        bucket_labels = self.labels + ("le",)
+        for label_values, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", _labels(bucket_labels, label_values + (le,)), cumulative
+            yield f"{self.name}_sum", _labels(self.labels, label_values), total
+            yield f"{self.name}_count", _labels(self.labels, label_values), count
+
+
+class CallbackGauge:
+    """Gauge (or counter) read at scrape time from ``callback() -> {label_values: value}``"""
+
+    def __init__(self, name: str, help: str, labels: tuple, callback: Callable[[], dict], kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self):
+        for label_values, value in self.callback().items():
+            yield self.name, _labels(self.labels, label_values), value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def callback(self, name: str, help: str, labels: tuple, callback: Callable[[], dict], kind: str = "gauge") -> CallbackGauge:
+        return self.register(CallbackGauge(name, help, labels, callback, kind))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"))
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("method",))
+
+
+def _route_template(scope) -> str:
+    # The template (e.g. /users/{user_id}) keeps label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware recording request count and latency per route template, and requests in flight"""
+
+    def __init__(self, app, exclude_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status = {"code": 500}
+        http_requests_in_flight.inc(method)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec(method)
+            route = _route_template(scope)
+            http_requests_total.inc(method, route, str(status["code"]))
+            http_request_duration_seconds.observe(time.perf_counter() - started, method, route)
+
+
+def stats_metrics(prefix: str, keys: dict, sources: dict, label: Optional[str] = None, kind: str = "gauge"):
+    """Publish numeric ``stats()`` keys as metrics read at scrape time.
+
+    ``keys`` maps stat name to help text and becomes ``{prefix}_{key}``, or
+    ``{prefix}_{key}_total`` for ``kind="counter"`` (use it for running totals
+    so ``rate()`` and reset detection work); ``sources`` maps a ``label`` value
+    (or ``None`` without a label) to a callable returning the stats dict.
+    """
+    for key, help in keys.items():
+        def collect(key=key):
+            values = {}
+            for source, stats in sources.items():
+                value = (stats() or {}).get(key)
+                if isinstance(value, (int, float)):
+                    values[(source,) if label else ()] = value
+            return values
+        name = f"{prefix}_{key}_total" if kind == "counter" else f"{prefix}_{key}"
+        registry.callback(name, help, (label,) if label else (), collect, kind=kind)
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import select, func, update
+
+from ..database import AsyncSessionLocal
+from ..models import OutboxMessage, OutboxStatus
+from .email import email_dispatcher
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_WORKER_ENABLED = os.getenv("OUTBOX_WORKER_ENABLED", "true").lower() == "true"
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", 2))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", 30))
+# How long claimed rows stay hidden from other workers while being delivered
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", 300))
+
+
+def email_outbox_message(to_email: str, subject: str, body: str) -> OutboxMessage:
+    """Build an outbox row for an email; add it to the session of the change it belongs to"""
+    return OutboxMessage(
+        kind="email",
+        payload={"to": to_email, "subject": subject, "body": body},
+    )
+
+
+async def _deliver_email(payload: dict):
+    # One attempt: failed rows are retried by the outbox on its own schedule
+    await email_dispatcher.send(payload["to"], payload["subject"], payload["body"], max_attempts=1)
+
+
+HANDLERS = {
+    "email": _deliver_email,
+}
+
+
+class OutboxWorker:
+    """Drains the ``outbox`` table in batches.
+
+    A batch is claimed in one short transaction: ``SELECT ... FOR UPDATE SKIP
+    LOCKED`` picks the rows and pushes their ``available_at`` out by a lease,
+    so no other worker (in any process) takes them while they are delivered.
+    Delivery happens outside any transaction, and the outcomes are written in a
+    second one. Rows of a worker that dies mid-batch become available again
+    once the lease runs out. The outbox owns retries; each delivery is a single
+    attempt.
+    """
+
+    def __init__(self, batch_size: int = 100, poll_seconds: float = 2,
+                 max_attempts: int = 8, retry_base_seconds: float = 30, lease_seconds: float = 300):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def wake(self):
+        """Skip the rest of the poll interval, e.g. right after committing new rows"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox batch failed")
+                claimed = 0
+
+            if claimed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def _dispatch(self, message):
+        handler = HANDLERS.get(message.kind)
+        if handler is None:
+            raise ValueError(f"No outbox handler for kind '{message.kind}'")
+        await handler(message.payload)
+
+    async def drain_once(self) -> int:
+        """Claim and deliver one batch; returns the number of rows claimed"""
+        messages, lease_until = await self._claim()
+        if not messages:
+            return 0
+
+        outcomes = await asyncio.gather(
+            *(self._dispatch(message) for message in messages),
+            return_exceptions=True,
+        )
+        await self._record(messages, outcomes, lease_until)
+        return len(messages)
+
+    async def _claim(self):
+        # The lease end doubles as a claim token: outcomes are only written
+        # while the rows still carry it
+        lease_until = datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+        claimable = (
+            select(OutboxMessage.id)
+            .where(
+                OutboxMessage.status == OutboxStatus.pending,
+                OutboxMessage.available_at <= func.now(),
+            )
+            .order_by(OutboxMessage.available_at, OutboxMessage.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id.in_(claimable))
+                    .values(available_at=lease_until)
+                    .returning(OutboxMessage.id, OutboxMessage.kind, OutboxMessage.payload, OutboxMessage.attempts)
+                    .execution_options(synchronize_session=False)
+                )
+                return result.all(), lease_until
+
+    async def _record(self, messages: list, outcomes: list, lease_until: datetime):
+        now = datetime.now(timezone.utc)
+        sent_ids = [message.id for message, outcome in zip(messages, outcomes) if not isinstance(outcome, Exception)]
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                if sent_ids:
+                    await session.execute(
+                        update(OutboxMessage)
+                        .where(OutboxMessage.id.in_(sent_ids), OutboxMessage.available_at == lease_until)
+                        .values(status=OutboxStatus.sent, sent_at=now, last_error=None)
+                        .execution_options(synchronize_session=False)
+                    )
+                    self.delivered += len(sent_ids)
+                for message, outcome in zip(messages, outcomes):
+                    if isinstance(outcome, Exception):
+                        await session.execute(
+                            update(OutboxMessage)
+                            .where(OutboxMessage.id == message.id, OutboxMessage.available_at == lease_until)
+                            .values(**self._failure_values(message, outcome, now))
+                            .execution_options(synchronize_session=False)
+                        )
+
+    def _failure_values(self, message, error: Exception, now: datetime) -> dict:
+        attempts = message.attempts + 1
+        values = {"attempts": attempts, "last_error": str(error)[:1000]}
+        if attempts >= self.max_attempts:
+            values["status"] = OutboxStatus.failed
+            self.failed += 1
+            logger.warning("Outbox message %s failed permanently: %s", message.id, error)
+        else:
+            delay = self.retry_base_seconds * (2 ** (attempts - 1))
+            values["available_at"] = now + timedelta(seconds=delay)
+            self.retried += 1
+        return values
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+outbox_worker = OutboxWorker(
+    batch_size=OUTBOX_BATCH_SIZE,
+    poll_seconds=OUTBOX_POLL_SECONDS,
+    max_attempts=OUTBOX_MAX_ATTEMPTS,
+    retry_base_seconds=OUTBOX_RETRY_BASE_SECONDS,
+    lease_seconds=OUTBOX_LEASE_SECONDS,
+)
@@ -0,0 +1,79 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID as PyUUID
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_, literal
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth import SECRET_KEY
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _signature(table: str, payload: str) -> str:
+    digest = hmac.new(SECRET_KEY.encode(), f"{table}:{payload}".encode(), hashlib.sha256).digest()
+    return _b64encode(digest[:16])
+
+
+def encode_cursor(model, row) -> str:
+    """Build an opaque, signed cursor pointing just past ``row``"""
+    payload = _b64encode(json.dumps([row.created_at.isoformat(), str(row.id)]).encode())
+    return f"{payload}.{_signature(model.__tablename__, payload)}"
+
+
+def decode_cursor(model, cursor: str):
+    """Return ``(created_at, id)`` from a cursor, rejecting tampered or foreign ones"""
+    try:
+        payload, signature = cursor.split(".", 1)
+        if not hmac.compare_digest(signature, _signature(model.__tablename__, payload)):
+            raise ValueError("bad signature")
+        created_at, row_id = json.loads(_b64decode(payload))
+        created_at = datetime.fromisoformat(created_at)
+        row_id = PyUUID(row_id) if isinstance(model.id.type, UUID) else int(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, row_id
+
+
+async def paginate(session: AsyncSession, query, model, skip: int, limit: int, cursor: Optional[str]):
+    """Run a list query with a deterministic ``(created_at, id)`` ordering.
+
+    With ``cursor=None`` this is the classic offset/limit page and returns a
+    list. Any other value (an empty string starts from the beginning) switches
+    to keyset mode, which seeks past the cursor using the composite
+    ``(created_at, id)`` index and returns ``{"items": [...], "next_cursor": ...}``.
+    """
+    query = query.order_by(model.created_at, model.id)
+
+    if cursor is None:
+        result = await session.execute(query.offset(skip).limit(limit))
+        return result.scalars().all()
+
+    if cursor:
+        created_at, row_id = decode_cursor(model, cursor)
+        query = query.where(
+            tuple_(model.created_at, model.id)
+            > tuple_(literal(created_at, model.created_at.type), literal(row_id, model.id.type))
+        )
+
+    # Fetch one extra row to learn whether another page exists
+    result = await session.execute(query.limit(limit + 1))
+    items = result.scalars().all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(model, items[-1])
+    return {"items": items, "next_cursor": next_cursor}
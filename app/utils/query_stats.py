@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() == "true"
+# Requests spending longer than this in the database are logged at WARNING
+QUERY_STATS_SLOW_MS = float(os.getenv("QUERY_STATS_SLOW_MS", 500))
+# Test mode: a route that issues more statements than its budget gets a 500
+QUERY_BUDGET_ENFORCE = os.getenv("QUERY_BUDGET_ENFORCE", "false").lower() == "true"
+
+STATEMENT_LOG_CHARS = 300
+
+
+class RequestQueries:
+    __slots__ = ("count", "total_seconds", "slowest_seconds", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def current_queries() -> Optional[RequestQueries]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("query_stats_start")
+    if stats is None or not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def instrument_engine(async_engine):
+    """Count and time every statement ``async_engine`` runs on behalf of a request"""
+    sync_engine = async_engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def query_budget(max_queries: int):
+    """Declare how many SQL statements a route may issue per request.
+
+    Stack above or below the ``@router`` decorator; the budget is read from the
+    matched endpoint by ``QueryStatsMiddleware``.
+    """
+    def decorator(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorator
+
+
+class QueryStatsMiddleware:
+    """Per-request SQL statement count, total DB time and slowest statement.
+
+    Reported as a ``Server-Timing`` header and a structured log line (DEBUG,
+    or WARNING when slow or over budget). Plain ASGI rather than
+    ``BaseHTTPMiddleware`` so the context variable is shared with the endpoint.
+    """
+
+    def __init__(self, app, enforce_budgets: bool = QUERY_BUDGET_ENFORCE, slow_ms: float = QUERY_STATS_SLOW_MS):
+        self.app = app
+        self.enforce_budgets = enforce_budgets
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueries()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        outcome = {"status": None, "over_budget": False}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                budget = getattr(scope.get("endpoint"), "query_budget", None)
+                if budget is not None and stats.count > budget:
+                    outcome["over_budget"] = True
+                    if self.enforce_budgets:
+                        await self._send_budget_error(send, stats.count, budget)
+                        outcome["status"] = 500
+                        return
+                outcome["status"] = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", self._server_timing(stats, started))
+            elif outcome["over_budget"] and self.enforce_budgets:
+                # The replacement error response has already been sent
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._log(scope, stats, started, outcome)
+
+    @staticmethod
+    def _server_timing(stats: RequestQueries, started: float) -> str:
+        app_ms = (time.perf_counter() - started) * 1000
+        return (
+            f'db;dur={stats.total_seconds * 1000:.1f};desc="{stats.count} queries", '
+            f"db-slowest;dur={stats.slowest_seconds * 1000:.1f}, "
+            f"app;dur={app_ms:.1f}"
+        )
+
+    @staticmethod
+    async def _send_budget_error(send, count: int, budget: int):
+        body = json.dumps({"detail": f"Query budget exceeded: {count} statements, budget {budget}"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 500,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def _log(self, scope, stats: RequestQueries, started: float, outcome: dict):
+        db_ms = stats.total_seconds * 1000
+        level = logging.WARNING if outcome["over_budget"] or db_ms >= self.slow_ms else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+        endpoint = scope.get("endpoint")
+        record = {
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "route": getattr(scope.get("route"), "path", None),
+            "status": outcome["status"],
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "db_queries": stats.count,
+            "db_ms": round(db_ms, 1),
+            "db_slowest_ms": round(stats.slowest_seconds * 1000, 1),
+            "db_slowest_statement": (stats.slowest_statement or "")[:STATEMENT_LOG_CHARS] or None,
+            "query_budget": getattr(endpoint, "query_budget", None),
+        }
+        logger.log(level, json.dumps(record))
@@ -0,0 +1,157 @@
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import Date, Integer, any_, bindparam, cast, delete, func, insert, literal, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Payment, PaymentDailyRollup, PaymentMonthlyRollup, PaymentStatus, Unit
+
+# Dimensions shared by both rollup tables, besides the bucket (day / month)
+DIMENSIONS = ("unit_id", "payment_type", "status")
+
+
+def _bucket_expression(rollup):
+    if rollup is PaymentDailyRollup:
+        return Payment.payment_date
+    # Inline 'month': as a bind parameter the GROUP BY copy would be a different
+    # parameter to Postgres and no longer match the selected expression
+    return cast(func.date_trunc(literal_column("'month'"), Payment.payment_date), Date)
+
+
+def _grouped_payments(rollup, sign: int, criteria, status: Optional[PaymentStatus] = None):
+    """``SELECT bucket, unit, type, status, property, ±SUM(amount), ±COUNT(*)`` in rollup column order"""
+    bucket = _bucket_expression(rollup)
+    status_column = Payment.status
+    keys = [bucket, Payment.unit_id, Payment.payment_type, Payment.status]
+    if status is not None:
+        status_type = Payment.__table__.c.status.type
+        status_column = cast(literal(status, status_type), status_type)
+        keys.pop()
+    return (
+        select(
+            bucket,
+            Payment.unit_id,
+            Payment.payment_type,
+            status_column,
+            Unit.property_id,
+            func.sum(Payment.amount) * sign,
+            func.count() * sign,
+        )
+        .join(Unit, Unit.id == Payment.unit_id)
+        .where(*criteria)
+        .group_by(*keys, Unit.property_id)
+        # Touch rollup rows in key order so concurrent writers can't deadlock
+        .order_by(*keys)
+    )
+
+
+def _columns(rollup) -> list:
+    bucket = "day" if rollup is PaymentDailyRollup else "month"
+    return [bucket, *DIMENSIONS, "property_id", "total_amount", "payment_count"]
+
+
+async def adjust_payment_rollups(
+    session: AsyncSession, payment_ids: Iterable[int], sign: int = 1, status: Optional[PaymentStatus] = None
+):
+    """Add (``sign=1``) or remove (``sign=-1``) payments from both rollup tables.
+
+    Runs in the caller's transaction, so the rollups commit or roll back with
+    the payment change itself. Call with ``-1`` before deleting or changing
+    payments and with ``1`` once the new state is flushed; an update is the
+    pair. ``status`` counts the payments under that status instead of their
+    current one, for removing rows a bulk ``UPDATE`` has already moved. Each
+    table costs one ``INSERT ... SELECT ... ON CONFLICT`` however many
+    payments are passed.
+    """
+    payment_ids = list(payment_ids)
+    if payment_ids:
+        ids = bindparam("payment_ids", payment_ids, type_=ARRAY(Integer))
+        await adjust_payment_rollups_where(session, [Payment.id == any_(ids)], sign, status)
+
+
+async def adjust_payment_rollups_where(
+    session: AsyncSession, criteria: list, sign: int = 1, status: Optional[PaymentStatus] = None
+):
+    """``adjust_payment_rollups`` for every payment matching ``criteria`` (bulk writers)"""
+    for rollup in (PaymentDailyRollup, PaymentMonthlyRollup):
+        table = rollup.__table__
+        statement = pg_insert(table).from_select(
+            _columns(rollup), _grouped_payments(rollup, sign, criteria, status)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=table.primary_key.columns,
+            set_={
+                "property_id": statement.excluded.property_id,
+                "total_amount": table.c.total_amount + statement.excluded.total_amount,
+                "payment_count": table.c.payment_count + statement.excluded.payment_count,
+            },
+        )
+        await session.execute(statement)
+
+
+async def rebuild_payment_rollups(conn):
+    """Recompute both rollup tables from ``payments`` (backfill / repair)"""
+    for rollup in (PaymentDailyRollup, PaymentMonthlyRollup):
+        await conn.execute(delete(rollup))
+        await conn.execute(insert(rollup).from_select(_columns(rollup), _grouped_payments(rollup, 1, [])))
+
+
+def _first_of_month(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _rollup_rows(rollup, bucket_range, filters: dict):
+    bucket = rollup.day if rollup is PaymentDailyRollup else rollup.month
+    low, high = bucket_range
+    criteria = [getattr(rollup, name) == value for name, value in filters.items() if value is not None]
+    if low is not None:
+        criteria.append(bucket >= low)
+    if high is not None:
+        criteria.append(bucket < high)
+    return select(rollup.total_amount, rollup.payment_count).where(*criteria)
+
+
+async def payment_totals(
+    session: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    **filters,
+) -> dict:
+    """``{"total_amount", "total_payments"}`` for payments dated ``start_date..end_date`` (inclusive).
+
+    Whole calendar months inside the range are read from the monthly rollup
+    and the ragged days at either end from the daily rollup, so the cost
+    follows the length of the range rather than the number of payments.
+    ``filters`` are equality filters on ``unit_id``, ``property_id``,
+    ``payment_type`` and ``status``.
+    """
+    end_exclusive = end_date + timedelta(days=1) if end_date else None
+    # Whole months covered by the range: [months_from, months_to)
+    months_from = None
+    if start_date is not None:
+        months_from = start_date if start_date.day == 1 else _next_month(start_date)
+    months_to = _first_of_month(end_exclusive) if end_exclusive else None
+
+    if months_from is not None and months_to is not None and months_from >= months_to:
+        parts = [_rollup_rows(PaymentDailyRollup, (start_date, end_exclusive), filters)]
+    else:
+        parts = [_rollup_rows(PaymentMonthlyRollup, (months_from, months_to), filters)]
+        if start_date is not None and start_date < months_from:
+            parts.append(_rollup_rows(PaymentDailyRollup, (start_date, months_from), filters))
+        if end_exclusive is not None and months_to < end_exclusive:
+            parts.append(_rollup_rows(PaymentDailyRollup, (months_to, end_exclusive), filters))
+
+    rows = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+    result = await session.execute(
+        select(
+            func.coalesce(func.sum(rows.c.total_amount), literal(0)),
+            func.coalesce(func.sum(rows.c.payment_count), literal(0)),
+        )
+    )
+    total_amount, total_payments = result.one()
+    return {"total_amount": total_amount, "total_payments": int(total_payments)}
@@ -0,0 +1,28 @@
+from fastapi import HTTPException
+from sqlalchemy import func, or_
+
+
+def search_filter(columns, term: str):
+    """Case-insensitive substring match on any of ``columns``.
+
+    Each column carries a ``gin_trgm_ops`` index, so Postgres answers this with
+    a bitmap scan over the trigram indexes instead of a sequential scan
+    (terms of three or more characters).
+    """
+    return or_(*(column.ilike(f"%{term}%") for column in columns))
+
+
+def relevance(columns, term: str):
+    """Best trigram word similarity of ``term`` across ``columns`` (0..1)"""
+    return func.greatest(*(func.word_similarity(term, column) for column in columns))
+
+
+def order_by_relevance(query, columns, term: str, cursor):
+    """Rank ``query`` by relevance to ``term`` for ``sort=relevance``.
+
+    Only offset pagination is supported: a keyset cursor encodes
+    ``(created_at, id)``, not a score.
+    """
+    if cursor is not None:
+        raise HTTPException(status_code=400, detail="cursor is not supported with sort=relevance")
+    return query.order_by(relevance(columns, term).desc())
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+
+from ..models import User, UserRole
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", 10000))
+# Set to a channel name (e.g. "user_cache_invalidate") to fan invalidations
+# out to every worker through Postgres LISTEN/NOTIFY
+USER_CACHE_NOTIFY_CHANNEL = os.getenv("USER_CACHE_NOTIFY_CHANNEL")
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """The subset of a user needed to authorize a request"""
+    id: UUID
+    role: UserRole
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(id=user.id, role=user.role, is_active=user.is_active)
+
+
+class UserPrincipalCache:
+    """Per-process TTL + LRU cache of principals keyed by JWT ``sub``"""
+
+    def __init__(self, ttl: float = 30, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple[float, UserPrincipal]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[UserPrincipal]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return principal
+
+    def set(self, key: str, principal: UserPrincipal):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        self.invalidations += 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+user_cache = UserPrincipalCache(ttl=USER_CACHE_TTL_SECONDS, max_size=USER_CACHE_MAX_SIZE)
+
+
+async def invalidate_user(session: AsyncSession, user_id):
+    """Drop a user's cached principal here and, if configured, on every other worker.
+
+    Call after the change has been committed.
+    """
+    user_cache.invalidate(str(user_id))
+    if USER_CACHE_NOTIFY_CHANNEL:
+        await session.execute(select(func.pg_notify(USER_CACHE_NOTIFY_CHANNEL, str(user_id))))
+        await session.commit()
+
+
+class InvalidationListener:
+    """Keeps a dedicated connection LISTENing for invalidations from other workers"""
+
+    def __init__(self, dsn: str, channel: str, retry_seconds: float = 5):
+        self.dsn = dsn
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        user_cache.invalidate(payload)
+
+    async def _run(self):
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(self.channel, self._on_notify)
+                # Anything cached while we were disconnected may be stale
+                user_cache.clear()
+                while not connection.is_closed():
+                    await asyncio.sleep(self.retry_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("User cache invalidation listener failed: %s", e)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            user_cache.clear()
+            await asyncio.sleep(self.retry_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,251 @@
+"""Fixtures for the database-backed tests.
+
+The suite only runs when ``DATABASE_URL`` is exported in the environment (a
+``.env`` file is deliberately not enough). It creates a scratch database next
+to the one ``DATABASE_URL`` names, so the role needs ``CREATEDB``; the app is
+pointed at the scratch database, migrated with ``app.migrate``, and the
+database is dropped again when the session ends.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import uuid
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Read before anything imports the app (and with it load_dotenv)
+SERVER_URL = os.environ.get("DATABASE_URL")
+TEST_DATABASE = f"hoa_test_{os.getpid()}"
+
+if SERVER_URL:
+    os.environ["DATABASE_URL"] = make_url(SERVER_URL).set(database=TEST_DATABASE).render_as_string(hide_password=False)
+
+# Plan nodes that read through an index
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+# The user the test client acts as; ``reset_tables`` creates it
+ADMIN_ID = uuid.UUID(int=1)
+
+# Every table the seed helpers write, emptied before each module seeds its own data
+SEEDED_TABLES = [
+    "properties", "units", "residents", "payments", "violations", "maintenance_requests", "contractors",
+    "maintenance_requests_enhanced", "maintenance_work_logs", "users", "residents_enhanced", "billing_runs",
+    "payment_rollups_daily", "payment_rollups_monthly", "journal_lines", "journal_entries",
+]
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: slow benchmark on a large seeded dataset (deselect with -m 'not benchmark')"
+    )
+
+
+def seeded_uuid(kind: str, number: int) -> uuid.UUID:
+    """The id the seed SQL gives row ``number`` of ``kind`` (``md5(kind || number)``)"""
+    return uuid.UUID(hashlib.md5(f"{kind}{number}".encode()).hexdigest())
+
+
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def run(loop):
+    """Run a coroutine on the session's event loop (the app's pool is bound to it)"""
+    return loop.run_until_complete
+
+
+@pytest.fixture(scope="session")
+def database(run):
+    """Create, migrate and finally drop the scratch database; yields the app's engine"""
+    server = create_async_engine(SERVER_URL, isolation_level="AUTOCOMMIT")
+
+    async def execute(statement: str):
+        async with server.connect() as conn:
+            await conn.execute(text(statement))
+
+    run(execute(f"DROP DATABASE IF EXISTS {TEST_DATABASE}"))
+    run(execute(f"CREATE DATABASE {TEST_DATABASE}"))
+    try:
+        from app.database import engine
+        from app.migrate import upgrade
+
+        run(upgrade(engine))
+        yield engine
+        run(engine.dispose())
+    finally:
+        run(execute(f"DROP DATABASE IF EXISTS {TEST_DATABASE} WITH (FORCE)"))
+        run(server.dispose())
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    """An httpx client for the app, authenticated as the ``ADMIN_ID`` super admin"""
+    import httpx
+
+    from app.auth import get_current_user
+    from app.main import app
+    from app.models import UserRole
+    from app.utils.user_cache import UserPrincipal
+
+    principal = UserPrincipal(id=ADMIN_ID, role=UserRole.super_admin, is_active=True)
+    app.dependency_overrides[get_current_user] = lambda: principal
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=None)
+    app.dependency_overrides.clear()
+
+
+async def reset_tables(conn):
+    """Empty the seeded tables, leaving only the ``ADMIN_ID`` user"""
+    await conn.execute(text(f"TRUNCATE {', '.join(SEEDED_TABLES)} RESTART IDENTITY CASCADE"))
+    await conn.execute(text(
+        "INSERT INTO users (id, email, password_hash, first_name, last_name, role, is_active) "
+        "VALUES (:id, 'admin@example.com', 'x', 'Test', 'Admin', 'super_admin', true)"
+    ), {"id": ADMIN_ID})
+
+
+async def seed(
+    conn,
+    properties: int = 20,
+    units: int = 2000,
+    payments: int = 50_000,
+    violations: int = 10_000,
+    maintenance: int = 10_000,
+    contractors: int = 200,
+    enhanced_requests: int = 20_000,
+    work_logs: int = 40_000,
+    users: int = 2000,
+):
+    """Fill every list-route table with generated rows, then ``ANALYZE``.
+
+    Units ``1..units`` are spread over the properties round robin and each has
+    one resident with the same id. Payments go one per unit per month from
+    January 2024, so ``payments = units * months`` covers ``months`` months of
+    dues for every unit. The UUID-keyed
+    tables use ``seeded_uuid`` ids: ``unit`` / ``property`` / ``resident`` /
+    ``request`` / ``contractor`` / ``user`` followed by the row number.
+    """
+    statements = [
+        ("INSERT INTO properties (name, address, total_units) "
+         "SELECT 'Property ' || g, g || ' Main St', 0 FROM generate_series(1, :properties) g"),
+        ("INSERT INTO units (property_id, unit_number, monthly_fee, created_at) "
+         "SELECT 1 + (g - 1) % :properties, 'U' || g, 250, TIMESTAMPTZ '2023-06-01' + (g % 180) * INTERVAL '1 day' "
+         "FROM generate_series(1, :units) g"),
+        ("INSERT INTO residents (unit_id, first_name, last_name, email, resident_type) "
+         "SELECT g, 'First', 'Last ' || g, 'resident' || g || '@example.com', "
+         "CAST(CASE WHEN g % 3 = 0 THEN 'tenant' ELSE 'owner' END AS residenttype) "
+         "FROM generate_series(1, :units) g"),
+        # One payment per unit per month, oldest first: payment g belongs to
+        # unit 1 + (g - 1) % units in month (g - 1) / units
+        ("INSERT INTO payments (resident_id, unit_id, amount, payment_type, payment_method, payment_date, status, created_at) "
+         "SELECT u, u, 250, 'monthly_fee', 'ach', "
+         "CAST(DATE '2024-01-01' + ((g - 1) / :units) * INTERVAL '1 month' + (g % 28) * INTERVAL '1 day' AS DATE), "
+         "CAST(CASE WHEN g % 10 = 0 THEN 'pending' ELSE 'paid' END AS paymentstatus), "
+         "TIMESTAMPTZ '2024-01-01' + g * INTERVAL '10 seconds' "
+         "FROM (SELECT g, 1 + (g - 1) % :units AS u FROM generate_series(1, :payments) g) s"),
+        ("INSERT INTO violations (unit_id, resident_id, violation_type, description, severity, status) "
+         "SELECT u, u, 'noise', 'Seeded violation', 'minor', "
+         "CAST(CASE WHEN g % 4 = 0 THEN 'resolved' ELSE 'open' END AS violationstatus) "
+         "FROM (SELECT g, 1 + g % :units AS u FROM generate_series(1, :violations) g) s"),
+        ("INSERT INTO maintenance_requests (unit_id, resident_id, title, priority, status) "
+         "SELECT u, u, 'Request ' || g, 'medium', "
+         "CAST(CASE WHEN g % 3 = 0 THEN 'completed' ELSE 'pending' END AS maintenancestatus) "
+         "FROM (SELECT g, 1 + g % :units AS u FROM generate_series(1, :maintenance) g) s"),
+        ("INSERT INTO contractors (id, name, company, email, phone, specialties, rating, is_active) "
+         "SELECT CAST(md5('contractor' || g) AS uuid), 'Contractor ' || g, 'Company ' || g, "
+         "'contractor' || g || '@example.com', '555-0100', "
+         "CAST(CASE g % 4 WHEN 0 THEN '[\"plumbing\"]' WHEN 1 THEN '[\"electrical\", \"hvac\"]' "
+         "WHEN 2 THEN '[\"roofing\"]' ELSE '[\"painting\", \"flooring\"]' END AS jsonb), "
+         "3 + (g % 3), g % 5 <> 0 "
+         "FROM generate_series(1, :contractors) g"),
+        ("INSERT INTO users (id, email, password_hash, first_name, last_name, role, is_active, email_verified) "
+         "SELECT CAST(md5('user' || g) AS uuid), 'user' || g || '@example.com', 'x', 'First', 'Last ' || g, "
+         "CAST((ARRAY['resident', 'tenant', 'board_member', 'property_manager'])[1 + g % 4] AS userrole), "
+         "g % 10 <> 0, g % 2 = 0 "
+         "FROM generate_series(1, :users) g"),
+        ("INSERT INTO residents_enhanced (id, user_id, first_name, last_name, email, phone, unit_id, property_id, "
+         "resident_type, role, move_in_date, emergency_contact, is_active, is_primary, created_by) "
+         "SELECT CAST(md5('resident' || g) AS uuid), CAST(md5('user' || g) AS uuid), 'First', 'Last ' || g, "
+         "'resident' || g || '@example.com', '555-0100', "
+         "CAST(md5('unit' || (1 + g % :units)) AS uuid), CAST(md5('property' || (1 + g % :properties)) AS uuid), "
+         "CAST(CASE WHEN g % 3 = 0 THEN 'tenant' ELSE 'owner' END AS residenttypeenhanced), 'resident', "
+         "DATE '2023-01-01', CAST('{}' AS jsonb), g % 10 <> 0, g % 2 = 0, CAST(md5('user' || g) AS uuid) "
+         "FROM generate_series(1, :users) g"),
+        ("INSERT INTO maintenance_requests_enhanced (id, title, description, category, priority, status, unit_id, "
+         "property_id, resident_id, contractor_id, estimated_cost, work_order_number, is_emergency, created_by, created_at) "
+         "SELECT CAST(md5('request' || g) AS uuid), "
+         "(ARRAY['Leaking faucet', 'Broken heater', 'Roof damage', 'Flickering lights'])[1 + g % 4] || ' #' || g, "
+         "'Seeded request ' || g || ' needs attention', "
+         "CAST((ARRAY['plumbing', 'hvac', 'roofing', 'electrical'])[1 + g % 4] AS maintenancecategory), "
+         "CAST((ARRAY['low', 'medium', 'high', 'emergency'])[1 + g % 4] AS priority), "
+         "CAST((ARRAY['pending', 'approved', 'scheduled', 'in_progress', 'completed', 'cancelled', 'on_hold', "
+         "'requires_approval'])[1 + g % 8] AS maintenancestatusenhanced), "
+         "CAST(md5('unit' || (1 + g % :units)) AS uuid), CAST(md5('property' || (1 + g % :properties)) AS uuid), "
+         "CAST(md5('resident' || (1 + g % :users)) AS uuid), CAST(md5('contractor' || (1 + g % :contractors)) AS uuid), "
+         "100 + g % 900, 'WO-' || g, g % 20 = 0, CAST(md5('user' || (1 + g % :users)) AS uuid), "
+         "TIMESTAMPTZ '2024-01-01' + g * INTERVAL '1 minute' "
+         "FROM generate_series(1, :enhanced_requests) g"),
+        ("INSERT INTO maintenance_work_logs (id, maintenance_request_id, worker_name, work_date, hours_worked, "
+         "work_description, cost, created_by, created_at) "
+         "SELECT CAST(md5('log' || g) AS uuid), CAST(md5('request' || (1 + g % :enhanced_requests)) AS uuid), "
+         "'Worker ' || g % 50, DATE '2024-01-01' + g % 365, 1 + g % 8, 'Seeded work', 50, "
+         "CAST(md5('user' || (1 + g % :users)) AS uuid), TIMESTAMPTZ '2024-01-01' + g * INTERVAL '1 minute' "
+         "FROM generate_series(1, :work_logs) g"),
+    ]
+    counts = {
+        "properties": properties, "units": units, "payments": payments, "violations": violations,
+        "maintenance": maintenance, "contractors": contractors, "enhanced_requests": enhanced_requests,
+        "work_logs": work_logs, "users": users,
+    }
+    for statement in statements:
+        await conn.execute(text(statement), counts)
+    await conn.execute(text("ANALYZE"))
+
+
+@contextlib.contextmanager
+def captured_statements(engine):
+    """Collect ``(statement, parameters)`` for every statement ``engine`` runs inside the block"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+async def explain(engine, statement: str, parameters, seqscan: bool = False) -> dict:
+    """``EXPLAIN (FORMAT JSON)`` for a captured statement; returns the root plan node.
+
+    Sequential scans are disabled by default, so the plan shows whether an
+    index can serve the query at all rather than what is cheapest on a table
+    small enough to read whole.
+    """
+    async with engine.connect() as conn:
+        if not seqscan:
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar()
+        await conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def index_scans(node: dict) -> list:
+    """Names of the indexes read anywhere in a plan tree"""
+    names = [node["Index Name"]] if node.get("Node Type") in INDEX_NODES else []
+    for child in node.get("Plans", []):
+        names.extend(index_scans(child))
+    return names
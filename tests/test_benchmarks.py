@@ -0,0 +1,250 @@
+"""Benchmarks on a large seeded dataset, with the targets from the requests that introduced each feature.
+
+Seeding takes several minutes at full size; set ``BENCHMARK_SCALE`` (e.g.
+``0.1``) for a quicker, smaller run, or deselect with ``-m "not benchmark"``.
+Measurements are printed (``pytest -s``) as well as asserted.
+"""
+
+import os
+import statistics
+import time
+from datetime import date
+
+import pytest
+
+if not os.environ.get("DATABASE_URL"):
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import func, select, text
+
+from conftest import captured_statements, explain, index_scans, reset_tables, seed
+
+pytestmark = pytest.mark.benchmark
+
+SCALE = float(os.getenv("BENCHMARK_SCALE", 1))
+
+
+def scaled(count: int) -> int:
+    return max(1, int(count * SCALE))
+
+
+PROPERTIES = 200
+UNITS = scaled(200_000)
+PAYMENT_MONTHS = 24
+PAYMENTS = UNITS * PAYMENT_MONTHS
+ENHANCED_REQUESTS = scaled(1_000_000)
+USERS = scaled(100_000)
+
+
+def p95(samples: list) -> float:
+    return statistics.quantiles(samples, n=20)[-1]
+
+
+async def timed(coroutine_function, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coroutine_function()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.fixture(scope="module")
+def dataset(run, database):
+    async def prepare():
+        async with database.begin() as conn:
+            await reset_tables(conn)
+            await seed(
+                conn,
+                properties=PROPERTIES,
+                units=UNITS,
+                payments=PAYMENTS,
+                violations=scaled(100_000),
+                maintenance=scaled(100_000),
+                contractors=scaled(10_000),
+                enhanced_requests=ENHANCED_REQUESTS,
+                work_logs=scaled(100_000),
+                users=USERS,
+            )
+    run(prepare())
+
+
+SUMMARY_ROUTES = [
+    "/users/stats/summary",
+    "/residents-enhanced/stats/summary",
+    "/maintenance-enhanced/stats/summary",
+    "/contractors/stats/summary",
+]
+
+
+@pytest.mark.parametrize("route", SUMMARY_ROUTES)
+def test_summary_is_one_round_trip(run, client, database, dataset, route):
+    """user-003: every summary compiles to a single query"""
+    latencies = []
+    for _ in range(20):
+        with captured_statements(database) as statements:
+            started = time.perf_counter()
+            response = run(client.get(route))
+            latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+        assert len(statements) == 1, [statement for statement, _ in statements]
+    print(f"\n{route}: 1 round trip, p95 {p95(latencies) * 1000:.1f} ms")
+
+
+def test_summary_beats_per_value_counts(run, database, dataset):
+    """user-003: the FILTER (WHERE ...) summary against the per-role COUNT loop it replaced"""
+    from app.database import AsyncSessionLocal
+    from app.models import User, UserRole
+    from app.utils.aggregation import Summary
+
+    async def per_value_counts():
+        async with AsyncSessionLocal() as session:
+            count = select(func.count()).select_from(User)
+            await session.execute(count)
+            await session.execute(count.where(User.is_active == True))
+            await session.execute(count.where(User.email_verified == True))
+            for role in UserRole:
+                await session.execute(count.where(User.role == role))
+
+    async def one_query():
+        async with AsyncSessionLocal() as session:
+            await (
+                Summary(User)
+                .count("total_count")
+                .count("active_count", User.is_active == True)
+                .count("verified_count", User.email_verified == True)
+                .count_by("role_counts", User.role, [(role.value, role) for role in UserRole])
+                .fetch(session)
+            )
+
+    with captured_statements(database) as before_statements:
+        before = run(timed(per_value_counts, 20))
+    with captured_statements(database) as after_statements:
+        after = run(timed(one_query, 20))
+
+    print(
+        f"\nuser summary over {USERS} users: before {len(before_statements) // 20} round trips, "
+        f"p95 {p95(before) * 1000:.1f} ms; after {len(after_statements) // 20}, p95 {p95(after) * 1000:.1f} ms"
+    )
+    assert len(after_statements) == 20
+    assert p95(after) < p95(before)
+
+
+def test_export_memory_stays_flat(run, database, dataset):
+    """user-005: streaming every payment keeps RSS flat"""
+    from app.models import Payment
+    from app.routes.payments import _filter_payments
+    from app.utils.export import export_response
+
+    query = _filter_payments(
+        select(*Payment.__table__.c), None, None, None, None, None, None
+    ).order_by(Payment.created_at, Payment.id)
+    response = export_response(query, "ndjson", "payments")
+
+    async def consume():
+        lines, baseline, peak = 0, None, 0
+        async for chunk in response.body_iterator:
+            lines += chunk.count("\n")
+            if baseline is None and lines >= 100_000:
+                baseline = rss_bytes()
+            peak = max(peak, rss_bytes())
+        return lines, baseline or peak, peak
+
+    started = time.perf_counter()
+    lines, baseline, peak = run(consume())
+    elapsed = time.perf_counter() - started
+    growth_mb = (peak - baseline) / 2**20
+    print(f"\nexported {lines} payments in {elapsed:.1f} s; RSS growth after warm-up {growth_mb:.1f} MiB")
+    assert lines == PAYMENTS
+    assert growth_mb < 64
+
+
+@pytest.mark.parametrize("term", ["heater", "Request 4242", "WO-99"])
+def test_search_latency(run, client, database, dataset, term):
+    """user-012: substring search over the enhanced maintenance requests stays under 50 ms"""
+    async def search():
+        response = await client.get("/maintenance-enhanced/requests/", params={"search": term, "limit": 50})
+        assert response.status_code == 200, response.text
+
+    latencies = run(timed(search, 30))
+    print(f"\nsearch {term!r} over {ENHANCED_REQUESTS} requests: p95 {p95(latencies) * 1000:.1f} ms")
+    assert p95(latencies) < 0.05
+
+
+def test_selective_search_uses_trigram_index(run, client, database, dataset):
+    """user-012: with sequential scans allowed, a selective term still goes through pg_trgm"""
+    with captured_statements(database) as statements:
+        response = run(client.get("/maintenance-enhanced/requests/", params={"search": "Request 4242"}))
+    assert response.status_code == 200, response.text
+    statement, parameters = statements[-1]
+    plan = run(explain(database, statement, parameters, seqscan=True))
+    assert any(name.endswith("_trgm") for name in index_scans(plan)), plan
+
+
+def test_metrics_overhead(run, client, dataset):
+    """user-018: the metrics middleware costs under 2% of a typical request"""
+    from app.utils.metrics import MetricsMiddleware
+
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/units/"}
+    instrumented = MetricsMiddleware(endpoint)
+
+    async def per_call(asgi_app, calls: int = 50_000) -> float:
+        started = time.perf_counter()
+        for _ in range(calls):
+            await asgi_app(scope, receive, send)
+        return (time.perf_counter() - started) / calls
+
+    async def request():
+        response = await client.get("/units/", params={"limit": 100})
+        assert response.status_code == 200, response.text
+
+    overhead = run(per_call(instrumented)) - run(per_call(endpoint))
+    typical = statistics.median(run(timed(request, 50)))
+    print(f"\nmetrics middleware: {overhead * 1e6:.1f} us per request, {overhead / typical:.2%} of GET /units/")
+    assert overhead / typical < 0.02
+
+
+def test_aging_report_whole_portfolio(run, client, dataset):
+    """user-020: the aging report over every unit runs in seconds"""
+    started = time.perf_counter()
+    response = run(client.get("/payments/aging", params={"as_of": "2026-03-15", "delinquent_only": "false"}))
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.text
+    assert response.json()["totals"]["units"] == UNITS
+    print(f"\naging report over {UNITS} units: {elapsed:.2f} s")
+    assert elapsed < 10
+
+
+def test_billing_run(run, client, database, dataset):
+    """user-021: billing every unit for a month takes under a minute"""
+    started = time.perf_counter()
+    response = run(client.post("/billing/runs", json={"period": str(date(2026, 6, 1))}))
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 201, response.text
+
+    runs = response.json()["runs"]
+    assert len(runs) == PROPERTIES
+    assert sum(billing_run["units_billed"] for billing_run in runs) == UNITS
+    print(f"\nbilled {UNITS} units across {PROPERTIES} properties in {elapsed:.1f} s")
+    assert elapsed < 60
+
+    async def charges():
+        async with database.connect() as conn:
+            result = await conn.execute(text("SELECT count(*) FROM payments WHERE billing_run_id IS NOT NULL"))
+            return result.scalar()
+    assert run(charges()) == UNITS
@@ -0,0 +1,129 @@
+"""Query-plan regression tests for the list routes' filters (migrations 0002-0005).
+
+Each case calls a list route through the app, captures the SELECT it runs and
+checks ``EXPLAIN`` reads the table through the index meant for that filter.
+"""
+
+import os
+
+import pytest
+
+if not os.environ.get("DATABASE_URL"):
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from conftest import captured_statements, explain, index_scans, reset_tables, seed, seeded_uuid
+
+UNIT = 7
+RESIDENT = 7
+PROPERTY = 3
+
+CASES = [
+    # (route, query parameters, table, expected index)
+    ("/payments/", {"resident_id": RESIDENT}, "payments", "ix_payments_resident_id_created_at"),
+    ("/payments/", {"resident_id": RESIDENT, "cursor": ""}, "payments", "ix_payments_resident_id_created_at"),
+    ("/payments/", {"unit_id": UNIT}, "payments", "ix_payments_unit_id_payment_date"),
+    (
+        "/payments/",
+        {"unit_id": UNIT, "start_date": "2024-03-01", "end_date": "2024-06-30"},
+        "payments",
+        "ix_payments_unit_id_payment_date",
+    ),
+    ("/payments/", {"start_date": "2024-03-01", "end_date": "2024-03-02"}, "payments", "ix_payments_payment_date"),
+    ("/payments/", {"cursor": ""}, "payments", "ix_payments_created_at_id"),
+    ("/violations/", {"unit_id": UNIT}, "violations", "ix_violations_unit_id_created_at"),
+    ("/violations/", {"resident_id": RESIDENT}, "violations", "ix_violations_resident_id_created_at"),
+    ("/maintenance/", {"unit_id": UNIT}, "maintenance_requests", "ix_maintenance_requests_unit_id_created_at"),
+    (
+        "/maintenance/",
+        {"resident_id": RESIDENT},
+        "maintenance_requests",
+        "ix_maintenance_requests_resident_id_created_at",
+    ),
+    ("/units/", {"property_id": PROPERTY}, "units", "ix_units_property_id"),
+    ("/residents/", {"unit_id": UNIT}, "residents", "ix_residents_unit_id"),
+    (
+        "/maintenance-enhanced/requests/",
+        {"property_id": str(seeded_uuid("property", PROPERTY)), "status": "pending"},
+        "maintenance_requests_enhanced",
+        "ix_maintenance_requests_enhanced_property_status_created_at",
+    ),
+    (
+        "/maintenance-enhanced/requests/",
+        {"status": "in_progress"},
+        "maintenance_requests_enhanced",
+        "ix_maintenance_requests_enhanced_status_created_at",
+    ),
+    (
+        "/maintenance-enhanced/requests/",
+        {"unit_id": str(seeded_uuid("unit", UNIT))},
+        "maintenance_requests_enhanced",
+        "ix_maintenance_requests_enhanced_unit_id_created_at",
+    ),
+    (
+        "/maintenance-enhanced/requests/",
+        {"resident_id": str(seeded_uuid("resident", RESIDENT))},
+        "maintenance_requests_enhanced",
+        "ix_maintenance_requests_enhanced_resident_id_created_at",
+    ),
+    (
+        "/maintenance-enhanced/requests/",
+        {"contractor_id": str(seeded_uuid("contractor", 5))},
+        "maintenance_requests_enhanced",
+        "ix_maintenance_requests_enhanced_contractor_status",
+    ),
+    (
+        "/maintenance-enhanced/requests/",
+        {"search": "heater"},
+        "maintenance_requests_enhanced",
+        "ix_maintenance_requests_enhanced_title_trgm",
+    ),
+    (
+        "/maintenance-enhanced/work-logs/",
+        {"maintenance_request_id": str(seeded_uuid("request", 42))},
+        "maintenance_work_logs",
+        "ix_maintenance_work_logs_request_work_date",
+    ),
+    (
+        "/residents-enhanced/",
+        {"unit_id": str(seeded_uuid("unit", UNIT))},
+        "residents_enhanced",
+        "ix_residents_enhanced_unit_id",
+    ),
+    (
+        "/residents-enhanced/",
+        {"property_id": str(seeded_uuid("property", PROPERTY)), "is_active": "true"},
+        "residents_enhanced",
+        "ix_residents_enhanced_property_active",
+    ),
+    ("/contractors/", {"search": "Company 12"}, "contractors", "ix_contractors_company_trgm"),
+    ("/contractors/", {"specialty": "plumbing"}, "contractors", "ix_contractors_specialties"),
+]
+
+
+@pytest.fixture(scope="module")
+def seeded(run, database):
+    async def prepare():
+        async with database.begin() as conn:
+            await reset_tables(conn)
+            await seed(conn)
+    run(prepare())
+
+
+@pytest.mark.parametrize(
+    "route, params, table, index", CASES,
+    ids=[f"{route}?{'&'.join(params)}->{index}" for route, params, _, index in CASES],
+)
+def test_list_filter_uses_index(run, client, database, seeded, route, params, table, index):
+    with captured_statements(database) as statements:
+        response = run(client.get(route, params=params))
+    assert response.status_code == 200, response.text
+
+    selects = [
+        (statement, parameters) for statement, parameters in statements
+        if statement.lstrip().upper().startswith("SELECT") and f"FROM {table}" in statement
+    ]
+    assert selects, f"{route} ran no SELECT on {table}"
+
+    statement, parameters = selects[-1]
+    plan = run(explain(database, statement, parameters))
+    assert index in index_scans(plan), f"expected {index} in plan:\n{plan}"